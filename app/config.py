@@ -76,6 +76,34 @@ class Settings(BaseSettings):
         default=False,
         description="Use DeepSpeed for TTS inference",
     )
+    indextts_max_segment_length: int = Field(
+        default=1000,
+        description="Maximum characters per synthesis segment",
+    )
+    indextts_first_segment_length: int = Field(
+        default=0,
+        description="Maximum characters in the first segment (0 = same as max)",
+    )
+    indextts_target_segment_seconds: float = Field(
+        default=20.0,
+        description="Target render time per segment, derived from measured latency (0 = fixed)",
+    )
+    indextts_crossfade_ms: float = Field(
+        default=10.0,
+        description="Equal-power crossfade between segments in milliseconds (0 = hard cut)",
+    )
+    indextts_trim_silence: bool = Field(
+        default=True,
+        description="Trim silence at segment boundaries before joining",
+    )
+    voice_library_dir: str = Field(
+        default="./voices",
+        description="Directory holding registered reference voices",
+    )
+    voice_cache_size: int = Field(
+        default=32,
+        description="Number of registered voices kept in the in-memory LRU",
+    )
 
     # ============================================
     # Service Configuration
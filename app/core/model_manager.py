@@ -50,6 +50,8 @@ class ModelManager:
         self._switch_timeout = settings.model_switch_timeout
         self._last_switch_time: Optional[float] = None
         self._model_name: Optional[str] = None
+        # Requests waiting for or running on each model type
+        self._pending: dict[ModelType, int] = {ModelType.STT: 0, ModelType.TTS: 0}
 
     @property
     def current_model_type(self) -> ModelType:
@@ -77,6 +79,28 @@ class ModelManager:
             "model_name": self._model_name,
         }
 
+    def begin_request(self, model_type: ModelType) -> None:
+        """
+        Count a request needing `model_type` from before its model switch
+        until its inference finishes; pair with end_request()
+        """
+        self._pending[model_type] += 1
+
+    def end_request(self, model_type: ModelType) -> None:
+        """Stop counting a request started with begin_request()"""
+        self._pending[model_type] = max(0, self._pending[model_type] - 1)
+
+    def get_queue_depth(self) -> dict:
+        """
+        Get requests waiting for or running on a model
+        Returns dict with the total queue depth and the STT/TTS share of it
+        """
+        return {
+            "queue_depth": sum(self._pending.values()),
+            "pending_stt": self._pending[ModelType.STT],
+            "pending_tts": self._pending[ModelType.TTS],
+        }
+
     async def switch_to_stt(self) -> None:
         """
         Switch to STT model
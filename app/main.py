@@ -11,7 +11,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.routers import audio, health
+from app.routers import audio, health, voices
 
 # Configure logging
 logging.basicConfig(
@@ -75,6 +75,7 @@ app.add_middleware(
 
 # Register routers
 app.include_router(audio.router, prefix="/v1/audio", tags=["audio"])
+app.include_router(voices.router, prefix="/v1/audio/voices", tags=["voices"])
 app.include_router(health.router, tags=["health"])
 
 
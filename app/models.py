@@ -119,6 +119,16 @@ class TTSResponseFormat(str, Enum):
     MP3 = "mp3"
     FLAC = "flac"
     OPUS = "opus"
+    AAC = "aac"
+    PCM = "pcm"
+
+
+class SampleFormat(str, Enum):
+    """Sample encoding for wav/pcm TTS output"""
+
+    PCM16 = "pcm16"
+    MULAW = "mulaw"
+    ALAW = "alaw"
 
 
 class EmotionMode(str, Enum):
@@ -170,7 +180,7 @@ class TTSRequest(BaseModel):
         max_length=4096,
     )
     voice: str = Field(
-        description="Base64-encoded reference audio for voice cloning",
+        description="Registered voice_id (see /v1/audio/voices) or base64-encoded reference audio",
     )
     response_format: TTSResponseFormat = Field(
         default=TTSResponseFormat.WAV,
@@ -182,6 +192,16 @@ class TTSRequest(BaseModel):
         le=4.0,
         description="Speed of the generated audio",
     )
+    sample_rate: int | None = Field(
+        default=None,
+        ge=8000,
+        le=48000,
+        description="Output sample rate in Hz (default: model native rate)",
+    )
+    sample_format: SampleFormat = Field(
+        default=SampleFormat.PCM16,
+        description="Sample encoding for wav/pcm output (mulaw/alaw for telephony)",
+    )
     emotion: Optional[EmotionConfig] = Field(
         default=None,
         description="Emotion configuration",
@@ -227,6 +247,9 @@ class HealthResponse(BaseModel):
     status: Literal["healthy", "unhealthy"] = Field(description="Service health status")
     gpu: Optional[GPUInfo] = Field(default=None, description="GPU information")
     model: ModelInfo = Field(description="Current model information")
+    queue_depth: int = Field(default=0, description="Requests waiting for or running on a model")
+    pending_stt: int = Field(default=0, description="Queued or running transcription requests")
+    pending_tts: int = Field(default=0, description="Queued or running speech requests")
 
 
 class AvailableModel(BaseModel):
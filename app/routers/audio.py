@@ -19,16 +19,26 @@ from fastapi import (
     status,
 )
 from fastapi.responses import Response
+from opentalker_common.audio_encoder import encoded_sample_rate
 
 from app.config import settings
-from app.core.model_manager import model_manager
+from app.core.model_manager import ModelType, model_manager
 from app.models import TTSRequest
+from app.services.tts_service import INDEXTTS_SAMPLE_RATE
+from app.services.voice_library import is_voice_id, voice_library
 from app.utils import openai_compat
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Media types for headerless pcm output per sample format
+RAW_MEDIA_TYPES = {
+    "pcm16": "audio/pcm",
+    "mulaw": "audio/PCMU",
+    "alaw": "audio/PCMA",
+}
+
 
 # ============================================
 # STT Endpoint - /v1/audio/transcriptions
@@ -91,6 +101,8 @@ async def create_transcription(
 
         logger.info(f"Audio file saved: {audio_path} ({file_size} bytes)")
 
+        # Counted from before the model switch so /health reports queued requests
+        model_manager.begin_request(ModelType.STT)
         try:
             # Switch to STT model
             logger.info("Switching to STT model")
@@ -131,6 +143,7 @@ async def create_transcription(
                 return result
 
         finally:
+            model_manager.end_request(ModelType.STT)
             # Cleanup temp file
             if os.path.exists(audio_path):
                 os.remove(audio_path)
@@ -178,6 +191,7 @@ async def create_speech(request: TTSRequest):
             voice=request.voice,
             response_format=request.response_format,
             speed=request.speed,
+            sample_format=request.sample_format,
         )
         if validation_error:
             raise HTTPException(
@@ -185,6 +199,15 @@ async def create_speech(request: TTSRequest):
                 detail=validation_error.model_dump(),
             )
 
+        # Reject unknown voice ids before switching models
+        if is_voice_id(request.voice) and voice_library.get(request.voice) is None:
+            error = openai_compat.create_voice_not_found_error(request.voice)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=error.model_dump(),
+            )
+
+        model_manager.begin_request(ModelType.TTS)
         try:
             # Switch to TTS model
             logger.info("Switching to TTS model")
@@ -218,6 +241,8 @@ async def create_speech(request: TTSRequest):
                 response_format=request.response_format,
                 speed=request.speed,
                 emotion_config=emotion_config,
+                sample_rate=request.sample_rate,
+                sample_format=request.sample_format,
             )
 
             elapsed = time.time() - start_time
@@ -232,6 +257,8 @@ async def create_speech(request: TTSRequest):
                 "mp3": "audio/mpeg",
                 "flac": "audio/flac",
                 "opus": "audio/opus",
+                "aac": "audio/aac",
+                "pcm": RAW_MEDIA_TYPES[request.sample_format],
             }
             media_type = media_types.get(request.response_format, "audio/wav")
 
@@ -240,7 +267,12 @@ async def create_speech(request: TTSRequest):
                 content=audio_bytes,
                 media_type=media_type,
                 headers={
-                    "Content-Disposition": f'attachment; filename="speech.{request.response_format}"'
+                    "Content-Disposition": f'attachment; filename="speech.{request.response_format}"',
+                    "X-Sample-Rate": str(
+                        encoded_sample_rate(
+                            request.response_format, request.sample_rate or INDEXTTS_SAMPLE_RATE
+                        )
+                    ),
                 },
             )
 
@@ -251,6 +283,8 @@ async def create_speech(request: TTSRequest):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=error.model_dump(),
             )
+        finally:
+            model_manager.end_request(ModelType.TTS)
 
     except HTTPException:
         raise
@@ -28,7 +28,9 @@ async def health_check():
     """
     Health check endpoint
 
-    Returns service health status, GPU info, and current model status
+    Returns service health status, GPU info, current model status and queue
+    depth; the gateway's residency policy routes on the resident model and
+    queue depth
     """
     try:
         # Get GPU memory info
@@ -62,6 +64,7 @@ async def health_check():
             status=health_status,
             gpu=gpu_info,
             model=model_info,
+            **model_manager.get_queue_depth(),
         )
 
     except Exception as e:
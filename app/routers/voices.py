@@ -0,0 +1,97 @@
+"""
+Voice API routes - Registered reference voices
+Upload a reference once, then pass its voice_id as `voice` in /v1/audio/speech
+"""
+
+import asyncio
+import logging
+
+from fastapi import (
+    APIRouter,
+    File,
+    Form,
+    HTTPException,
+    UploadFile,
+    status,
+)
+
+from app.config import settings
+from app.services.voice_library import voice_library
+from app.utils import openai_compat
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _not_found(voice_id: str) -> HTTPException:
+    error = openai_compat.create_voice_not_found_error(voice_id)
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=error.model_dump(),
+    )
+
+
+@router.post("")
+async def create_voice(
+    file: UploadFile = File(..., description="Reference audio file"),
+    name: str | None = Form(default=None, description="Display name"),
+):
+    """
+    Register a reference voice
+
+    The audio is decoded, downmixed, trimmed and normalized once and stored
+    under a content-derived voice_id.
+    """
+    file_content = await file.read()
+    file_size = len(file_content)
+
+    if file_size > settings.max_upload_size:
+        error = openai_compat.create_file_too_large_error(file_size, settings.max_upload_size)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=error.model_dump(),
+        )
+
+    try:
+        entry = await asyncio.to_thread(voice_library.create, file_content, name)
+    except ValueError as e:
+        error = openai_compat.create_invalid_audio_error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error.model_dump(),
+        )
+    except Exception as e:
+        logger.error(f"Voice registration failed: {e}", exc_info=True)
+        error = openai_compat.create_processing_error("voice registration", str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error.model_dump(),
+        )
+
+    return entry.to_response()
+
+
+@router.get("")
+async def list_voices():
+    """List registered voices"""
+    entries = await asyncio.to_thread(voice_library.list)
+    return {"object": "list", "data": [entry.to_response() for entry in entries]}
+
+
+@router.get("/{voice_id}")
+async def get_voice(voice_id: str):
+    """Get a registered voice"""
+    entry = await asyncio.to_thread(voice_library.get, voice_id)
+    if entry is None:
+        raise _not_found(voice_id)
+    return entry.to_response()
+
+
+@router.delete("/{voice_id}")
+async def delete_voice(voice_id: str):
+    """Delete a registered voice"""
+    deleted = await asyncio.to_thread(voice_library.delete, voice_id)
+    if not deleted:
+        raise _not_found(voice_id)
+    return {"id": voice_id, "object": "voice.deleted", "deleted": True}
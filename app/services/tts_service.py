@@ -7,14 +7,23 @@ import base64
 import logging
 import os
 import tempfile
+import time
 from typing import Dict, List, Optional
 
 import torch
+from opentalker_common.audio_assembly import AudioAssembler
+from opentalker_common.audio_encoder import encode_audio, to_float32
+from opentalker_common.resample import resample
+from opentalker_common.text_segmenter import TextSegmenter
 
 from app.config import settings
+from app.services.voice_library import is_voice_id, voice_library
 
 logger = logging.getLogger(__name__)
 
+# IndexTTS2 output sample rate
+INDEXTTS_SAMPLE_RATE = 24000
+
 
 class IndexTTSService:
     """
@@ -28,6 +37,11 @@ class IndexTTSService:
         self.use_fp16 = settings.indextts_use_fp16
         self.use_cuda_kernel = settings.indextts_use_cuda_kernel
         self.use_deepspeed = settings.indextts_use_deepspeed
+        self._segmenter = TextSegmenter(
+            max_chunk_size=settings.indextts_max_segment_length,
+            first_chunk_size=settings.indextts_first_segment_length,
+            target_chunk_seconds=settings.indextts_target_segment_seconds,
+        )
         self._is_loaded = False
 
     def load_model(self) -> None:
@@ -104,16 +118,20 @@ class IndexTTSService:
         response_format: str = "wav",
         speed: float = 1.0,
         emotion_config: Optional[Dict] = None,
+        sample_rate: int | None = None,
+        sample_format: str = "pcm16",
     ) -> bytes:
         """
         Synthesize speech from text
 
         Args:
             text: Input text to synthesize
-            voice_reference: Base64-encoded reference audio for voice cloning
-            response_format: Output audio format (wav, mp3, flac, opus)
+            voice_reference: Registered voice_id or base64-encoded reference audio
+            response_format: Output audio format (wav, mp3, flac, opus, aac, pcm)
             speed: Speech speed multiplier (0.25-4.0)
             emotion_config: Emotion control configuration
+            sample_rate: Output sample rate, None for the model's native rate
+            sample_format: Sample encoding for wav/pcm (pcm16, mulaw, alaw)
 
         Returns:
             Audio data as bytes
@@ -121,17 +139,29 @@ class IndexTTSService:
         if not self._is_loaded:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
+        ref_audio_path = None
+        temporary_reference = False
         try:
-            # Decode voice reference audio
-            logger.info("Decoding voice reference audio")
-            ref_audio_path = self._decode_voice_reference(voice_reference)
+            # Resolve voice reference audio: a registered voice always resolves
+            # to the same file, so the model's speaker-conditioning cache (keyed
+            # by prompt path) stays warm; base64 uploads go through a temporary file
+            if is_voice_id(voice_reference):
+                voice = voice_library.get(voice_reference)
+                if voice is None:
+                    raise ValueError(f"Voice not found: {voice_reference}")
+                ref_audio_path = voice.reference_path
+                logger.info(f"Using registered voice: {voice.id}")
+            else:
+                logger.info("Decoding voice reference audio")
+                ref_audio_path = self._decode_voice_reference(voice_reference)
+                temporary_reference = True
 
             # Validate text length
             if len(text) > 4096:
                 logger.warning(f"Text length ({len(text)}) exceeds 4096 chars, will segment")
 
             # Segment text if too long
-            text_segments = self._segment_text(text, max_length=1000)
+            text_segments = self._segmenter.segment(text)
             logger.info(f"Text segmented into {len(text_segments)} parts")
 
             # Process emotion configuration
@@ -142,12 +172,14 @@ class IndexTTSService:
             for i, segment in enumerate(text_segments):
                 logger.info(f"Synthesizing segment {i + 1}/{len(text_segments)}")
 
+                segment_start = time.perf_counter()
                 audio = self.model.synthesize(
                     text=segment,
                     reference_audio=ref_audio_path,
                     speed=speed,
                     **emotion_params,
                 )
+                self._segmenter.record_latency(len(segment), time.perf_counter() - segment_start)
 
                 audio_segments.append(audio)
 
@@ -159,11 +191,9 @@ class IndexTTSService:
                 final_audio = audio_segments[0]
 
             # Convert to requested format
-            audio_bytes = self._convert_audio_format(final_audio, response_format)
-
-            # Cleanup temporary reference audio
-            if os.path.exists(ref_audio_path):
-                os.remove(ref_audio_path)
+            audio_bytes = self._convert_audio_format(
+                final_audio, response_format, sample_rate, sample_format
+            )
 
             logger.info(f"Speech synthesis complete, output size: {len(audio_bytes)} bytes")
             return audio_bytes
@@ -172,6 +202,11 @@ class IndexTTSService:
             logger.error(f"Speech synthesis failed: {e}", exc_info=True)
             raise
 
+        finally:
+            # Cleanup temporary reference audio (registered voices are kept)
+            if temporary_reference and os.path.exists(ref_audio_path):
+                os.remove(ref_audio_path)
+
     def _decode_voice_reference(self, voice_reference_b64: str) -> str:
         """
         Decode base64-encoded voice reference audio
@@ -198,45 +233,6 @@ class IndexTTSService:
             logger.error(f"Failed to decode voice reference: {e}")
             raise ValueError(f"Invalid voice reference audio: {e}")
 
-    def _segment_text(self, text: str, max_length: int = 1000) -> List[str]:
-        """
-        Segment long text into smaller chunks
-
-        Args:
-            text: Input text
-            max_length: Maximum length per segment
-
-        Returns:
-            List of text segments
-        """
-        if len(text) <= max_length:
-            return [text]
-
-        segments = []
-        current_segment = ""
-
-        # Split by sentences
-        sentences = (
-            text.replace("。", "。\n").replace("！", "！\n").replace("？", "？\n").split("\n")
-        )
-
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-
-            if len(current_segment) + len(sentence) <= max_length:
-                current_segment += sentence
-            else:
-                if current_segment:
-                    segments.append(current_segment)
-                current_segment = sentence
-
-        if current_segment:
-            segments.append(current_segment)
-
-        return segments
-
     def _process_emotion_config(self, emotion_config: Optional[Dict]) -> Dict:
         """
         Process emotion configuration into model parameters
@@ -283,110 +279,44 @@ class IndexTTSService:
             Concatenated audio
         """
         try:
-            import numpy as np
-
-            # Convert to numpy arrays if needed
-            arrays = []
-            for audio in audio_segments:
-                if isinstance(audio, torch.Tensor):
-                    arrays.append(audio.cpu().numpy())
-                else:
-                    arrays.append(audio)
-
-            # Concatenate
-            concatenated = np.concatenate(arrays, axis=-1)
-            return concatenated
+            assembler = AudioAssembler(
+                INDEXTTS_SAMPLE_RATE,
+                crossfade_ms=settings.indextts_crossfade_ms,
+                trim_silence=settings.indextts_trim_silence,
+            )
+            return assembler.assemble(audio_segments)
 
         except Exception as e:
             logger.error(f"Failed to concatenate audio: {e}")
             raise
 
-    def _convert_audio_format(self, audio_data: any, format: str) -> bytes:
+    def _convert_audio_format(
+        self,
+        audio_data: any,
+        format: str,
+        sample_rate: int | None = None,
+        sample_format: str = "pcm16",
+    ) -> bytes:
         """
         Convert audio to requested format
 
         Args:
             audio_data: Audio array/tensor
-            format: Target format (wav, mp3, flac, opus)
+            format: Target format (wav, mp3, flac, opus, aac, pcm)
+            sample_rate: Target sample rate, None to keep the model's native rate
+            sample_format: Sample encoding for wav/pcm (pcm16, mulaw, alaw)
 
         Returns:
             Audio bytes in requested format
         """
         try:
-            import io
-
-            import soundfile as sf
-
-            # Convert to numpy array if tensor
-            if isinstance(audio_data, torch.Tensor):
-                audio_array = audio_data.cpu().numpy()
-            else:
-                audio_array = audio_data
-
-            # Write to bytes buffer
-            buffer = io.BytesIO()
-
-            if format == "wav":
-                sf.write(buffer, audio_array, samplerate=24000, format="WAV")
-            elif format == "flac":
-                sf.write(buffer, audio_array, samplerate=24000, format="FLAC")
-            elif format == "mp3":
-                # For MP3, we need to use ffmpeg
-                # First write as WAV, then convert
-                temp_wav = io.BytesIO()
-                sf.write(temp_wav, audio_array, samplerate=24000, format="WAV")
-                temp_wav.seek(0)
-
-                # Convert using ffmpeg (requires ffmpeg-python)
-                import ffmpeg
-
-                temp_wav_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                temp_wav_file.write(temp_wav.read())
-                temp_wav_file.close()
-
-                temp_mp3_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-                temp_mp3_file.close()
-
-                ffmpeg.input(temp_wav_file.name).output(
-                    temp_mp3_file.name, acodec="libmp3lame"
-                ).overwrite_output().run(quiet=True)
+            output_rate = sample_rate or INDEXTTS_SAMPLE_RATE
+            if output_rate != INDEXTTS_SAMPLE_RATE:
+                audio_data = resample(to_float32(audio_data), INDEXTTS_SAMPLE_RATE, output_rate)
 
-                with open(temp_mp3_file.name, "rb") as f:
-                    buffer.write(f.read())
-
-                os.remove(temp_wav_file.name)
-                os.remove(temp_mp3_file.name)
-
-            elif format == "opus":
-                # Similar to MP3, use ffmpeg
-                temp_wav = io.BytesIO()
-                sf.write(temp_wav, audio_array, samplerate=24000, format="WAV")
-                temp_wav.seek(0)
-
-                import ffmpeg
-
-                temp_wav_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-                temp_wav_file.write(temp_wav.read())
-                temp_wav_file.close()
-
-                temp_opus_file = tempfile.NamedTemporaryFile(delete=False, suffix=".opus")
-                temp_opus_file.close()
-
-                ffmpeg.input(temp_wav_file.name).output(
-                    temp_opus_file.name, acodec="libopus"
-                ).overwrite_output().run(quiet=True)
-
-                with open(temp_opus_file.name, "rb") as f:
-                    buffer.write(f.read())
-
-                os.remove(temp_wav_file.name)
-                os.remove(temp_opus_file.name)
-
-            else:
-                raise ValueError(f"Unsupported audio format: {format}")
-
-            buffer.seek(0)
-            return buffer.read()
+            return encode_audio(
+                audio_data, sample_rate=output_rate, format=format, sample_format=sample_format
+            )
 
         except Exception as e:
             logger.error(f"Failed to convert audio format: {e}")
@@ -0,0 +1,266 @@
+"""
+Voice Library - Registered reference voices for TTS
+Stores preprocessed reference audio on disk under a stable voice_id so clients
+can pass the id instead of re-uploading base64 audio on every request.
+Monolith only: the gateway and the Qwen3-TTS service use named speakers.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import soundfile as sf
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VOICE_ID_PATTERN = re.compile(r"^voice_[0-9a-f]{24}$")
+
+REFERENCE_FILENAME = "reference.wav"
+METADATA_FILENAME = "meta.json"
+
+# Preprocessing
+_SILENCE_THRESHOLD = 1e-3
+_PEAK_LEVEL = 0.95
+
+
+@dataclass
+class VoiceEntry:
+    """A registered voice"""
+
+    id: str
+    name: str | None
+    created_at: int
+    duration: float
+    sample_rate: int
+    reference_path: str
+
+    def to_response(self) -> dict:
+        """OpenAI-style object representation"""
+        return {
+            "id": self.id,
+            "object": "voice",
+            "name": self.name,
+            "created_at": self.created_at,
+            "duration": round(self.duration, 3),
+            "sample_rate": self.sample_rate,
+        }
+
+
+def is_voice_id(value: str) -> bool:
+    """Check whether a voice field holds a registered voice id rather than base64 audio"""
+    return bool(VOICE_ID_PATTERN.match(value))
+
+
+def _decode_audio(audio_bytes: bytes) -> tuple:
+    """Decode uploaded audio to (float32 frames, sample_rate), using ffmpeg as a fallback"""
+    try:
+        data, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+        return data, sample_rate
+    except Exception:
+        pass
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError("Unsupported audio format (ffmpeg not available)")
+
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-f", "wav", "pipe:1"],
+        input=audio_bytes,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise ValueError(f"Could not decode audio: {stderr}")
+
+    data, sample_rate = sf.read(io.BytesIO(result.stdout), dtype="float32", always_2d=True)
+    return data, sample_rate
+
+
+def _preprocess(data: np.ndarray) -> np.ndarray:
+    """Downmix to mono, trim leading/trailing silence and peak-normalize"""
+    audio = data.mean(axis=1)
+    voiced = np.flatnonzero(np.abs(audio) > _SILENCE_THRESHOLD)
+    if voiced.size == 0:
+        raise ValueError("Reference audio is silent")
+    audio = audio[voiced[0] : voiced[-1] + 1]
+
+    peak = float(np.abs(audio).max())
+    if peak > 0:
+        audio = audio * (_PEAK_LEVEL / peak)
+    return audio
+
+
+class VoiceLibrary:
+    """
+    Registered voice store
+
+    Voices live on disk as <library_dir>/<voice_id>/{reference.wav,meta.json};
+    recently used entries are kept in an in-memory LRU. Because a registered
+    voice always resolves to the same reference path, the TTS model's own
+    speaker-conditioning cache (keyed by prompt path) stays warm across
+    requests instead of being recomputed for every base64 upload.
+    """
+
+    def __init__(self, library_dir: str, cache_size: int = 32):
+        self.library_dir = library_dir
+        self.cache_size = max(1, cache_size)
+        self._cache: OrderedDict[str, VoiceEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _voice_dir(self, voice_id: str) -> str:
+        return os.path.join(self.library_dir, voice_id)
+
+    def _remember(self, entry: VoiceEntry) -> None:
+        self._cache[entry.id] = entry
+        self._cache.move_to_end(entry.id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def create(self, audio_bytes: bytes, name: str | None = None) -> VoiceEntry:
+        """
+        Register a reference voice
+
+        Args:
+            audio_bytes: Uploaded audio file contents (any format soundfile/ffmpeg can read)
+            name: Optional display name
+
+        Returns:
+            The registered voice (an existing entry if the same audio was uploaded before)
+        """
+        voice_id = "voice_" + hashlib.sha256(audio_bytes).hexdigest()[:24]
+
+        existing = self.get(voice_id)
+        if existing is not None:
+            logger.info(f"Voice already registered: {voice_id}")
+            return existing
+
+        data, sample_rate = _decode_audio(audio_bytes)
+        audio = _preprocess(data)
+
+        voice_dir = self._voice_dir(voice_id)
+        os.makedirs(voice_dir, exist_ok=True)
+        reference_path = os.path.join(voice_dir, REFERENCE_FILENAME)
+        sf.write(reference_path, audio, sample_rate, subtype="PCM_16", format="WAV")
+
+        entry = VoiceEntry(
+            id=voice_id,
+            name=name,
+            created_at=int(time.time()),
+            duration=audio.size / sample_rate,
+            sample_rate=sample_rate,
+            reference_path=os.path.abspath(reference_path),
+        )
+        metadata = asdict(entry)
+        metadata.pop("reference_path")
+        with open(os.path.join(voice_dir, METADATA_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        with self._lock:
+            self._remember(entry)
+
+        logger.info(f"Registered voice {voice_id} ({entry.duration:.2f}s @ {sample_rate}Hz)")
+        return entry
+
+    def get(self, voice_id: str) -> VoiceEntry | None:
+        """
+        Look up a registered voice
+
+        Args:
+            voice_id: Voice identifier
+
+        Returns:
+            VoiceEntry, or None if not registered
+        """
+        if not is_voice_id(voice_id):
+            return None
+
+        with self._lock:
+            entry = self._cache.get(voice_id)
+            if entry is not None:
+                self._cache.move_to_end(voice_id)
+                return entry
+
+        entry = self._load(voice_id)
+        if entry is not None:
+            with self._lock:
+                self._remember(entry)
+        return entry
+
+    def _load(self, voice_id: str) -> VoiceEntry | None:
+        """Read a voice's metadata from disk"""
+        voice_dir = self._voice_dir(voice_id)
+        metadata_path = os.path.join(voice_dir, METADATA_FILENAME)
+        reference_path = os.path.join(voice_dir, REFERENCE_FILENAME)
+        if not (os.path.exists(metadata_path) and os.path.exists(reference_path)):
+            return None
+
+        try:
+            with open(metadata_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+            return VoiceEntry(reference_path=os.path.abspath(reference_path), **metadata)
+        except Exception as e:
+            logger.error(f"Failed to load voice {voice_id}: {e}")
+            return None
+
+    def list(self) -> list[VoiceEntry]:
+        """
+        List all registered voices, newest first
+
+        Listing reads metadata only and leaves the LRU untouched, so it does
+        not evict the voices that are actually in use.
+        """
+        if not os.path.isdir(self.library_dir):
+            return []
+
+        entries = []
+        for voice_id in os.listdir(self.library_dir):
+            if not is_voice_id(voice_id):
+                continue
+            with self._lock:
+                entry = self._cache.get(voice_id)
+            if entry is None:
+                entry = self._load(voice_id)
+            if entry is not None:
+                entries.append(entry)
+        return sorted(entries, key=lambda e: e.created_at, reverse=True)
+
+    def delete(self, voice_id: str) -> bool:
+        """
+        Delete a registered voice
+
+        Args:
+            voice_id: Voice identifier
+
+        Returns:
+            True if the voice existed and was deleted
+        """
+        if not is_voice_id(voice_id):
+            return False
+
+        with self._lock:
+            self._cache.pop(voice_id, None)
+
+        voice_dir = self._voice_dir(voice_id)
+        if not os.path.isdir(voice_dir):
+            return False
+
+        shutil.rmtree(voice_dir)
+        logger.info(f"Deleted voice {voice_id}")
+        return True
+
+
+# Global voice library instance
+voice_library = VoiceLibrary(settings.voice_library_dir, settings.voice_cache_size)
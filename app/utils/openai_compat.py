@@ -88,6 +88,7 @@ def validate_speech_request(
     voice: str,
     response_format: str = "wav",
     speed: float = 1.0,
+    sample_format: str = "pcm16",
 ) -> Optional[ErrorResponse]:
     """
     Validate speech synthesis request parameters
@@ -95,9 +96,10 @@ def validate_speech_request(
     Args:
         model: Model identifier
         input_text: Text to synthesize
-        voice: Voice reference (base64)
+        voice: Voice reference (voice_id or base64)
         response_format: Audio format
         speed: Speech speed
+        sample_format: Sample encoding (pcm16, mulaw, alaw)
 
     Returns:
         ErrorResponse if validation fails, None if valid
@@ -147,7 +149,7 @@ def validate_speech_request(
         )
 
     # Validate response format
-    valid_formats = ["wav", "mp3", "flac", "opus"]
+    valid_formats = ["wav", "mp3", "flac", "opus", "aac", "pcm"]
     if response_format not in valid_formats:
         return ErrorResponse(
             error=ErrorDetail(
@@ -159,6 +161,17 @@ def validate_speech_request(
             )
         )
 
+    # Validate sample format (G.711 only exists for uncompressed output)
+    if sample_format != "pcm16" and response_format not in ("wav", "pcm"):
+        return ErrorResponse(
+            error=ErrorDetail(
+                message=f"sample_format {sample_format} requires response_format wav or pcm",
+                type="invalid_request_error",
+                param="sample_format",
+                code="invalid_value",
+            )
+        )
+
     # Validate speed
     if not 0.25 <= speed <= 4.0:
         return ErrorResponse(
@@ -288,6 +301,24 @@ def create_invalid_audio_error(reason: str) -> ErrorResponse:
     )
 
 
+def create_voice_not_found_error(voice_id: str) -> ErrorResponse:
+    """
+    Create error response for unknown voice_id
+
+    Args:
+        voice_id: Requested voice identifier
+
+    Returns:
+        ErrorResponse object
+    """
+    return create_error_response(
+        message=f"Voice not found: {voice_id}",
+        error_type="invalid_request_error",
+        param="voice",
+        code="voice_not_found",
+    )
+
+
 def create_model_not_ready_error(model_type: str) -> ErrorResponse:
     """
     Create error response for model not ready
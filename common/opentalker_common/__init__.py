@@ -0,0 +1,7 @@
+"""
+OpenTalker Common - Modules shared by the monolith, gateway and services
+Modules that only use the standard library have no dependencies; the audio
+modules need the "audio" extra (numpy, soundfile).
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,205 @@
+"""
+Admission Control - Cost-based concurrency limits with bounded queueing
+Each request is admitted against a budget of in-flight cost (audio seconds for
+transcription, characters for synthesis). Work that does not fit waits in a
+bounded FIFO queue; beyond that, or after waiting too long, it is rejected
+with a Retry-After derived from the observed drain rate, so overload turns
+into fast 429s instead of a growing backlog where every request times out.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Completions kept for the drain-rate estimate (seconds)
+_DRAIN_WINDOW = 30.0
+
+# Bounds for the Retry-After hint (seconds)
+_MIN_RETRY_AFTER = 1
+_MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request can neither be admitted nor queued"""
+
+    def __init__(self, name: str, retry_after: int, reason: str):
+        super().__init__(f"{name} is overloaded ({reason}); retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionTicket:
+    """Admitted cost; release() returns it to the budget exactly once"""
+
+    def __init__(self, controller: "AdmissionController", cost: float):
+        self._controller = controller
+        self.cost = cost
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self.cost)
+
+
+class AdmissionController:
+    """
+    Admission controller for one class of work
+
+    Runs on a single event loop (no locking). A budget <= 0 disables
+    admission control. A request costing more than the whole budget is
+    clamped to the budget, so it still runs, just alone. `clock` times
+    completions for the drain-rate estimate.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        budget: float,
+        max_queue: int,
+        queue_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._clock = clock
+        self.budget = budget
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._in_use = 0.0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+        self._completions: Deque[Tuple[float, float]] = deque()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    async def acquire(self, cost: float) -> AdmissionTicket:
+        """
+        Admit a request, waiting in the queue if the budget is exhausted
+
+        Args:
+            cost: Estimated cost of the request in budget units
+
+        Returns:
+            Ticket to release when the work is finished
+
+        Raises:
+            AdmissionRejectedError: The queue is full or the wait exceeded queue_timeout
+        """
+        if not self.enabled:
+            return AdmissionTicket(self, 0.0)
+
+        cost = min(max(cost, 0.0), self.budget)
+        if not self._waiters and self._in_use + cost <= self.budget:
+            self._in_use += cost
+            self.admitted += 1
+            return AdmissionTicket(self, cost)
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejectedError(self.name, self.retry_after(cost), "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (cost, future)
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.timed_out += 1
+            raise AdmissionRejectedError(self.name, self.retry_after(cost), "queue timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller went away
+                self._release(cost)
+            else:
+                self._discard(waiter)
+            raise
+
+        self.admitted += 1
+        return AdmissionTicket(self, cost)
+
+    @asynccontextmanager
+    async def admit(self, cost: float) -> AsyncIterator[AdmissionTicket]:
+        """Context manager form of acquire()/release()"""
+        ticket = await self.acquire(cost)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _discard(self, waiter: Tuple[float, asyncio.Future]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        # A large waiter leaving the head of the queue may unblock smaller ones
+        self._grant()
+
+    def _release(self, cost: float) -> None:
+        self._in_use = max(0.0, self._in_use - cost)
+        now = self._clock()
+        self._completions.append((now, cost))
+        while self._completions and now - self._completions[0][0] > _DRAIN_WINDOW:
+            self._completions.popleft()
+        self._grant()
+
+    def _grant(self) -> None:
+        """Admit queued requests in FIFO order while they fit"""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._in_use + cost > self.budget:
+                break
+            self._waiters.popleft()
+            self._in_use += cost
+            future.set_result(None)
+
+    def drain_rate(self) -> float:
+        """Completed cost per second over the recent window"""
+        now = self._clock()
+        while self._completions and now - self._completions[0][0] > _DRAIN_WINDOW:
+            self._completions.popleft()
+        if not self._completions:
+            return 0.0
+        span = max(1.0, now - self._completions[0][0])
+        return sum(cost for _, cost in self._completions) / span
+
+    def retry_after(self, cost: float = 0.0) -> int:
+        """Seconds until enough of the current backlog drains to admit `cost`"""
+        queued = sum(waiter_cost for waiter_cost, _ in self._waiters)
+        backlog = self._in_use + queued + cost - self.budget
+        rate = self.drain_rate()
+        if rate > 0:
+            seconds = backlog / rate
+        else:
+            seconds = self.queue_timeout
+        return int(min(_MAX_RETRY_AFTER, max(_MIN_RETRY_AFTER, math.ceil(seconds))))
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "budget": self.budget,
+            "in_use": round(self._in_use, 3),
+            "queued": len(self._waiters),
+            "queued_cost": round(sum(cost for cost, _ in self._waiters), 3),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "drain_rate": round(self.drain_rate(), 3),
+        }
@@ -0,0 +1,175 @@
+"""
+Audio assembly for multi-chunk synthesis
+Joins synthesized chunks into one preallocated buffer with silence trimming and
+a short equal-power crossfade at each boundary.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=16)
+def _fade_curves(length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Equal-power fade-out and fade-in curves of the given length"""
+    t = (np.arange(length, dtype=np.float32) + 0.5) / length * (np.pi / 2)
+    fade_out, fade_in = np.cos(t), np.sin(t)
+    fade_out.setflags(write=False)
+    fade_in.setflags(write=False)
+    return fade_out, fade_in
+
+
+def _as_mono(chunk: Any) -> np.ndarray:
+    """Model output (numpy array or torch tensor) as a 1-D float32 array, copying only if needed"""
+    if hasattr(chunk, "detach"):
+        chunk = chunk.detach().cpu().numpy()
+    return np.asarray(chunk).reshape(-1).astype(np.float32, copy=False)
+
+
+class AudioAssembler:
+    """
+    Assembles audio chunks into a single signal
+
+    assemble() sizes the output once all chunk lengths are known. append()
+    supports streaming by growing the buffer geometrically; view() returns the
+    assembled samples without copying, and take_settled() hands off the part
+    that later chunks can no longer change so long renders stay bounded.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        crossfade_ms: float = 10.0,
+        trim_silence: bool = True,
+        silence_threshold: float = 1e-3,
+        keep_silence_ms: float = 40.0,
+    ):
+        self.sample_rate = sample_rate
+        self.crossfade = int(sample_rate * crossfade_ms / 1000)
+        self.trim_silence = trim_silence
+        self.silence_threshold = silence_threshold
+        self.keep_silence = int(sample_rate * keep_silence_ms / 1000)
+        self._buffer = np.empty(0, dtype=np.float32)
+        self._length = 0
+        self._last_start = 0
+        self._chunks = 0
+
+    def _bounds(self, audio: np.ndarray, trim_start: bool, trim_end: bool) -> Tuple[int, int]:
+        """Start/end indices after trimming boundary silence, keeping a short pad"""
+        start, end = 0, audio.size
+        if not self.trim_silence or audio.size == 0:
+            return start, end
+
+        voiced = np.flatnonzero(np.abs(audio) > self.silence_threshold)
+        if voiced.size == 0:
+            return start, end
+        if trim_start:
+            start = max(0, int(voiced[0]) - self.keep_silence)
+        if trim_end:
+            end = min(audio.size, int(voiced[-1]) + 1 + self.keep_silence)
+        return start, end
+
+    def _blend(self, out: np.ndarray, position: int, audio: np.ndarray) -> int:
+        """
+        Write audio into out at position, crossfading with the samples before it
+
+        Returns:
+            New write position
+        """
+        fade = min(self.crossfade, position, audio.size)
+        if fade > 0:
+            fade_out, fade_in = _fade_curves(fade)
+            overlap = out[position - fade : position]
+            overlap *= fade_out
+            overlap += audio[:fade] * fade_in
+        end = position - fade + audio.size
+        out[position:end] = audio[fade:]
+        return end
+
+    def assemble(self, chunks: Iterable[Any]) -> np.ndarray:
+        """
+        Join chunks into one preallocated array
+
+        Args:
+            chunks: Audio chunks in playback order
+
+        Returns:
+            Assembled float32 audio
+        """
+        arrays = [_as_mono(chunk) for chunk in chunks]
+        if not arrays:
+            return np.empty(0, dtype=np.float32)
+        if len(arrays) == 1:
+            return arrays[0]
+
+        last = len(arrays) - 1
+        trimmed: List[np.ndarray] = []
+        for i, audio in enumerate(arrays):
+            start, end = self._bounds(audio, trim_start=i > 0, trim_end=i < last)
+            trimmed.append(audio[start:end])
+
+        total = trimmed[0].size
+        for audio in trimmed[1:]:
+            total += audio.size - min(self.crossfade, total, audio.size)
+
+        out = np.empty(total, dtype=np.float32)
+        position = trimmed[0].size
+        out[:position] = trimmed[0]
+        for audio in trimmed[1:]:
+            position = self._blend(out, position, audio)
+
+        logger.debug(f"Assembled {len(arrays)} chunks into {total} samples")
+        return out
+
+    def append(self, chunk: Any) -> None:
+        """
+        Append a chunk in streaming mode
+
+        Trailing silence of the audio assembled so far is trimmed when the next
+        chunk arrives, so view() may shrink by at most the trimmed silence.
+        """
+        audio = _as_mono(chunk)
+        if self._chunks > 0:
+            # Only the previous chunk's region can end in silence
+            _, tail_end = self._bounds(
+                self._buffer[self._last_start : self._length], trim_start=False, trim_end=True
+            )
+            self._length = self._last_start + tail_end
+            start, end = self._bounds(audio, trim_start=True, trim_end=False)
+            audio = audio[start:end]
+
+        required = self._length + audio.size
+        if required > self._buffer.size:
+            grown = np.empty(max(required, 2 * self._buffer.size), dtype=np.float32)
+            grown[: self._length] = self._buffer[: self._length]
+            self._buffer = grown
+
+        self._last_start = self._length
+        self._length = self._blend(self._buffer, self._length, audio)
+        self._chunks += 1
+
+    def view(self) -> np.ndarray:
+        """Zero-copy view of the samples assembled by append()"""
+        return self._buffer[: self._length]
+
+    def take_settled(self) -> np.ndarray:
+        """
+        Remove and return the samples that later append() calls cannot change
+
+        Trimming only shortens the last appended chunk, and the next chunk
+        crossfades into at most `crossfade` samples before its start, so
+        everything up to one crossfade before the last chunk is final.
+        Afterwards the buffer holds just that crossfade window and the last
+        chunk.
+        """
+        cut = max(0, self._last_start - self.crossfade)
+        settled = self._buffer[:cut].copy()
+        remaining = self._length - cut
+        self._buffer[:remaining] = self._buffer[cut : self._length]
+        self._length = remaining
+        self._last_start -= cut
+        return settled
@@ -0,0 +1,368 @@
+"""
+Audio encoding utilities
+Encodes PCM audio to WAV/FLAC/MP3/Opus/AAC/raw PCM entirely in memory.
+Compressed formats are piped through an ffmpeg subprocess (stdin -> stdout),
+so no temporary files are written.
+"""
+
+import io
+import logging
+import shutil
+import struct
+import subprocess
+import threading
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+import soundfile as sf
+
+from opentalker_common.codecs import (  # noqa: F401 (re-exported)
+    DEFAULT_BITRATES,
+    FFMPEG_FORMATS,
+    OPUS_SAMPLE_RATES,
+    STREAM_READ_SIZE,
+    encoded_sample_rate,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Formats written by soundfile into a memory buffer
+SOUNDFILE_FORMATS = {
+    "wav": "WAV",
+    "flac": "FLAC",
+}
+
+# Raw 16-bit little-endian PCM without a container (OpenAI "pcm")
+RAW_FORMATS = ("pcm",)
+
+SUPPORTED_FORMATS = tuple(SOUNDFILE_FORMATS) + tuple(FFMPEG_FORMATS) + RAW_FORMATS
+
+# Formats whose stream can be extended by appending a second encoder's output
+CONTINUABLE_FORMATS = ("wav", "pcm", "mp3", "aac")
+
+# Sample encodings for wav and raw pcm output (G.711 mu-law/A-law for telephony)
+SAMPLE_FORMATS = ("pcm16", "mulaw", "alaw")
+_WAV_SUBTYPES = {"pcm16": "PCM_16", "mulaw": "ULAW", "alaw": "ALAW"}
+
+# G.711 segment end points (14-bit magnitude for mu-law, 13-bit for A-law)
+_ULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEG_END = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+@lru_cache(maxsize=1)
+def _ffmpeg_binary() -> str:
+    """Locate the ffmpeg executable"""
+    path = shutil.which("ffmpeg")
+    if path is None:
+        raise RuntimeError("ffmpeg not found. Please install ffmpeg to encode mp3/opus/aac")
+    return path
+
+
+def to_float32(audio_data: Any) -> np.ndarray:
+    """
+    Convert model output to a float32 array shaped (frames,) or (frames, channels)
+
+    Args:
+        audio_data: numpy array or torch tensor
+
+    Returns:
+        Contiguous float32 numpy array
+    """
+    if hasattr(audio_data, "detach"):
+        audio_data = audio_data.detach().cpu().numpy()
+
+    audio = np.asarray(audio_data)
+    if sum(size > 1 for size in audio.shape) <= 1:
+        # Mono, possibly with batch/channel axes of size 1. Flatten rather than
+        # squeeze so a 1-sample chunk stays (1,) instead of becoming 0-d.
+        audio = audio.reshape(-1)
+    else:
+        audio = np.squeeze(audio)
+        if audio.ndim == 2 and audio.shape[0] < audio.shape[1]:
+            # (channels, frames) -> (frames, channels)
+            audio = audio.T
+
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _channels(audio: np.ndarray) -> int:
+    return 1 if audio.ndim == 1 else audio.shape[1]
+
+
+def _ffmpeg_command(
+    format: str, sample_rate: int, channels: int, bitrate: Optional[str], continuation: bool = False
+) -> list:
+    """Build an ffmpeg command reading raw float32 PCM on stdin and writing to stdout"""
+    codec, muxer = FFMPEG_FORMATS[format]
+    command = [
+        _ffmpeg_binary(),
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "f32le",
+        "-ar",
+        str(sample_rate),
+        "-ac",
+        str(channels),
+        "-i",
+        "pipe:0",
+        "-c:a",
+        codec,
+        "-b:a",
+        bitrate or DEFAULT_BITRATES[format],
+    ]
+    output_rate = encoded_sample_rate(format, sample_rate)
+    if output_rate != sample_rate:
+        command += ["-ar", str(output_rate)]
+    if continuation and format == "mp3":
+        # No ID3 tag or Xing frame in the middle of an existing stream
+        command += ["-id3v2_version", "0", "-write_xing", "0"]
+    command += ["-f", muxer, "pipe:1"]
+    return command
+
+
+def encode_audio(
+    audio_data: Any,
+    sample_rate: int,
+    format: str = "wav",
+    bitrate: Optional[str] = None,
+    sample_format: str = "pcm16",
+) -> bytes:
+    """
+    Encode audio to bytes in the requested format
+
+    Args:
+        audio_data: Audio numpy array or torch tensor
+        sample_rate: Sample rate of audio_data
+        format: Output format (wav, flac, mp3, opus, aac, pcm)
+        bitrate: Bitrate for compressed formats (e.g. '64k'), None for default
+        sample_format: Sample encoding for wav/pcm (pcm16, mulaw, alaw)
+
+    Returns:
+        Encoded audio bytes
+    """
+    audio = to_float32(audio_data)
+
+    if sample_format not in SAMPLE_FORMATS:
+        raise ValueError(f"Unsupported sample format: {sample_format}")
+    if sample_format != "pcm16" and format not in ("wav", "pcm"):
+        raise ValueError(f"Sample format {sample_format} is only available for wav and pcm")
+
+    if format == "pcm":
+        return encode_samples(audio, sample_format)
+
+    if format in SOUNDFILE_FORMATS:
+        buffer = io.BytesIO()
+        subtype = _WAV_SUBTYPES[sample_format] if format == "wav" else None
+        sf.write(buffer, audio, sample_rate, format=SOUNDFILE_FORMATS[format], subtype=subtype)
+        return buffer.getvalue()
+
+    if format not in FFMPEG_FORMATS:
+        raise ValueError(f"Unsupported audio format: {format}")
+
+    # Hand the array's memory to ffmpeg without copying it into a bytes object
+    result = subprocess.run(
+        _ffmpeg_command(format, sample_rate, _channels(audio), bitrate),
+        input=memoryview(audio).cast("B"),
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg {format} encoding failed: {stderr}")
+
+    return result.stdout
+
+
+# Size of the canonical 16-bit PCM WAV header written by wav_header()
+WAV_HEADER_SIZE = 44
+
+
+def wav_header(sample_rate: int, channels: int, data_size: Optional[int] = None) -> bytes:
+    """
+    WAV header for 16-bit PCM
+
+    Args:
+        sample_rate: Sample rate
+        channels: Number of channels
+        data_size: Size of the PCM payload in bytes, None if unknown
+
+    Returns:
+        WAV_HEADER_SIZE header bytes. With an unknown length the size fields are
+        set to the maximum value, which players treat as "read until end of stream".
+    """
+    block_align = channels * 2
+    if data_size is None:
+        riff_size = data_size = 0xFFFFFFFF
+    else:
+        riff_size = data_size + WAV_HEADER_SIZE - 8
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVEfmt "
+        + struct.pack(
+            "<IHHIIHH", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, 16
+        )
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+def _to_int16(audio: np.ndarray) -> np.ndarray:
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def _to_pcm16(audio: np.ndarray) -> bytes:
+    return _to_int16(audio).astype("<i2", copy=False).tobytes()
+
+
+def _to_mulaw(audio: np.ndarray) -> bytes:
+    """G.711 mu-law encoding (bit-exact with the ITU reference implementation)"""
+    pcm = _to_int16(audio).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + 33
+    segment = np.searchsorted(_ULAW_SEG_END, magnitude)
+    value = np.where(
+        segment >= 8, 0x7F, (np.minimum(segment, 7) << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    )
+    return (value ^ mask).astype(np.uint8).tobytes()
+
+
+def _to_alaw(audio: np.ndarray) -> bytes:
+    """G.711 A-law encoding (bit-exact with the ITU reference implementation)"""
+    pcm = _to_int16(audio).astype(np.int32) >> 3
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    magnitude = np.where(pcm >= 0, pcm, -pcm - 1)
+    segment = np.searchsorted(_ALAW_SEG_END, magnitude)
+    shift = np.where(segment < 2, 1, segment)
+    value = np.where(
+        segment >= 8, 0x7F, (np.minimum(segment, 7) << 4) | ((magnitude >> shift) & 0x0F)
+    )
+    return (value ^ mask).astype(np.uint8).tobytes()
+
+
+def encode_samples(audio_data: Any, sample_format: str = "pcm16") -> bytes:
+    """
+    Encode audio as headerless samples
+
+    Args:
+        audio_data: Audio numpy array or torch tensor
+        sample_format: pcm16 (16-bit little-endian), mulaw or alaw (8-bit G.711)
+
+    Returns:
+        Raw sample bytes
+    """
+    audio = to_float32(audio_data)
+    if sample_format == "pcm16":
+        return _to_pcm16(audio)
+    if sample_format == "mulaw":
+        return _to_mulaw(audio)
+    if sample_format == "alaw":
+        return _to_alaw(audio)
+    raise ValueError(f"Unsupported sample format: {sample_format}")
+
+
+def iter_encode_audio(
+    chunks: Iterable[Any],
+    sample_rate: int,
+    format: str = "wav",
+    bitrate: Optional[str] = None,
+    continuation: bool = False,
+) -> Iterator[bytes]:
+    """
+    Encode a stream of audio chunks, yielding encoded bytes as they are produced
+
+    Args:
+        chunks: Iterable of audio arrays/tensors at the same sample rate
+        sample_rate: Sample rate of the chunks
+        format: Output format (wav, flac, mp3, opus, aac, pcm)
+        bitrate: Bitrate for compressed formats, None for default
+        continuation: Output is appended to an earlier stream of the same format,
+            so no container header is written (wav, pcm, mp3 and aac only)
+
+    Yields:
+        Encoded audio bytes
+    """
+    if continuation and format not in CONTINUABLE_FORMATS:
+        raise ValueError(f"Cannot continue a {format} stream")
+
+    if format == "pcm":
+        for chunk in chunks:
+            yield _to_pcm16(to_float32(chunk))
+        return
+
+    if format == "wav":
+        header_sent = continuation
+        for chunk in chunks:
+            audio = to_float32(chunk)
+            if not header_sent:
+                yield wav_header(sample_rate, _channels(audio))
+                header_sent = True
+            yield _to_pcm16(audio)
+        return
+
+    if format in SOUNDFILE_FORMATS:
+        # FLAC needs a seekable target; encode once at the end
+        arrays = [to_float32(chunk) for chunk in chunks]
+        if arrays:
+            yield encode_audio(np.concatenate(arrays), sample_rate, format)
+        return
+
+    if format not in FFMPEG_FORMATS:
+        raise ValueError(f"Unsupported audio format: {format}")
+
+    iterator = iter(chunks)
+    first = next(iterator, None)
+    if first is None:
+        return
+    first = to_float32(first)
+
+    process = subprocess.Popen(
+        _ffmpeg_command(format, sample_rate, _channels(first), bitrate, continuation),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    writer_error = []
+
+    def _feed() -> None:
+        try:
+            process.stdin.write(memoryview(first).cast("B"))
+            for chunk in iterator:
+                process.stdin.write(memoryview(to_float32(chunk)).cast("B"))
+        except Exception as e:
+            writer_error.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=_feed, name="ffmpeg-feed", daemon=True)
+    writer.start()
+
+    finished = False
+    try:
+        while True:
+            data = process.stdout.read1(STREAM_READ_SIZE)
+            if not data:
+                break
+            yield data
+        finished = True
+    finally:
+        if not finished:
+            # Consumer went away; stop the encoder so the feeder thread unblocks
+            process.kill()
+        writer.join()
+        process.stdout.close()
+        stderr = process.stderr.read().decode("utf-8", errors="replace").strip()
+        process.stderr.close()
+        returncode = process.wait()
+
+    if writer_error:
+        raise writer_error[0]
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg {format} encoding failed: {stderr}")
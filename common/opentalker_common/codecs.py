@@ -0,0 +1,32 @@
+"""
+Codec tables - ffmpeg codecs, bitrates and Opus sample rates
+Shared by the in-process encoder (audio_encoder) and the gateway's ffmpeg
+transcoder. Standard library only, so the gateway can import it without the
+audio extra.
+"""
+
+# Formats encoded by ffmpeg: (codec, muxer)
+FFMPEG_FORMATS = {
+    "mp3": ("libmp3lame", "mp3"),
+    "opus": ("libopus", "ogg"),
+    "aac": ("aac", "adts"),
+}
+
+DEFAULT_BITRATES = {
+    "mp3": "128k",
+    "opus": "64k",
+    "aac": "128k",
+}
+
+# Sample rates accepted by libopus
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# Bytes read from the encoder per streamed chunk
+STREAM_READ_SIZE = 64 * 1024
+
+
+def encoded_sample_rate(format: str, sample_rate: int) -> int:
+    """Sample rate of the encoded output (Opus falls back to 48 kHz for unsupported rates)"""
+    if format == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+        return 48000
+    return sample_rate
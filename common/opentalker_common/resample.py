@@ -0,0 +1,88 @@
+"""
+Resampling - Vectorized polyphase sample-rate conversion
+Converts between arbitrary integer sample rates with a Kaiser-windowed sinc
+filter. The polyphase filter bank for each reduced up/down ratio is built once
+and cached, so repeated conversions (e.g. 24 kHz -> 8 kHz for telephony) only
+pay for the filtering itself.
+"""
+
+import logging
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Filter half-length in input-rate zero crossings, and Kaiser window shape
+_ZERO_CROSSINGS = 10
+_KAISER_BETA = 5.0
+
+# Output samples computed per vectorized block (bounds temporary memory)
+_BLOCK_SIZE = 16384
+
+
+@lru_cache(maxsize=16)
+def _filter_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """
+    Polyphase anti-aliasing filter bank for an up/down ratio
+
+    Returns:
+        Tuple of (bank, half_taps). bank has shape (up, 2 * half_taps + 1);
+        row p holds the taps applied to input samples base - half_taps ...
+        base + half_taps for outputs whose upsampled position has phase p.
+    """
+    max_rate = max(up, down)
+    half_taps = -(-_ZERO_CROSSINGS * max_rate // up)
+    half_length = half_taps * up
+
+    # Prototype low-pass at the upsampled rate, cutoff at the lower Nyquist
+    m = np.arange(-half_length, half_length + up, dtype=np.float64)
+    window = np.kaiser(2 * half_length + 1, _KAISER_BETA)
+    window = np.concatenate([window, np.zeros(up - 1)])
+    prototype = up * np.sinc(m / max_rate) / max_rate * window
+
+    # Row p, column i: prototype at m = p + (half_taps - i) * up
+    phases = np.arange(up)[:, None]
+    offsets = (half_taps - np.arange(2 * half_taps + 1))[None, :] * up
+    bank = prototype[phases + offsets + half_length].astype(np.float32)
+    bank.setflags(write=False)
+    return bank, half_taps
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Resample mono audio
+
+    Args:
+        audio: 1-D float32 audio
+        orig_sr: Sample rate of audio
+        target_sr: Desired sample rate
+
+    Returns:
+        float32 audio at target_sr (the input itself if the rates match)
+    """
+    if orig_sr == target_sr or audio.size == 0:
+        return audio
+    if orig_sr <= 0 or target_sr <= 0:
+        raise ValueError(f"Invalid sample rates: {orig_sr} -> {target_sr}")
+
+    divisor = gcd(orig_sr, target_sr)
+    up, down = target_sr // divisor, orig_sr // divisor
+    bank, half_taps = _filter_bank(up, down)
+
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    padded = np.pad(audio, half_taps)
+    windows = sliding_window_view(padded, bank.shape[1])
+
+    n_out = -(-audio.size * up // down)
+    out = np.empty(n_out, dtype=np.float32)
+    for start in range(0, n_out, _BLOCK_SIZE):
+        positions = np.arange(start, min(n_out, start + _BLOCK_SIZE), dtype=np.int64) * down
+        base, phase = np.divmod(positions, up)
+        out[start : start + positions.size] = np.einsum("ij,ij->i", windows[base], bank[phase])
+
+    logger.debug(f"Resampled {audio.size} samples {orig_sr}Hz -> {n_out} samples {target_sr}Hz")
+    return out
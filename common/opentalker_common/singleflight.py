@@ -0,0 +1,156 @@
+"""
+Single Flight - In-flight request coalescing
+Concurrent calls with the same key share one execution: the first caller
+starts the work and later callers attach to it until it finishes, so
+identical requests (client retries, fan-out of the same announcement) cost a
+single inference.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Stable key for a request
+
+    Args:
+        *parts: bytes (hashed as-is) or JSON-serializable values
+
+    Returns:
+        Hex SHA-256 digest over all parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key
+
+    The shared work runs in its own task and every caller waits on its own
+    future, so a caller that is cancelled (e.g. its client disconnected)
+    detaches without cancelling the work for the others. Results and
+    exceptions are delivered to every caller.
+
+    With attach, each caller receives attach(result) instead of the result.
+    attach runs for all callers at once when the work finishes, before any
+    of them resumes, so per-caller state derived from a shared result (e.g.
+    a subscription to a shared stream) exists before any caller acts on it.
+    A caller cancelled after its attach ran, and the result of work that
+    every caller left, are handed to detach.
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        attach: Optional[Callable[[Any], Any]] = None,
+        detach: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Request key (see request_key)
+            fn: Coroutine function performing the work
+            attach: Maps the shared result to this caller's value
+            detach: Releases a value returned by attach that no caller will use
+
+        Returns:
+            Tuple of (result, shared), shared True if this caller attached to
+            work started by another caller
+        """
+        if not self.enabled:
+            self.executions += 1
+            result = await fn()
+            return (attach(result) if attach is not None else result), False
+
+        waiters = self._waiters.get(key)
+        shared = waiters is not None
+        if waiters is None:
+            waiters = self._waiters[key] = []
+            self._calls[key] = asyncio.create_task(self._run(key, fn, attach, detach))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"{self.name}: coalesced request {key[:12]}")
+
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            return await waiter, shared
+        except asyncio.CancelledError:
+            # The value may have been attached just before the cancellation landed
+            if detach is not None and waiter.done() and not waiter.cancelled():
+                if waiter.exception() is None:
+                    await detach(waiter.result())
+            raise
+
+    async def _run(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        attach: Optional[Callable[[Any], Any]],
+        detach: Optional[Callable[[Any], Awaitable[None]]],
+    ) -> None:
+        try:
+            result = await fn()
+        except BaseException as e:
+            waiters = self._finish(key)
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    waiter.cancel()
+                else:
+                    waiter.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        # Later callers start a new flight; everyone waiting now shares this result
+        waiters = [waiter for waiter in self._finish(key) if not waiter.done()]
+        if attach is None:
+            for waiter in waiters:
+                waiter.set_result(result)
+            return
+        for waiter in waiters:
+            try:
+                waiter.set_result(attach(result))
+            except Exception as e:
+                waiter.set_exception(e)
+        if not waiters and detach is not None:
+            # Every caller left: attach and detach once so the result is released
+            await detach(attach(result))
+
+    def _finish(self, key: str) -> List[asyncio.Future]:
+        del self._calls[key]
+        return self._waiters.pop(key)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
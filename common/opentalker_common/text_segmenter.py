@@ -0,0 +1,152 @@
+"""
+Text segmentation for TTS
+Splits input text into synthesis chunks at sentence boundaries (CJK and Latin),
+falling back to clause, word and finally character boundaries for sentences
+that exceed the chunk limit.
+"""
+
+import logging
+import re
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Split levels, coarsest first. Each pattern tiles the text completely so that
+# concatenating the matches reproduces the input.
+_SPLIT_PATTERNS = (
+    # Sentences: CJK terminators, or Latin terminators followed by whitespace
+    re.compile(
+        r".+?(?:[。！？；…]+[”’」』）)]*|[.!?;]+[\"'”’)\]]*(?=\s|$)|\n+|$)",
+        re.S,
+    ),
+    # Clauses: commas, colons, enumeration marks, dashes
+    re.compile(r".+?(?:[，、：,:]+|——|—|\s-\s|$)", re.S),
+    # Words: whitespace-separated tokens
+    re.compile(r"\s*\S+\s*|\s+", re.S),
+    # Characters (hard cut)
+    re.compile(r".", re.S),
+)
+
+
+class TextSegmenter:
+    """
+    Splits text into chunks sized for synthesis
+
+    The chunk limit is max_chunk_size until latency measurements arrive; after
+    that it targets chunks that render in about target_chunk_seconds, never
+    exceeding max_chunk_size. The first chunk of each text is capped at
+    first_chunk_size so the first audio is ready sooner.
+    """
+
+    def __init__(
+        self,
+        max_chunk_size: int,
+        first_chunk_size: int = 0,
+        target_chunk_seconds: float = 0.0,
+        min_chunk_size: int = 20,
+        ewma_alpha: float = 0.2,
+    ):
+        self.max_chunk_size = max_chunk_size
+        self.first_chunk_size = first_chunk_size
+        self.target_chunk_seconds = target_chunk_seconds
+        self.min_chunk_size = min_chunk_size
+        self._ewma_alpha = ewma_alpha
+        self._seconds_per_char: Optional[float] = None
+
+    def record_latency(self, chars: int, seconds: float) -> None:
+        """
+        Record a measured generation time
+
+        Args:
+            chars: Number of characters generated
+            seconds: Wall time the generation took
+        """
+        if chars <= 0 or seconds <= 0:
+            return
+        sample = seconds / chars
+        if self._seconds_per_char is None:
+            self._seconds_per_char = sample
+        else:
+            self._seconds_per_char += self._ewma_alpha * (sample - self._seconds_per_char)
+
+    @property
+    def seconds_per_char(self) -> Optional[float]:
+        """Smoothed generation latency per character, None until measured"""
+        return self._seconds_per_char
+
+    @property
+    def chunk_size(self) -> int:
+        """Current chunk limit"""
+        if self.target_chunk_seconds <= 0 or not self._seconds_per_char:
+            return self.max_chunk_size
+        derived = int(self.target_chunk_seconds / self._seconds_per_char)
+        return max(self.min_chunk_size, min(self.max_chunk_size, derived))
+
+    def segment(self, text: str) -> List[str]:
+        """
+        Split text into chunks
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of non-empty chunks in reading order
+        """
+        limit = self.chunk_size
+        if limit <= 0:
+            return [text]
+
+        first_limit = limit
+        if 0 < self.first_chunk_size < limit:
+            first_limit = max(self.min_chunk_size, self.first_chunk_size)
+
+        if len(text) <= first_limit:
+            return [text]
+
+        chunks: List[str] = []
+        current = self._pack(text, 0, chunks, "", first_limit, limit)
+        if current.strip():
+            chunks.append(current)
+
+        chunks = [chunk.strip() for chunk in chunks if chunk.strip()]
+        logger.info(f"Split text ({len(text)} chars) into {len(chunks)} chunks (limit={limit})")
+        return chunks
+
+    def _pack(
+        self,
+        text: str,
+        level: int,
+        chunks: List[str],
+        current: str,
+        first_limit: int,
+        limit: int,
+    ) -> str:
+        """
+        Greedily pack pieces of text into chunks, descending to finer split
+        levels only for pieces that do not fit on their own
+
+        Returns:
+            The partially filled chunk still being built
+        """
+        for match in _SPLIT_PATTERNS[level].finditer(text):
+            piece = match.group()
+            if not piece:
+                continue
+
+            chunk_limit = limit if chunks else first_limit
+            if len(current) + len(piece) <= chunk_limit:
+                current += piece
+                continue
+
+            if current.strip():
+                chunks.append(current)
+                current = ""
+                chunk_limit = limit
+
+            if len(piece) <= chunk_limit:
+                current = piece
+            else:
+                current = self._pack(piece, level + 1, chunks, current, first_limit, limit)
+
+        return current
@@ -0,0 +1,358 @@
+"""
+Load Balancer - Replica selection for horizontally scaled backends
+Tracks in-flight requests and EWMA latency per replica and picks a replica by
+least outstanding requests or power-of-two-choices. Replicas that keep failing
+are ejected passively and re-admitted once a health probe succeeds; replicas
+whose latest health probe was not healthy are skipped as well. The
+consistent_hash policy routes requests with a routing key (the TTS voice) to
+the key's replica on a hash ring, spilling over along the ring when that
+replica is above its bounded share of the load, so per-voice caches stay on
+few replicas. The residency policy is for monolith (app/main.py) replicas,
+which swap between the STT and TTS model: requests go to replicas that
+already hold the model they need, and a replica is only switched when none
+does or those that do are above their bounded share of the load.
+"""
+
+import bisect
+import hashlib
+import logging
+import math
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BALANCER_POLICIES = ("p2c", "least_outstanding", "consistent_hash", "residency")
+
+# Weight of the newest latency sample in the EWMA
+_EWMA_ALPHA = 0.3
+
+# Among equally loaded replicas, skip one whose EWMA latency exceeds the
+# fastest by this factor and margin (the margin keeps millisecond-level
+# noise from pinning traffic to one replica)
+_SLOW_FACTOR = 2.0
+_SLOW_MARGIN = 0.05
+
+
+class Replica:
+    """One backend replica and its load/health counters"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.ewma_latency: Optional[float] = None
+        self.ejected = False
+        # Latest result from the health monitor (None until first probed)
+        self.health: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.probe_latency: Optional[float] = None
+        # Set by the owning BackendClient when its pool is started
+        self.transport = None
+        self.client = None
+
+    @property
+    def available(self) -> bool:
+        return not self.ejected and self.health in (None, "healthy")
+
+    def record_health(self, status: str, latency: float) -> None:
+        self.health = status
+        self.checked_at = time.time()
+        self.probe_latency = latency
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "health": self.health,
+            "ejected": self.ejected,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ewma_latency_ms": (
+                round(self.ewma_latency * 1000, 3) if self.ewma_latency is not None else None
+            ),
+        }
+
+
+def _ring_hash(value: str) -> int:
+    """Stable 64-bit hash, so every gateway instance builds the same ring"""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ResidencyTable:
+    """
+    Resident model and queue depth of monolith replicas
+
+    Shared by the STT and TTS pools, which list the same replica URLs, so
+    both see one state per replica: the model it reported (or the one the
+    gateway last switched it to) and its load across both pools.
+    """
+
+    def __init__(self):
+        self.models: Dict[str, Optional[str]] = {}
+        self.queue_depths: Dict[str, int] = {}
+        self._pools: List["ReplicaPool"] = []
+
+    def register(self, pool: "ReplicaPool") -> None:
+        self._pools.append(pool)
+
+    def record(self, url: str, model: Optional[str], queue_depth: int) -> None:
+        """Store a replica's reported resident model ("stt", "tts" or "none") and queue depth"""
+        self.models[url] = model
+        self.queue_depths[url] = queue_depth
+
+    def load(self, replica: Replica) -> int:
+        """
+        Requests on a replica: the larger of the gateway's in-flight count
+        across all pools and the queue depth the replica last reported
+        """
+        in_flight = sum(
+            other.in_flight
+            for pool in self._pools
+            for other in pool.replicas
+            if other.url == replica.url
+        )
+        return max(in_flight, self.queue_depths.get(replica.url, 0))
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            url: {"model": model, "queue_depth": self.queue_depths.get(url, 0)}
+            for url, model in self.models.items()
+        }
+
+
+class ReplicaPool:
+    """
+    Replica set for one backend service
+
+    Selection only considers available replicas (not ejected, last probe
+    healthy or not yet probed); if no replica is available the pool fails
+    open and picks among all of them, so a transient outage does not turn
+    into a hard gateway error.
+
+    With consistent_hash each replica owns
+    `virtual_nodes` points on a hash ring and no replica takes more than
+    `load_factor` times the average in-flight load (consistent hashing with
+    bounded loads); requests without a routing key go to the least loaded
+    replica.
+
+    With residency the pool's name is the model its requests need ("stt" or
+    "tts"). The least loaded replica holding that model is picked while it is
+    under `load_factor` times the average load; otherwise the least loaded
+    replica is switched, preferring one with no model loaded, and recorded as
+    holding the model so the requests that follow do not switch others too.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        policy: str = "p2c",
+        eject_failures: int = 3,
+        load_factor: float = 1.25,
+        virtual_nodes: int = 160,
+        residency: Optional[ResidencyTable] = None,
+    ):
+        if not urls:
+            raise ValueError(f"No replica URLs configured for {name}")
+        if policy not in BALANCER_POLICIES:
+            raise ValueError(f"Unknown balancer policy: {policy}. Use one of {BALANCER_POLICIES}")
+        self.name = name
+        self.replicas = [Replica(url) for url in urls]
+        self.policy = policy
+        self.eject_failures = max(1, eject_failures)
+        self.load_factor = max(1.0, load_factor)
+        self._ring: List[Tuple[int, Replica]] = sorted(
+            (
+                (_ring_hash(f"{replica.url}#{point}"), replica)
+                for replica in self.replicas
+                for point in range(max(1, virtual_nodes))
+            ),
+            key=lambda entry: entry[0],
+        )
+        self._ring_keys = [point for point, _ in self._ring]
+        self.affinity_routed = 0
+        self.affinity_spilled = 0
+        self.residency: Optional[ResidencyTable] = None
+        if policy == "residency":
+            self.residency = residency or ResidencyTable()
+            self.residency.register(self)
+        self.residency_routed = 0
+        self.residency_switches = 0
+
+    def pick(self, key: Optional[str] = None) -> Replica:
+        """
+        Choose the replica for the next request
+
+        Args:
+            key: Routing key for the consistent_hash policy (ignored otherwise)
+        """
+        candidates = [replica for replica in self.replicas if replica.available]
+        if not candidates:
+            candidates = self.replicas
+        if self.policy == "consistent_hash" and key is not None:
+            return self._pick_hashed(candidates, key)
+        if self.policy == "residency":
+            return self._pick_resident(candidates)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if self.policy in ("least_outstanding", "consistent_hash"):
+            return self._least_loaded(candidates)
+        # Power of two choices: the less loaded of two random replicas
+        return self._least_loaded(random.sample(candidates, 2))
+
+    def _pick_hashed(self, candidates: List[Replica], key: str) -> Replica:
+        """First replica clockwise from the key's ring point that is under its load bound"""
+        # Bound counts the request being placed, so the average is always under it
+        total = sum(replica.in_flight for replica in candidates) + 1
+        capacity = math.ceil(self.load_factor * total / len(candidates))
+        eligible = set(map(id, candidates))
+
+        self.affinity_routed += 1
+        start = bisect.bisect(self._ring_keys, _ring_hash(key))
+        owner = None
+        for offset in range(len(self._ring)):
+            replica = self._ring[(start + offset) % len(self._ring)][1]
+            if id(replica) not in eligible:
+                continue
+            if owner is None:
+                owner = replica
+            if replica.in_flight < capacity:
+                if replica is not owner:
+                    self.affinity_spilled += 1
+                return replica
+        # Unreachable (some candidate is always under the bound); keep the owner
+        return owner
+
+    def _pick_resident(self, candidates: List[Replica]) -> Replica:
+        """Least loaded replica holding the pool's model, switching one only when needed"""
+        table = self.residency
+        self.residency_routed += 1
+        resident = [replica for replica in candidates if table.models.get(replica.url) == self.name]
+        if resident:
+            replica = self._least_loaded(resident, table.load)
+            total = sum(table.load(candidate) for candidate in candidates) + 1
+            if table.load(replica) < math.ceil(self.load_factor * total / len(candidates)):
+                return replica
+            others = [candidate for candidate in candidates if candidate not in resident]
+            if not others:
+                return replica
+            candidates = others
+
+        # Switching a replica with no model loaded unloads nothing
+        empty = [
+            replica for replica in candidates if table.models.get(replica.url) in (None, "none")
+        ]
+        replica = self._least_loaded(empty or candidates, table.load)
+        table.models[replica.url] = self.name
+        self.residency_switches += 1
+        logger.info(f"Switching {replica.url} to {self.name}")
+        return replica
+
+    def pick_other(self, replica: Replica) -> Optional[Replica]:
+        """Choose an available replica other than `replica`, None if there is none"""
+        candidates = [
+            candidate
+            for candidate in self.replicas
+            if candidate is not replica and candidate.available
+        ]
+        if not candidates:
+            return None
+        return self._least_loaded(candidates)
+
+    @staticmethod
+    def _least_loaded(
+        candidates: List[Replica], load: Optional[Callable[[Replica], int]] = None
+    ) -> Replica:
+        """
+        Fewest in-flight requests (or lowest `load`); ties go to a random
+        replica that is not markedly slow
+        """
+        load = load or (lambda replica: replica.in_flight)
+        fewest = min(load(replica) for replica in candidates)
+        tied = [replica for replica in candidates if load(replica) == fewest]
+
+        latencies = [replica.ewma_latency for replica in tied if replica.ewma_latency is not None]
+        if latencies:
+            fastest = min(latencies)
+            limit = max(fastest * _SLOW_FACTOR, fastest + _SLOW_MARGIN)
+            tied = [
+                replica
+                for replica in tied
+                if replica.ewma_latency is None or replica.ewma_latency <= limit
+            ]
+        return random.choice(tied)
+
+    def begin(self, replica: Replica) -> None:
+        """Mark a request as in flight on a replica"""
+        replica.in_flight += 1
+        replica.requests += 1
+
+    def end(self, replica: Replica, latency: Optional[float] = None, failed: bool = False) -> None:
+        """
+        Record the outcome of a request started with begin()
+
+        Args:
+            replica: Replica the request went to
+            latency: Observed latency in seconds, None if it should not be sampled
+            failed: Whether the replica failed to serve it (transport error or
+                gateway-class 5xx); consecutive failures eject the replica
+        """
+        replica.in_flight = max(0, replica.in_flight - 1)
+        if failed:
+            replica.errors += 1
+            replica.consecutive_failures += 1
+            if not replica.ejected and replica.consecutive_failures >= self.eject_failures:
+                self.eject(replica)
+            return
+
+        replica.consecutive_failures = 0
+        if latency is None:
+            return
+        if replica.ewma_latency is None:
+            replica.ewma_latency = latency
+        else:
+            replica.ewma_latency += _EWMA_ALPHA * (latency - replica.ewma_latency)
+
+    def abandon(self, replica: Replica) -> None:
+        """Release a request that ended without a verdict (e.g. cancelled by the client)"""
+        replica.in_flight = max(0, replica.in_flight - 1)
+
+    def eject(self, replica: Replica) -> None:
+        replica.ejected = True
+        logger.warning(
+            f"Ejected {self.name} replica {replica.url} after "
+            f"{replica.consecutive_failures} consecutive failures"
+        )
+
+    def readmit(self, replica: Replica) -> None:
+        if not replica.ejected:
+            return
+        replica.ejected = False
+        replica.consecutive_failures = 0
+        logger.info(f"Re-admitted {self.name} replica {replica.url}")
+
+    def affinity_stats(self) -> Optional[Dict]:
+        """Keyed requests and how many spilled past their replica (consistent_hash only)"""
+        if self.policy != "consistent_hash":
+            return None
+        return {
+            "load_factor": self.load_factor,
+            "routed": self.affinity_routed,
+            "spilled": self.affinity_spilled,
+        }
+
+    def residency_stats(self) -> Optional[Dict]:
+        """Routed requests, model switches and replica residency (residency only)"""
+        if self.residency is None:
+            return None
+        return {
+            "load_factor": self.load_factor,
+            "routed": self.residency_routed,
+            "switches": self.residency_switches,
+            "replicas": self.residency.stats(),
+        }
@@ -0,0 +1,141 @@
+"""
+Response Broadcast - Fan one streamed upstream response out to several clients
+Used for coalesced requests: the upstream body is read once and every
+subscriber replays it from the start at its own pace. Chunks are dropped as
+soon as every subscriber has sent them, so a response is only held in memory
+as far as the slowest client lags behind the upstream.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Optional, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Unsent bytes buffered before the pump stops reading upstream (backpressure)
+_MAX_BUFFERED_BYTES = 1024 * 1024
+
+
+class Subscription:
+    """One client's view of a broadcast; close() is idempotent"""
+
+    def __init__(self, broadcast: "ResponseBroadcast"):
+        self._broadcast = broadcast
+        self._closed = False
+        # Index of the next chunk to send, counted from the start of the body
+        self.position = 0
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._broadcast._replay(self):
+                yield chunk
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self._broadcast._detach(self)
+
+
+class ResponseBroadcast:
+    """
+    Streamed upstream response shared by several subscribers
+
+    A pump task reads the upstream body as it arrives into a window of
+    chunks that are not yet sent to every subscriber; it pauses once the
+    window exceeds _MAX_BUFFERED_BYTES. Subscribers must attach before any of
+    them starts streaming, since chunks already sent by every subscriber are
+    gone: coalesced callers are all subscribed by SingleFlight's attach hook
+    the moment the shared request returns, before any of them resumes. Subscribers that disconnect simply detach; when the last one
+    detaches before the body is complete, the pump is cancelled and the
+    upstream response closed, so an abandoned request still stops upstream.
+    """
+
+    def __init__(self, response: httpx.Response, on_close: Callable[[], Awaitable[None]]):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self._response = response
+        self._on_close = on_close
+        self._chunks: Deque[bytes] = deque()
+        # Index of self._chunks[0] counted from the start of the body
+        self._first = 0
+        self._buffered = 0
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+        self._subscriptions: Set[Subscription] = set()
+        self._task = asyncio.create_task(self._pump())
+
+    def subscribe(self) -> Subscription:
+        """Attach a subscriber (call once per client, before streaming starts)"""
+        if self._first > 0:
+            raise RuntimeError("Broadcast already discarded the start of the response")
+        subscription = Subscription(self)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    async def _pump(self) -> None:
+        try:
+            async for chunk in self._response.aiter_raw():
+                self._chunks.append(chunk)
+                self._buffered += len(chunk)
+                self._notify()
+                while self._buffered > _MAX_BUFFERED_BYTES:
+                    await self._changed.wait()
+        except asyncio.CancelledError:
+            self._error = ConnectionAbortedError("Upstream response abandoned")
+            raise
+        except Exception as e:
+            logger.warning(f"Upstream stream failed: {e}")
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+            await self._on_close()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _replay(self, subscription: Subscription) -> AsyncIterator[bytes]:
+        while True:
+            index = subscription.position - self._first
+            if index < len(self._chunks):
+                chunk = self._chunks[index]
+                yield chunk
+                subscription.position += 1
+                self._trim()
+                continue
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            await self._changed.wait()
+
+    def _trim(self) -> None:
+        """Drop chunks every subscriber has sent and wake a paused pump"""
+        if not self._subscriptions:
+            return
+        sent = min(subscription.position for subscription in self._subscriptions)
+        trimmed = False
+        while self._first < sent:
+            self._buffered -= len(self._chunks.popleft())
+            self._first += 1
+            trimmed = True
+        if trimmed:
+            self._notify()
+
+    async def _detach(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        if not self._subscriptions and not self._done:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            return
+        self._trim()
@@ -0,0 +1,189 @@
+"""
+Circuit Breaker - Fast failure for backends that are down or stuck
+Tracks the error and timeout rate of each backend over a sliding window. When
+either crosses its threshold the circuit opens and requests fail immediately
+with 503 instead of waiting out the backend timeout; after a cool-down a
+limited number of trial requests decide whether it closes again.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a backend's circuit is open"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} circuit is open; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one backend
+
+    Closed: requests flow; outcomes are kept for `window` seconds and the
+    circuit opens once at least `min_requests` were seen and the failure
+    ratio (errors and timeouts) or the timeout ratio alone reaches its
+    threshold. Open: requests are refused for `open_seconds`. Half-open: up
+    to `half_open_requests` trial requests run concurrently; that many
+    successes close the circuit, any failure opens it again. `clock` supplies
+    the monotonic time used for the window and the cool-down.
+
+    Runs on a single event loop (no locking).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = True,
+        failure_ratio: float = 0.5,
+        timeout_ratio: float = 0.2,
+        min_requests: int = 10,
+        window: float = 60.0,
+        open_seconds: float = 15.0,
+        half_open_requests: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.failure_ratio = failure_ratio
+        self.timeout_ratio = timeout_ratio
+        self.min_requests = max(1, min_requests)
+        self.window = window
+        self.open_seconds = open_seconds
+        self.half_open_requests = max(1, half_open_requests)
+        self._clock = clock
+
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        # (finished_at, failed, timed_out) for requests completed while closed
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+            logger.info(f"{self.name} circuit half-open, allowing trial requests")
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Admit a request or refuse it
+
+        Returns:
+            True if the request is a half-open trial, to be passed back to
+            record()/abandon()
+
+        Raises:
+            CircuitOpenError: The circuit is open, or half-open with all trial
+                slots taken
+        """
+        if not self.enabled:
+            return False
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and self._trials < self.half_open_requests:
+            self._trials += 1
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after())
+
+    def record(self, trial: bool, failed: bool, timed_out: bool = False) -> None:
+        """
+        Record the outcome of a request admitted by allow()
+
+        Args:
+            trial: Value returned by allow()
+            failed: The backend failed to serve the request (transport error
+                or gateway-class 5xx)
+            timed_out: The failure was a timeout
+        """
+        if not self.enabled:
+            return
+        if trial:
+            self._trials = max(0, self._trials - 1)
+            if self._state != HALF_OPEN:
+                return
+            if failed:
+                self._open("trial request failed")
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_requests:
+                self._close()
+            return
+
+        if self._state != CLOSED:
+            return
+        now = self._clock()
+        self._outcomes.append((now, failed, timed_out))
+        self._expire(now)
+        total = len(self._outcomes)
+        if total < self.min_requests:
+            return
+        failures = sum(1 for _, failed, _ in self._outcomes if failed)
+        timeouts = sum(1 for _, _, timed_out in self._outcomes if timed_out)
+        if failures / total >= self.failure_ratio:
+            self._open(f"{failures}/{total} requests failed")
+        elif timeouts / total >= self.timeout_ratio:
+            self._open(f"{timeouts}/{total} requests timed out")
+
+    def abandon(self, trial: bool) -> None:
+        """Release a request that ended without a verdict (e.g. cancelled)"""
+        if trial:
+            self._trials = max(0, self._trials - 1)
+
+    def retry_after(self) -> int:
+        """Seconds until the circuit lets trial requests through (at least 1)"""
+        remaining = self.open_seconds - (self._clock() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    def _expire(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _open(self, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+        logger.warning(f"{self.name} circuit opened ({reason}) for {self.open_seconds}s")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+        logger.info(f"{self.name} circuit closed")
+
+    def stats(self) -> Dict:
+        state = self.state
+        self._expire(self._clock())
+        total = len(self._outcomes)
+        failures = sum(1 for _, failed, _ in self._outcomes if failed)
+        timeouts = sum(1 for _, _, timed_out in self._outcomes if timed_out)
+        retry_after: Optional[int] = self.retry_after() if state == OPEN else None
+        return {
+            "enabled": self.enabled,
+            "state": state,
+            "window_requests": total,
+            "window_failures": failures,
+            "window_timeouts": timeouts,
+            "retry_after": retry_after,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
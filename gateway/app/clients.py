@@ -0,0 +1,506 @@
+"""
+Backend Clients - Shared, pooled HTTP clients for the STT/TTS services
+One long-lived httpx.AsyncClient per backend replica, created in the app
+lifespan, so proxied requests reuse keep-alive connections instead of paying
+connection setup on every call. Requests are spread across replicas by the
+load balancer in app.balancer.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from opentalker_common.admission import AdmissionController
+from opentalker_common.singleflight import SingleFlight
+
+from app.balancer import Replica, ReplicaPool, ResidencyTable
+from app.circuit_breaker import CircuitBreaker
+from app.config import settings
+from app.hedging import HedgeBudget
+from app.inprocess import InProcessTransport, inprocess_services, is_inprocess
+
+logger = logging.getLogger(__name__)
+
+# Acquire/connect samples kept per backend for percentile reporting
+_SAMPLE_WINDOW = 1000
+
+# httpcore trace events marking the point a connection was obtained and the
+# request is about to go out on it
+_SEND_EVENTS = ("http11.send_request_headers.started", "http2.send_request_headers.started")
+
+# Upstream statuses that count against a replica's health (the replica is
+# down, overloaded or not ready, as opposed to rejecting the request itself)
+_REPLICA_FAILURE_STATUSES = (502, 503, 504)
+
+# Replica URLs with this scheme name a Unix domain socket, e.g.
+# unix:///run/opentalker/stt.sock
+_UDS_SCHEME = "unix://"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_target(url: str) -> Tuple[str, Optional[str]]:
+    """
+    Split a replica URL into the client base URL and Unix socket path
+
+    Returns:
+        (base_url, uds): uds is None for http(s) URLs; for unix:// URLs the
+        requests go over the socket, and for inprocess:// URLs to the hosted
+        app, with a placeholder host
+    """
+    if url.startswith(_UDS_SCHEME):
+        return "http://localhost", url[len(_UDS_SCHEME) :]
+    if is_inprocess(url):
+        return "http://localhost", None
+    return url, None
+
+
+def _percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _RequestTrace:
+    """Per-request httpcore trace hook measuring pool wait and connect time"""
+
+    def __init__(self, backend: "BackendClient"):
+        self._backend = backend
+        self._started = time.perf_counter()
+        self._connect_started: Optional[float] = None
+        self._connect_seconds = 0.0
+        self._acquired = False
+
+    async def __call__(self, event_name: str, info: Dict) -> None:
+        now = time.perf_counter()
+        if event_name == "connection.connect_tcp.started":
+            self._connect_started = now
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_started is not None:
+                self._connect_seconds = now - self._connect_started
+        elif event_name in _SEND_EVENTS and not self._acquired:
+            self._acquired = True
+            self._backend._record_acquire(
+                now - self._started - self._connect_seconds,
+                self._connect_seconds if self._connect_started is not None else None,
+            )
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response stream that reports back to the balancer when it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class BackendClient:
+    """
+    Pooled, load-balanced client for one backend service
+
+    Each replica gets its own keep-alive connection pool; every request is
+    routed to a replica chosen by the ReplicaPool and its outcome fed back for
+    in-flight/latency tracking and passive ejection. Acquire wait (time queued
+    for a free connection) and connect time are measured with httpcore trace
+    events on every request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        http2: bool = False,
+        policy: str = "p2c",
+        eject_failures: int = 3,
+        admission_budget: float = 0.0,
+        admission_max_queue: int = 0,
+        admission_queue_timeout: float = 30.0,
+        coalesce: bool = False,
+        hedge_budget: float = 0.0,
+        breaker: Optional[CircuitBreaker] = None,
+        load_factor: float = 1.25,
+        virtual_nodes: int = 160,
+        residency: Optional[ResidencyTable] = None,
+    ):
+        self.name = name
+        self.coalescer = SingleFlight(name, enabled=coalesce)
+        self.hedge_budget = HedgeBudget(hedge_budget)
+        self.breaker = breaker or CircuitBreaker(name, enabled=False)
+        self.admission = AdmissionController(
+            name,
+            budget=admission_budget,
+            max_queue=admission_max_queue,
+            queue_timeout=admission_queue_timeout,
+        )
+        self.pool = ReplicaPool(
+            name,
+            urls,
+            policy=policy,
+            eject_failures=eject_failures,
+            load_factor=load_factor,
+            virtual_nodes=virtual_nodes,
+            residency=residency,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._started = False
+        self._requests = 0
+        self._new_connections = 0
+        self._acquire_samples: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._connect_samples: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+        self._latency_samples: Deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+
+    @property
+    def replicas(self) -> List[Replica]:
+        return self.pool.replicas
+
+    @property
+    def monolith(self) -> bool:
+        """Whether the replicas are monoliths serving the OpenAI-compatible API"""
+        return self.pool.residency is not None
+
+    async def start(self) -> None:
+        """Create one pooled client per replica"""
+        if self._started:
+            return
+
+        http2 = self.http2
+        if http2 and not _http2_available():
+            logger.warning(
+                f"HTTP/2 requested for {self.name} backend but the 'h2' package is not "
+                f"installed (pip install httpx[http2]); using HTTP/1.1"
+            )
+            http2 = False
+
+        for replica in self.replicas:
+            base_url, uds = _client_target(replica.url)
+            if is_inprocess(replica.url):
+                replica.transport = InProcessTransport(inprocess_services.app(replica.url))
+            else:
+                replica.transport = httpx.AsyncHTTPTransport(
+                    limits=self.limits, http2=http2, uds=uds
+                )
+            replica.client = httpx.AsyncClient(
+                base_url=base_url,
+                transport=replica.transport,
+                timeout=self.timeout,
+            )
+        self._started = True
+
+        logger.info(
+            f"{self.name} client ready: {len(self.replicas)} replica(s) "
+            f"[{', '.join(replica.url for replica in self.replicas)}], "
+            f"policy={self.pool.policy}, max_connections={self.limits.max_connections}, "
+            f"keepalive={self.limits.max_keepalive_connections}, http2={http2}"
+        )
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        for replica in self.replicas:
+            if replica.client is not None:
+                await replica.client.aclose()
+            replica.client = None
+            replica.transport = None
+        self._started = False
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        stream: bool = False,
+        replica: Optional[Replica] = None,
+        routing_key: Optional[str] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request to the backend
+
+        Args:
+            method: HTTP method
+            path: Path relative to the replica base URL
+            stream: Return as soon as headers arrive; the body must then be
+                consumed or closed by the caller (the replica stays counted as
+                in flight until the response is closed)
+            replica: Send to this replica instead of letting the balancer choose
+            routing_key: Affinity key for the consistent_hash policy (e.g. the voice)
+            **kwargs: Passed to httpx (json, data, files, content, headers, timeout, ...)
+
+        Returns:
+            The response (buffered unless stream=True)
+
+        Raises:
+            CircuitOpenError: The backend's circuit breaker is open
+        """
+        if not self._started:
+            raise RuntimeError(f"{self.name} client is not started")
+
+        replica = replica or self.pool.pick(routing_key)
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = _RequestTrace(self)
+        request = replica.client.build_request(method, path, extensions=extensions, **kwargs)
+
+        trial = self.breaker.allow()
+        self._requests += 1
+        self.pool.begin(replica)
+        started = time.perf_counter()
+        try:
+            response = await replica.client.send(request, stream=stream)
+        except httpx.RequestError as e:
+            self.pool.end(replica, failed=True)
+            self.breaker.record(trial, failed=True, timed_out=isinstance(e, httpx.TimeoutException))
+            raise
+        except BaseException:
+            # Cancelled, or the request body itself raised: not the replica's fault
+            self.pool.abandon(replica)
+            self.breaker.abandon(trial)
+            raise
+
+        latency = time.perf_counter() - started
+        failed = response.status_code in _REPLICA_FAILURE_STATUSES
+        self.breaker.record(trial, failed)
+        if response.is_success:
+            self._latency_samples.append(latency)
+        if not stream:
+            self.pool.end(replica, latency, failed)
+        else:
+            response.stream = _TrackedStream(
+                response.stream, lambda: self.pool.end(replica, latency, failed)
+            )
+        return response
+
+    async def probe(self, replica: Replica) -> str:
+        """
+        Query a replica's /health and record the result on the replica
+
+        Replicas reporting anything but healthy are taken out of rotation
+        until a later probe succeeds; a healthy probe also re-admits a
+        passively ejected replica. Monolith replicas also report their
+        resident model and queue depth, recorded for the residency policy.
+
+        Returns:
+            The replica's reported status, "unknown" or "unavailable"
+        """
+        started = time.perf_counter()
+        try:
+            response = await replica.client.get("/health", timeout=settings.health_timeout)
+            status = "unknown"
+            if response.status_code == 200:
+                health = response.json()
+                status = health.get("status", "unknown")
+                if self.monolith:
+                    self.pool.residency.record(
+                        replica.url,
+                        (health.get("model") or {}).get("model_type"),
+                        health.get("queue_depth", 0),
+                    )
+        except Exception as e:
+            if replica.health != "unavailable":
+                logger.warning(
+                    f"{self.name.upper()} replica {replica.url} health check failed: {e}"
+                )
+            status = "unavailable"
+
+        replica.record_health(status, time.perf_counter() - started)
+        if status == "healthy":
+            self.pool.readmit(replica)
+        return status
+
+    def latency_quantile(self, fraction: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Rolling latency quantile of successful requests (time to response
+        headers for streamed responses)
+
+        Returns:
+            Latency in seconds, None until min_samples requests have completed
+        """
+        if len(self._latency_samples) < max(1, min_samples):
+            return None
+        return _percentile(self._latency_samples, fraction)
+
+    def _record_acquire(self, wait_seconds: float, connect_seconds: Optional[float]) -> None:
+        self._acquire_samples.append(max(0.0, wait_seconds))
+        if connect_seconds is not None:
+            self._new_connections += 1
+            self._connect_samples.append(connect_seconds)
+
+    @staticmethod
+    def _pool_stats(replica: Replica) -> Dict:
+        active = idle = queued = 0
+        pool = getattr(replica.transport, "_pool", None)
+        if pool is not None:
+            for connection in pool.connections:
+                if connection.is_idle():
+                    idle += 1
+                elif not connection.is_closed():
+                    active += 1
+            queued = sum(1 for request in getattr(pool, "_requests", ()) if request.is_queued())
+        return {"active": active, "idle": idle, "queued": queued}
+
+    def stats(self) -> Dict:
+        """
+        Breaker, admission, coalescing, hedging, connection pool and balancer statistics
+
+        Returns:
+            Dict with voice affinity routing counters (None unless the policy
+            is consistent_hash), model residency routing counters (None unless
+            the policy is residency), circuit breaker, admission control,
+            coalescing and hedging state, per-replica
+            load (in-flight, EWMA latency, ejection) and connection counts,
+            totals across replicas, request and new-connection counters, and
+            request latency and acquire-wait/connect percentiles in milliseconds
+        """
+        replicas = []
+        active = idle = queued = 0
+        for replica in self.replicas:
+            connections = self._pool_stats(replica)
+            active += connections["active"]
+            idle += connections["idle"]
+            queued += connections["queued"]
+            replicas.append({**replica.stats(), "connections": connections})
+
+        latency = list(self._latency_samples)
+        acquire = list(self._acquire_samples)
+        connect = list(self._connect_samples)
+        return {
+            "policy": self.pool.policy,
+            "affinity": self.pool.affinity_stats(),
+            "residency": self.pool.residency_stats(),
+            "circuit": self.breaker.stats(),
+            "admission": self.admission.stats(),
+            "coalescing": self.coalescer.stats(),
+            "hedging": self.hedge_budget.stats(),
+            "replicas": replicas,
+            "connections": {
+                "active": active,
+                "idle": idle,
+                "max_per_replica": self.limits.max_connections,
+                "max_keepalive_per_replica": self.limits.max_keepalive_connections,
+            },
+            "queued_requests": queued,
+            "requests": self._requests,
+            "new_connections": self._new_connections,
+            "latency_ms": {
+                "p50": round(_percentile(latency, 0.50) * 1000, 3),
+                "p95": round(_percentile(latency, 0.95) * 1000, 3),
+                "p99": round(_percentile(latency, 0.99) * 1000, 3),
+            },
+            "acquire_wait_ms": {
+                "p50": round(_percentile(acquire, 0.50) * 1000, 3),
+                "p95": round(_percentile(acquire, 0.95) * 1000, 3),
+                "max": round(max(acquire, default=0.0) * 1000, 3),
+            },
+            "connect_ms": {
+                "p50": round(_percentile(connect, 0.50) * 1000, 3),
+                "p95": round(_percentile(connect, 0.95) * 1000, 3),
+            },
+        }
+
+
+class BackendClients:
+    """Registry of the gateway's backend clients"""
+
+    def __init__(self):
+        common = dict(
+            connect_timeout=settings.backend_connect_timeout,
+            max_connections=settings.backend_max_connections,
+            max_keepalive_connections=settings.backend_max_keepalive_connections,
+            keepalive_expiry=settings.backend_keepalive_expiry,
+            http2=settings.backend_http2,
+            eject_failures=settings.backend_eject_failures,
+            admission_max_queue=settings.admission_max_queue,
+            admission_queue_timeout=settings.admission_queue_timeout,
+        )
+        # Monolith replicas listed for both STT and TTS share one residency state
+        self.residency = ResidencyTable()
+        stt_policy = settings.backend_balancer
+        tts_policy = settings.tts_balancer or settings.backend_balancer
+        self.stt = BackendClient(
+            "stt",
+            settings.stt_service_urls,
+            timeout=settings.stt_timeout,
+            policy=stt_policy,
+            admission_budget=settings.stt_admission_budget,
+            hedge_budget=settings.stt_hedge_budget,
+            breaker=self._breaker("stt"),
+            load_factor=self._load_factor(stt_policy),
+            residency=self.residency,
+            **common,
+        )
+        self.tts = BackendClient(
+            "tts",
+            settings.tts_service_urls,
+            timeout=settings.tts_timeout,
+            policy=tts_policy,
+            admission_budget=settings.tts_admission_budget,
+            coalesce=settings.coalesce_requests,
+            breaker=self._breaker("tts"),
+            load_factor=self._load_factor(tts_policy),
+            virtual_nodes=settings.tts_hash_virtual_nodes,
+            residency=self.residency,
+            **common,
+        )
+
+    @staticmethod
+    def _load_factor(policy: str) -> float:
+        if policy == "residency":
+            return settings.residency_load_factor
+        return settings.tts_hash_load_factor
+
+    @staticmethod
+    def _breaker(name: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            name,
+            enabled=settings.circuit_breaker_enabled,
+            failure_ratio=settings.circuit_failure_ratio,
+            timeout_ratio=settings.circuit_timeout_ratio,
+            min_requests=settings.circuit_min_requests,
+            window=settings.circuit_window,
+            open_seconds=settings.circuit_open_seconds,
+            half_open_requests=settings.circuit_half_open_requests,
+        )
+
+    async def start(self) -> None:
+        await self.stt.start()
+        await self.tts.start()
+
+    async def close(self) -> None:
+        await self.stt.close()
+        await self.tts.close()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {"stt": self.stt.stats(), "tts": self.tts.stats()}
+
+
+# Global backend clients
+backends = BackendClients()
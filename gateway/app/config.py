@@ -2,6 +2,8 @@
 Gateway Configuration
 """
 
+from typing import List
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,19 +22,194 @@ class Settings(BaseSettings):
     gateway_port: int = Field(default=8000, description="Gateway port")
     log_level: str = Field(default="INFO", description="Log level")
 
-    # Backend Services
+    # Backend Services (comma-separated URLs to balance across replicas;
+    # unix:///path/to/service.sock reaches a co-located service over its socket;
+    # inprocess://stt / inprocess://tts hosts the service inside the gateway)
     stt_service_url: str = Field(
         default="http://localhost:8001",
-        description="STT service URL",
+        description="STT service URL(s), comma-separated for multiple replicas",
     )
     tts_service_url: str = Field(
         default="http://localhost:8002",
-        description="TTS service URL",
+        description="TTS service URL(s), comma-separated for multiple replicas",
+    )
+    inprocess_services_dir: str = Field(
+        default="",
+        description="Directory containing stt-service/ and tts-service/ for inprocess:// "
+        "backends (default: the repository root)",
+    )
+
+    # Uploads
+    max_upload_size: int = Field(
+        default=52428800,  # 50MB
+        description="Maximum transcription upload size in bytes",
     )
 
     # Timeouts
     stt_timeout: int = Field(default=120, description="STT request timeout (seconds)")
     tts_timeout: int = Field(default=180, description="TTS request timeout (seconds)")
+    backend_connect_timeout: float = Field(
+        default=5.0, description="Backend connection timeout (seconds)"
+    )
+    health_timeout: float = Field(default=5.0, description="Backend health check timeout (seconds)")
+    health_check_interval: float = Field(
+        default=5.0, description="Interval between background replica health checks (seconds)"
+    )
+
+    # Backend connection pools (one shared client per backend)
+    backend_max_connections: int = Field(
+        default=100, description="Max concurrent connections per backend"
+    )
+    backend_max_keepalive_connections: int = Field(
+        default=20, description="Max idle keep-alive connections kept per backend"
+    )
+    backend_keepalive_expiry: float = Field(
+        default=30.0, description="Idle keep-alive connection lifetime (seconds)"
+    )
+    backend_http2: bool = Field(
+        default=False,
+        description="Use HTTP/2 to backends (requires httpx[http2] and an HTTP/2 capable server)",
+    )
+
+    # Replica load balancing
+    backend_balancer: str = Field(
+        default="p2c",
+        description=(
+            "Replica selection policy: p2c (power of two choices), least_outstanding, "
+            "consistent_hash (requests with a routing key, see tts_balancer), or residency "
+            "(monolith replicas listed as both STT and TTS URLs)"
+        ),
+    )
+    backend_eject_failures: int = Field(
+        default=3, description="Consecutive failures before a replica is ejected"
+    )
+    tts_balancer: str = Field(
+        default="",
+        description=(
+            "Replica selection policy for TTS, overriding backend_balancer; consistent_hash "
+            "keeps each voice on the same replica(s)"
+        ),
+    )
+    tts_hash_load_factor: float = Field(
+        default=1.25,
+        description="consistent_hash: max in-flight per replica as a multiple of the average",
+    )
+    tts_hash_virtual_nodes: int = Field(
+        default=160, description="consistent_hash: hash ring points per replica"
+    )
+    residency_load_factor: float = Field(
+        default=2.0,
+        description=(
+            "residency: max load on a replica holding the model, as a multiple of the "
+            "average, before another replica is switched to it"
+        ),
+    )
+
+    # Admission control (0 budget disables it for that backend)
+    stt_admission_budget: float = Field(
+        default=32.0, description="Transcriptions in flight to STT before requests queue"
+    )
+    tts_admission_budget: float = Field(
+        default=8000.0, description="Characters in flight to TTS before requests queue"
+    )
+    admission_max_queue: int = Field(
+        default=128, description="Requests per backend allowed to wait before 429"
+    )
+    admission_queue_timeout: float = Field(
+        default=30.0, description="Max time a request waits for capacity (seconds)"
+    )
+
+    # Request coalescing
+    coalesce_requests: bool = Field(
+        default=True,
+        description="Share one upstream synthesis among identical concurrent speech requests",
+    )
+
+    # Circuit breaker (per backend)
+    circuit_breaker_enabled: bool = Field(
+        default=True, description="Fail fast with 503 while a backend keeps failing"
+    )
+    circuit_failure_ratio: float = Field(
+        default=0.5, description="Failed fraction of recent requests that opens the circuit"
+    )
+    circuit_timeout_ratio: float = Field(
+        default=0.2, description="Timed-out fraction of recent requests that opens the circuit"
+    )
+    circuit_min_requests: int = Field(
+        default=10, description="Requests in the window before the circuit can open"
+    )
+    circuit_window: float = Field(
+        default=60.0, description="Sliding window for failure/timeout rates (seconds)"
+    )
+    circuit_open_seconds: float = Field(
+        default=15.0, description="Time the circuit stays open before trial requests (seconds)"
+    )
+    circuit_half_open_requests: int = Field(
+        default=1, description="Concurrent trial requests while half-open"
+    )
+
+    # Audio pre-normalization (STT)
+    stt_prenormalize: bool = Field(
+        default=False,
+        description="Decode uploads to 16 kHz mono on the gateway before forwarding to STT",
+    )
+    stt_prenormalize_format: str = Field(
+        default="wav", description="Forwarded format: wav (PCM16) or flac"
+    )
+    stt_prenormalize_workers: int = Field(
+        default=0, description="Concurrent ffmpeg processes (0 = one per CPU)"
+    )
+    stt_prenormalize_timeout: float = Field(
+        default=60.0, description="Max time for one ffmpeg conversion (seconds)"
+    )
+
+    # Output transcoding (TTS)
+    tts_transcode: bool = Field(
+        default=False,
+        description="Request raw PCM from TTS and encode compressed formats on the gateway",
+    )
+    tts_transcode_formats: str = Field(
+        default="mp3,opus,aac,flac", description="Response formats encoded on the gateway"
+    )
+    tts_transcode_workers: int = Field(
+        default=0, description="Concurrent ffmpeg encoders (0 = one per CPU)"
+    )
+    tts_transcode_cache_bytes: int = Field(
+        default=67108864, description="LRU cache of encoded responses (bytes, 0 = off)"
+    )
+    tts_transcode_mp3_bitrate: str = Field(default="128k", description="MP3 output bitrate")
+    tts_transcode_opus_bitrate: str = Field(default="64k", description="Opus output bitrate")
+    tts_transcode_aac_bitrate: str = Field(default="128k", description="AAC output bitrate")
+
+    # Request hedging (STT)
+    stt_hedging: bool = Field(
+        default=False,
+        description="Resend a slow transcription to a second STT replica, first answer wins",
+    )
+    stt_hedge_budget: float = Field(
+        default=0.05, description="Max fraction of transcriptions that may be hedged"
+    )
+    stt_hedge_quantile: float = Field(
+        default=0.95, description="Latency quantile after which a transcription is hedged"
+    )
+    stt_hedge_min_samples: int = Field(
+        default=20, description="Latency samples required before hedging starts"
+    )
+    stt_hedge_max_upload_size: int = Field(
+        default=10485760, description="Largest upload buffered for hedging (bytes)"
+    )
+
+    @property
+    def stt_service_urls(self) -> List[str]:
+        return _split_urls(self.stt_service_url)
+
+    @property
+    def tts_service_urls(self) -> List[str]:
+        return _split_urls(self.tts_service_url)
+
+
+def _split_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
 
 
 settings = Settings()
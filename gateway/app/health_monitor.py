@@ -0,0 +1,131 @@
+"""
+Health Monitor - Background health checks for backend replicas
+Probes every STT/TTS replica concurrently on a fixed interval and keeps the
+latest results, so /health answers from a cached snapshot and the load
+balancer routes around replicas that are down or still loading.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from app.clients import BackendClient, BackendClients, backends
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Periodic, concurrent health probing of all backend replicas"""
+
+    def __init__(self, clients: BackendClients, interval: float):
+        self.clients = clients
+        self.interval = max(0.1, interval)
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[float] = None
+
+    def _backends(self) -> Dict[str, BackendClient]:
+        return {"stt": self.clients.stt, "tts": self.clients.tts}
+
+    async def start(self) -> None:
+        """Run a first round of probes, then keep probing in the background"""
+        if self._task is not None:
+            return
+        await self.check_all()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Health monitor started: interval={self.interval}s")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check_all(self) -> None:
+        """Probe every replica of every backend concurrently"""
+        probes = [
+            backend.probe(replica)
+            for backend in self._backends().values()
+            for replica in backend.replicas
+        ]
+        await asyncio.gather(*probes)
+        self.last_run = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error(f"Health check round failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _service_status(statuses: List[Optional[str]]) -> str:
+        if all(status == "healthy" for status in statuses):
+            return "healthy"
+        if all(status in (None, "unavailable") for status in statuses):
+            return "unavailable"
+        return "degraded"
+
+    def snapshot(self) -> Dict:
+        """
+        Latest health of the gateway and its backends
+
+        Returns:
+            Dict with overall status, per-service status and circuit breaker
+            state, and per-replica status, routing state and probe timestamps
+        """
+        now = time.time()
+        services = {}
+        for name, backend in self._backends().items():
+            replicas = []
+            for replica in backend.replicas:
+                replicas.append(
+                    {
+                        "url": replica.url,
+                        "status": replica.health or "unknown",
+                        "ejected": replica.ejected,
+                        "in_rotation": replica.available,
+                        "checked_at": replica.checked_at,
+                        "age_seconds": (
+                            round(now - replica.checked_at, 3)
+                            if replica.checked_at is not None
+                            else None
+                        ),
+                        "probe_ms": (
+                            round(replica.probe_latency * 1000, 3)
+                            if replica.probe_latency is not None
+                            else None
+                        ),
+                    }
+                )
+            services[name] = {
+                "status": self._service_status([replica.health for replica in backend.replicas]),
+                "circuit": backend.breaker.stats(),
+                "replicas": replicas,
+            }
+
+        stt_status = services["stt"]["status"]
+        tts_status = services["tts"]["status"]
+        if stt_status == "healthy" and tts_status == "healthy":
+            overall_status = "healthy"
+        elif stt_status == "unavailable" and tts_status == "unavailable":
+            overall_status = "unhealthy"
+        else:
+            overall_status = "degraded"
+
+        return {
+            "status": overall_status,
+            "gateway": "healthy",
+            "checked_at": self.last_run,
+            "services": services,
+        }
+
+
+# Global health monitor
+health_monitor = HealthMonitor(backends, settings.health_check_interval)
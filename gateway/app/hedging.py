@@ -0,0 +1,131 @@
+"""
+Request Hedging - Tail-latency protection across backend replicas
+A request still outstanding after the backend's rolling p95 latency is sent
+again to a second replica; whichever answers first wins and the other is
+cancelled. A token-bucket budget caps hedges to a fraction of traffic.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from app.clients import BackendClient
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of requests
+
+    Every eligible request deposits `ratio` tokens (up to `burst`); a hedge
+    spends one, so over time hedges stay below ratio x requests.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = max(0.0, ratio)
+        self.burst = max(1.0, burst)
+        self._tokens = 0.0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.hedged += 1
+            return True
+        self.denied += 1
+        return False
+
+    def stats(self) -> Dict:
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self._tokens, 3),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "denied": self.denied,
+        }
+
+
+async def hedged_request(
+    backend: "BackendClient",
+    quantile: float,
+    min_samples: int,
+    method: str,
+    path: str,
+    hedge_kwargs: Callable[[], Optional[Dict[str, Any]]],
+    **kwargs,
+) -> httpx.Response:
+    """
+    Send a buffered request, hedging it on a second replica if it is slow
+
+    Args:
+        backend: Backend to send to; its hedge_budget caps how often hedges are sent
+        quantile: Latency quantile after which the hedge is sent (e.g. 0.95)
+        min_samples: Latency samples required before hedging starts
+        method: HTTP method
+        path: Path relative to the replica base URL
+        hedge_kwargs: Returns the request kwargs for the hedge, or None if the
+            request cannot be repeated (e.g. its body was not fully captured)
+        **kwargs: Request kwargs for the primary request
+
+    Returns:
+        The first successful (non-5xx) response, or the primary's outcome if
+        no hedge was sent or both attempts failed
+    """
+    budget = backend.hedge_budget
+    budget.deposit()
+    primary_replica = backend.pool.pick()
+    primary = asyncio.create_task(backend.request(method, path, replica=primary_replica, **kwargs))
+    tasks = [primary]
+    try:
+        delay = backend.latency_quantile(quantile, min_samples)
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        second_replica = backend.pool.pick_other(primary_replica)
+        repeat = hedge_kwargs() if second_replica is not None else None
+        if repeat is None or not budget.try_spend():
+            return await primary
+
+        logger.info(
+            f"Hedging {backend.name} {method} {path}: {primary_replica.url} exceeded "
+            f"p{int(quantile * 100)} ({delay * 1000:.0f} ms), also sending to {second_replica.url}"
+        )
+        hedge = asyncio.create_task(backend.request(method, path, replica=second_replica, **repeat))
+        tasks.append(hedge)
+
+        winner = await _first_success(tasks)
+        if winner is None:
+            # Both attempts failed: surface the primary's own outcome
+            return primary.result()
+        if winner is hedge:
+            budget.hedge_wins += 1
+        return winner.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _first_success(tasks) -> Optional[asyncio.Task]:
+    """Wait for the first attempt that returns a non-5xx response; None if all fail"""
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None and task.result().status_code < 500:
+                return task
+    return None
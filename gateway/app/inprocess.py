@@ -0,0 +1,245 @@
+"""
+In-Process Backends - Composite single-node deployment
+Loads the stt-service / tts-service FastAPI apps into the gateway process and
+serves backend URLs inprocess://stt and inprocess://tts through an ASGI
+transport. The gateway keeps its usual routing (balancing, health probes,
+admission, circuit breaker) but requests never leave the process: no socket,
+no second process, and response bodies stream straight from the service.
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, MutableMapping
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+INPROCESS_SCHEME = "inprocess://"
+
+# Service name in an inprocess:// URL -> service directory in the repository
+_SERVICE_DIRS = {"stt": "stt-service", "tts": "tts-service"}
+
+
+def is_inprocess(url: str) -> bool:
+    return url.startswith(INPROCESS_SCHEME)
+
+
+def _service_name(url: str) -> str:
+    name = url[len(INPROCESS_SCHEME) :].strip("/")
+    if name not in _SERVICE_DIRS:
+        raise ValueError(f"Unknown in-process service: {url}. Use one of {list(_SERVICE_DIRS)}")
+    return name
+
+
+def _package_modules() -> Dict[str, Any]:
+    return {
+        name: module
+        for name, module in sys.modules.items()
+        if name == "app" or name.startswith("app.")
+    }
+
+
+class _AppResponseStream(httpx.AsyncByteStream):
+    """Response body relayed chunk by chunk from a running ASGI app"""
+
+    def __init__(self, chunks: asyncio.Queue, task: asyncio.Task, disconnected: asyncio.Event):
+        self._chunks = chunks
+        self._task = task
+        self._disconnected = disconnected
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._chunks.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, BaseException):
+                raise httpx.ReadError(f"In-process service failed: {chunk}") from chunk
+            yield chunk
+
+    async def aclose(self) -> None:
+        # Tell the app the client went away, then stop it if it is still running
+        self._disconnected.set()
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except BaseException:
+                pass
+
+
+class InProcessTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport calling an ASGI app in the same event loop
+
+    Unlike httpx.ASGITransport the response is returned as soon as the app
+    starts it and the body streams as the app produces it, so streamed
+    synthesis keeps its time to first byte. The read timeout applies to
+    waiting for the response to start, and surfaces as httpx.ReadTimeout
+    like on a socket.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(key.lower(), value) for key, value in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": request.url.path,
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": ("127.0.0.1", 0),
+            "root_path": "",
+        }
+        body = request.stream.__aiter__()
+        request_complete = False
+        body_error: List[BaseException] = []
+        started: asyncio.Future = asyncio.get_running_loop().create_future()
+        chunks: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_complete
+            if request_complete:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            try:
+                chunk = await body.__anext__()
+            except StopAsyncIteration:
+                request_complete = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            except Exception as e:
+                # The request body itself failed (e.g. upload too large): the
+                # service sees a disconnect and the caller gets the error
+                body_error.append(e)
+                request_complete = True
+                disconnected.set()
+                return {"type": "http.disconnect"}
+            return {"type": "http.request", "body": chunk, "more_body": True}
+
+        async def send(message: MutableMapping[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                if not started.done():
+                    started.set_result(message)
+            elif message["type"] == "http.response.body":
+                if message.get("body") and request.method != "HEAD":
+                    chunks.put_nowait(message["body"])
+                if not message.get("more_body", False):
+                    chunks.put_nowait(None)
+
+        async def run() -> None:
+            try:
+                await self.app(scope, receive, send)
+            except asyncio.CancelledError:
+                started.cancel()
+                raise
+            except Exception as e:
+                if not started.done():
+                    started.set_exception(e)
+                else:
+                    chunks.put_nowait(e)
+            finally:
+                if not started.done():
+                    started.set_exception(RuntimeError("Service returned no response"))
+                chunks.put_nowait(None)
+
+        task = asyncio.create_task(run())
+        timeout = request.extensions.get("timeout", {}).get("read")
+        try:
+            message = await asyncio.wait_for(asyncio.shield(started), timeout)
+        except asyncio.TimeoutError:
+            task.cancel()
+            raise httpx.ReadTimeout("In-process service timed out", request=request)
+        except BaseException as e:
+            if not task.done():
+                task.cancel()
+            if body_error:
+                raise body_error[0]
+            if isinstance(e, Exception):
+                raise httpx.RemoteProtocolError(
+                    f"In-process service failed: {e}", request=request
+                ) from e
+            raise
+        if body_error:
+            task.cancel()
+            raise body_error[0]
+
+        return httpx.Response(
+            message["status"],
+            headers=message.get("headers", []),
+            stream=_AppResponseStream(chunks, task, disconnected),
+            request=request,
+        )
+
+
+class InProcessServices:
+    """
+    stt-service / tts-service apps hosted inside the gateway
+
+    The services and the gateway are all packages named `app`, so a service
+    is imported with the gateway's `app.*` modules temporarily taken out of
+    sys.modules; its modules bind each other at import time and keep working
+    after the gateway's are restored. Each service's startup/shutdown hooks
+    (model loading, job recovery) run within the gateway lifespan.
+    """
+
+    def __init__(self, services_dir: str = ""):
+        self.services_dir = (
+            Path(services_dir) if services_dir else Path(__file__).resolve().parents[2]
+        )
+        self._apps: Dict[str, Any] = {}
+        self._modules: Dict[str, Dict[str, Any]] = {}
+        self._lifespans = AsyncExitStack()
+
+    def app(self, url: str):
+        """ASGI app for an inprocess:// URL, imported on first use"""
+        name = _service_name(url)
+        if name not in self._apps:
+            self._apps[name] = self._load(name)
+        return self._apps[name]
+
+    def _load(self, name: str):
+        service_dir = str(self.services_dir / _SERVICE_DIRS[name])
+        logger.info(f"Loading {name} service in-process from {service_dir}")
+        gateway_modules = _package_modules()
+        for module_name in gateway_modules:
+            del sys.modules[module_name]
+        sys.path.insert(0, service_dir)
+        try:
+            service_app = importlib.import_module("app.main").app
+            self._modules[name] = _package_modules()
+        finally:
+            sys.path.remove(service_dir)
+            for module_name in _package_modules():
+                del sys.modules[module_name]
+            sys.modules.update(gateway_modules)
+        return service_app
+
+    async def start(self, urls: List[str]) -> None:
+        """Import the services named by inprocess:// URLs and run their startup"""
+        for url in dict.fromkeys(url for url in urls if is_inprocess(url)):
+            service_app = self.app(url)
+            await self._lifespans.enter_async_context(
+                service_app.router.lifespan_context(service_app)
+            )
+            logger.info(f"In-process {_service_name(url)} service started")
+
+    async def stop(self) -> None:
+        await self._lifespans.aclose()
+        self._lifespans = AsyncExitStack()
+
+
+# Global in-process service host
+inprocess_services = InProcessServices(settings.inprocess_services_dir)
@@ -4,11 +4,15 @@ OpenAI-compatible Audio API Gateway
 """
 
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.clients import backends
 from app.config import settings
+from app.health_monitor import health_monitor
+from app.inprocess import inprocess_services
 from app.routers import audio, health
 
 # Configure logging
@@ -18,11 +22,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan manager
+    Starts in-process backends (composite mode), opens the pooled backend
+    clients and starts the health monitor on startup; stops them in reverse
+    order on shutdown
+    """
+    logger.info("Starting OpenTalker API Gateway")
+    logger.info(f"STT Service: {settings.stt_service_url}")
+    logger.info(f"TTS Service: {settings.tts_service_url}")
+
+    await inprocess_services.start(settings.stt_service_urls + settings.tts_service_urls)
+    await backends.start()
+    await health_monitor.start()
+    logger.info("Gateway ready!")
+
+    yield
+
+    logger.info("Shutting down OpenTalker API Gateway")
+    await health_monitor.stop()
+    await backends.close()
+    await inprocess_services.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="OpenTalker API Gateway",
     description="OpenAI-compatible Audio API - STT & TTS Services",
     version="0.3.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -39,15 +70,6 @@ app.include_router(health.router, tags=["Health"])
 app.include_router(audio.router, prefix="/v1/audio", tags=["Audio"])
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event"""
-    logger.info("Starting OpenTalker API Gateway")
-    logger.info(f"STT Service: {settings.stt_service_url}")
-    logger.info(f"TTS Service: {settings.tts_service_url}")
-    logger.info("Gateway ready!")
-
-
 if __name__ == "__main__":
     import uvicorn
 
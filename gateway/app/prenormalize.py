@@ -0,0 +1,235 @@
+"""
+Audio Pre-normalization - Compact STT uploads on the gateway
+Decodes uploaded audio, downmixes it to mono and resamples it to 16 kHz with
+ffmpeg subprocesses on the gateway, so the STT host receives small, ready to
+use PCM16 WAV (or FLAC) and skips its own probe and decode steps. Audio is
+streamed through ffmpeg in chunks and the result is spooled to disk once it
+outgrows memory, so long uploads are never held in memory whole.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import wave
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from opentalker_common.codecs import STREAM_READ_SIZE
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRENORMALIZE_FORMATS = ("wav", "flac")
+
+# Headers telling the STT service the audio is already 16 kHz mono, and its length
+PRENORMALIZED_HEADER = "X-Audio-Prenormalized"
+DURATION_HEADER = "X-Audio-Duration"
+
+TARGET_SAMPLE_RATE = 16000
+_SAMPLE_WIDTH = 2
+
+# Normalized audio is kept in memory up to this size, then spooled to disk
+_SPOOL_SIZE = 1024 * 1024
+
+
+def _file_size(file: BinaryIO) -> int:
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    return size
+
+
+def _normalized_wav_duration(file: BinaryIO) -> Optional[float]:
+    """Duration of a WAV that is already 16 kHz mono PCM16, None for anything else"""
+    file.seek(0)
+    try:
+        with wave.open(file, "rb") as wav:
+            if (
+                wav.getnchannels() == 1
+                and wav.getsampwidth() == _SAMPLE_WIDTH
+                and wav.getframerate() == TARGET_SAMPLE_RATE
+            ):
+                return wav.getnframes() / TARGET_SAMPLE_RATE
+    except (wave.Error, EOFError):
+        pass
+    finally:
+        file.seek(0)
+    return None
+
+
+class AudioNormalizer:
+    """
+    Bounded pool of ffmpeg workers normalizing uploads for STT
+
+    At most `workers` ffmpeg processes run at once (0 = one per CPU), so
+    decoding never blocks the event loop. Audio that cannot be decoded is
+    reported as None and the caller forwards the original upload.
+    """
+
+    def __init__(self, enabled: bool, format: str, workers: int, timeout: float):
+        if format not in PRENORMALIZE_FORMATS:
+            raise ValueError(
+                f"Unsupported pre-normalization format: {format}. "
+                f"Use one of {PRENORMALIZE_FORMATS}"
+            )
+        self.ffmpeg = shutil.which("ffmpeg")
+        if enabled and self.ffmpeg is None:
+            logger.warning("STT pre-normalization disabled: ffmpeg not found")
+        self.enabled = enabled and self.ffmpeg is not None
+        self.format = format
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(self.workers)
+        self._running = 0
+        self.normalized = 0
+        self.passthrough = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def normalize(self, file: BinaryIO) -> Optional[Tuple[BinaryIO, float]]:
+        """
+        Convert uploaded audio to 16 kHz mono in the configured format
+
+        Args:
+            file: Seekable uploaded audio file (any format ffmpeg can read)
+
+        Returns:
+            Tuple of (encoded audio file positioned at its start, duration in
+            seconds), or None if the audio could not be decoded. The encoded
+            file is `file` itself for WAV that needs no conversion; otherwise
+            it is a new temporary file the caller must close.
+        """
+        if self.format == "wav":
+            duration = _normalized_wav_duration(file)
+            if duration is not None:
+                self.passthrough += 1
+                return file, duration
+
+        output = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+        try:
+            async with self._slots:
+                self._running += 1
+                try:
+                    pcm_size = await self._decode(file, output)
+                finally:
+                    self._running -= 1
+        except Exception as e:
+            output.close()
+            self.failed += 1
+            logger.warning(f"Audio pre-normalization failed, forwarding original upload: {e}")
+            return None
+
+        self.normalized += 1
+        self.bytes_in += _file_size(file)
+        self.bytes_out += _file_size(output)
+        return output, pcm_size / (_SAMPLE_WIDTH * TARGET_SAMPLE_RATE)
+
+    async def _decode(self, file: BinaryIO, output: BinaryIO) -> int:
+        """Write file as 16 kHz mono audio in the configured format; returns the PCM16 size"""
+        decode = ["-i", "pipe:0", "-vn", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE)]
+        decode += ["-f", "s16le", "-acodec", "pcm_s16le", "pipe:1"]
+        if self.format == "wav":
+            # The header's sizes are filled in when the writer closes
+            with wave.open(output, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(_SAMPLE_WIDTH)
+                wav.setframerate(TARGET_SAMPLE_RATE)
+                return await self._ffmpeg(decode, file, wav.writeframesraw)
+
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE) as pcm:
+            pcm_size = await self._ffmpeg(decode, file, pcm.write)
+            encode = ["-f", "s16le", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE)]
+            encode += ["-i", "pipe:0", "-f", "flac", "pipe:1"]
+            await self._ffmpeg(encode, pcm, output.write)
+            return pcm_size
+
+    async def _ffmpeg(self, args: List[str], source: BinaryIO, sink: Callable) -> int:
+        """
+        Stream source through ffmpeg in chunks, passing its output to sink
+
+        Returns:
+            Number of output bytes
+        """
+        source.seek(0)
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        async def feed() -> None:
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(source.read, STREAM_READ_SIZE)
+                    if not chunk:
+                        break
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg stopped reading; its exit status says why
+                pass
+            finally:
+                process.stdin.close()
+
+        async def run() -> Tuple[int, bytes]:
+            feeder = asyncio.create_task(feed())
+            errors = asyncio.create_task(process.stderr.read())
+            try:
+                written = 0
+                while True:
+                    data = await process.stdout.read(STREAM_READ_SIZE)
+                    if not data:
+                        break
+                    sink(data)
+                    written += len(data)
+                await feeder
+                stderr = await errors
+                await process.wait()
+                return written, stderr
+            finally:
+                feeder.cancel()
+                errors.cancel()
+
+        try:
+            written, stderr = await asyncio.wait_for(run(), self.timeout)
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode("utf-8", errors="replace").strip())
+        return written
+
+    def headers(self, duration: float) -> Dict[str, str]:
+        """Headers marking a normalized upload for the STT service"""
+        return {PRENORMALIZED_HEADER: self.format, DURATION_HEADER: f"{duration:.3f}"}
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "format": self.format,
+            "workers": self.workers,
+            "running": self._running,
+            "normalized": self.normalized,
+            "passthrough": self.passthrough,
+            "failed": self.failed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+# Global normalizer
+normalizer = AudioNormalizer(
+    settings.stt_prenormalize,
+    settings.stt_prenormalize_format,
+    settings.stt_prenormalize_workers,
+    settings.stt_prenormalize_timeout,
+)
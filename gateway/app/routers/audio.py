@@ -2,15 +2,30 @@
 Audio Router - Proxy to STT/TTS services
 """
 
+import asyncio
 import logging
-from typing import Optional
+import os
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
 
 import httpx
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import Response
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
+from opentalker_common.admission import AdmissionRejectedError, AdmissionTicket
+from opentalker_common.singleflight import request_key
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
 
+from app.broadcast import ResponseBroadcast, Subscription
+from app.circuit_breaker import CircuitOpenError
+from app.clients import backends
 from app.config import settings
+from app.hedging import hedged_request
+from app.prenormalize import normalizer
+from app.transcode import transcoder
 
 logger = logging.getLogger(__name__)
 
@@ -36,61 +51,319 @@ class TTSRequest(BaseModel):
     response_format: str = Field(default="wav")
     speed: float = Field(default=1.0, ge=0.25, le=4.0)
     emotion: Optional[EmotionConfig] = None
+    priority: Optional[str] = None
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000)
+    sample_format: Optional[str] = None
 
 
-@router.post("/transcriptions")
-async def create_transcription(
-    file: UploadFile = File(...),
-    model: str = Form(default="qwen3-asr"),
-    language: Optional[str] = Form(default=None),
-    response_format: str = Form(default="json"),
-    timestamp_granularities: Optional[str] = Form(default=None),
-    temperature: Optional[float] = Form(default=0.0),
-):
+class TTSJobRequest(BaseModel):
+    """Long-form TTS job request model"""
+
+    model: str = Field(default="indextts-2")
+    input: str = Field(..., min_length=1)
+    voice: str
+    response_format: str = Field(default="wav")
+    speed: float = Field(default=1.0, ge=0.25, le=4.0)
+
+
+def _map_voice(voice: str) -> Tuple[str, Optional[str]]:
     """
-    Transcribe audio to text (OpenAI-compatible)
+    Map an OpenAI-style voice to the TTS service's speaker and language
 
-    Proxies request to STT service
+    Returns:
+        Tuple of (speaker, language), language None to let the TTS service auto-detect
+    """
+    # Map common voice names to language names (TTS service expects full names)
+    chinese_speakers = ["vivian", "serena", "uncle_fu", "dylan", "eric"]
+    english_speakers = ["ryan", "aiden"]
+    japanese_speakers = ["ono_anna"]
+    korean_speakers = ["sohee"]
+
+    language = None
+    if voice.lower() in chinese_speakers:
+        language = "Chinese"
+    elif voice.lower() in english_speakers:
+        language = "English"
+    elif voice.lower() in japanese_speakers:
+        language = "Japanese"
+    elif voice.lower() in korean_speakers:
+        language = "Korean"
+    return voice, language
+
+
+# Multipart body accepted by /transcriptions (documented here because the
+# endpoint reads the raw request stream instead of declaring form fields)
+TRANSCRIPTION_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "model": {"type": "string", "default": "qwen3-asr"},
+                        "language": {"type": "string"},
+                        "response_format": {"type": "string", "default": "json"},
+                        "timestamp_granularities": {"type": "string"},
+                        "temperature": {"type": "number", "default": 0.0},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+class _UploadTooLargeError(Exception):
+    """Raised from the upload stream once the body exceeds max_upload_size"""
+
+    def __init__(self, received: int):
+        super().__init__(f"Upload exceeds {settings.max_upload_size} bytes")
+        self.received = received
+
+
+def _upload_too_large(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={
+            "error": f"File size ({size} bytes) exceeds maximum allowed size "
+            f"({settings.max_upload_size} bytes)"
+        },
+    )
+
+
+def _retry_after(response: httpx.Response) -> Optional[Dict[str, str]]:
+    """Retry-After of an upstream 429/503, to relay to the client"""
+    if "retry-after" in response.headers:
+        return {"Retry-After": response.headers["retry-after"]}
+    return None
+
+
+def _overloaded(error: AdmissionRejectedError) -> HTTPException:
+    logger.warning(f"Request rejected: {error}")
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={"error": str(error)},
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _circuit_open(error: CircuitOpenError) -> HTTPException:
+    logger.warning(f"Request failed fast: {error}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"error": str(error)},
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+class _UploadCapture:
+    """Copy of a relayed upload, kept so the request can be hedged"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.complete = False
+
+    def hedge_kwargs(self, headers: Dict[str, str]) -> Optional[Dict]:
+        """Request kwargs to repeat the upload, None until it was fully received"""
+        if not self.complete:
+            return None
+        return {"content": bytes(self.data), "headers": headers}
+
+
+async def _limited_stream(
+    request: Request, capture: Optional[_UploadCapture] = None
+) -> AsyncIterator[bytes]:
+    """Relay the request body chunk by chunk, enforcing max_upload_size"""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > settings.max_upload_size:
+            raise _UploadTooLargeError(received)
+        if capture is not None:
+            capture.data.extend(chunk)
+        yield chunk
+    if capture is not None:
+        capture.complete = True
+
+
+def _hedgeable(content_length: Optional[str]) -> bool:
+    """Whether a transcription upload is small enough to buffer for hedging"""
+    return (
+        settings.stt_hedging
+        and content_length is not None
+        and content_length.isdigit()
+        and int(content_length) <= settings.stt_hedge_max_upload_size
+    )
+
+
+@asynccontextmanager
+async def _prenormalized_upload(request: Request) -> AsyncIterator[Dict]:
+    """
+    Parse the multipart upload and re-encode its audio for the STT service
+
+    The body is read through _limited_stream, so max_upload_size is enforced
+    while it arrives, and the multipart parser spools the file to disk past
+    1 MB. The audio is then streamed through ffmpeg in chunks, so neither the
+    upload nor the normalized audio is held in memory whole. The files stay
+    open until the block exits.
+
+    Yields:
+        Request kwargs (files, data, headers) for /transcribe; the original
+        file is forwarded unchanged if it could not be decoded
     """
     try:
-        logger.info(f"Transcription request: model={model}, format={response_format}")
+        form = await MultiPartParser(request.headers, _limited_stream(request)).parse()
+    except MultiPartException as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": f"Invalid multipart body: {e.message}"},
+        )
+    try:
+        upload = form.get("file")
+        if not isinstance(upload, StarletteUploadFile):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": "Missing 'file' field"},
+            )
+        fields: Dict[str, list] = {}
+        for key, value in form.multi_items():
+            if isinstance(value, str):
+                fields.setdefault(key, []).append(value)
+
+        normalized = await normalizer.normalize(upload.file)
+        if normalized is None:
+            yield {
+                "files": {"file": (upload.filename or "audio", upload.file, upload.content_type)},
+                "data": fields,
+            }
+            return
+        audio, duration = normalized
+        try:
+            yield {
+                "files": {
+                    "file": (f"audio.{normalizer.format}", audio, f"audio/{normalizer.format}")
+                },
+                "data": fields,
+                "headers": normalizer.headers(duration),
+            }
+        finally:
+            if audio is not upload.file:
+                audio.close()
+    finally:
+        await form.close()
 
-        # Read file content
-        file_content = await file.read()
 
-        # Prepare form data
-        files = {"file": (file.filename, file_content, file.content_type)}
-        data = {
-            "language": language,
-            "response_format": response_format,
-            "timestamp_granularities": timestamp_granularities,
-            "temperature": temperature,
-        }
+async def _buffer_for_hedging(upload: Dict) -> bool:
+    """
+    Swap a pre-normalized upload's file for its bytes so it can be sent twice
 
-        # Forward to STT service
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.stt_service_url}/transcribe",
-                files=files,
-                data=data,
-                timeout=settings.stt_timeout,
+    Returns:
+        False, leaving the file in place, if it exceeds stt_hedge_max_upload_size
+    """
+    name, file, content_type = upload["files"]["file"]
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    if size > settings.stt_hedge_max_upload_size:
+        return False
+    upload["files"]["file"] = (name, await asyncio.to_thread(file.read), content_type)
+    return True
+
+
+@router.post("/transcriptions", openapi_extra=TRANSCRIPTION_OPENAPI)
+async def create_transcription(request: Request):
+    """
+    Transcribe audio to text (OpenAI-compatible)
+
+    Proxies request to STT service. The multipart body is relayed as it
+    arrives, so the gateway holds at most one chunk of the upload in memory
+    and the upstream transfer overlaps with the client upload. With hedging
+    enabled, uploads up to stt_hedge_max_upload_size are also copied so a
+    slow transcription can be resent to a second replica. With
+    pre-normalization enabled, the upload is instead decoded on the gateway
+    and forwarded as compact 16 kHz mono audio.
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        if not content_type.startswith("multipart/form-data"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": "Expected a multipart/form-data body"},
             )
 
+        # Reject oversized uploads before reading any of the body
+        headers = {"content-type": content_type}
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > settings.max_upload_size:
+                raise _upload_too_large(int(content_length))
+            headers["content-length"] = content_length
+
+        logger.info(f"Transcription request: {content_length or 'chunked'} bytes")
+
+        # Monolith replicas take the client's OpenAI-compatible form as is
+        path = "/v1/audio/transcriptions" if backends.stt.monolith else "/transcribe"
+
+        # Wait for capacity before reading the upload, then forward to STT service.
+        # The upload size says little about audio length (compressed or chunked
+        # uploads), so every transcription costs one slot; the STT service itself
+        # admits by decoded duration.
+        async with backends.stt.admission.admit(1):
+            try:
+                if normalizer.enabled:
+                    async with _prenormalized_upload(request) as upload:
+                        if settings.stt_hedging and await _buffer_for_hedging(upload):
+                            response = await hedged_request(
+                                backends.stt,
+                                settings.stt_hedge_quantile,
+                                settings.stt_hedge_min_samples,
+                                "POST",
+                                path,
+                                lambda: upload,
+                                **upload,
+                            )
+                        else:
+                            response = await backends.stt.request("POST", path, **upload)
+                elif _hedgeable(content_length):
+                    capture = _UploadCapture()
+                    response = await hedged_request(
+                        backends.stt,
+                        settings.stt_hedge_quantile,
+                        settings.stt_hedge_min_samples,
+                        "POST",
+                        path,
+                        partial(capture.hedge_kwargs, headers),
+                        content=_limited_stream(request, capture),
+                        headers=headers,
+                    )
+                else:
+                    response = await backends.stt.request(
+                        "POST", path, content=_limited_stream(request), headers=headers
+                    )
+            except _UploadTooLargeError as e:
+                raise _upload_too_large(e.received)
+
         # Return response
         if response.status_code == 200:
-            if response_format == "text":
-                return Response(content=response.content, media_type="text/plain")
-            elif response_format in ["srt", "vtt"]:
-                media_type = "text/srt" if response_format == "srt" else "text/vtt"
-                return Response(content=response.content, media_type=media_type)
-            else:
-                return response.json()
+            return Response(
+                content=response.content,
+                media_type=response.headers.get("content-type", "application/json"),
+            )
         else:
             raise HTTPException(
                 status_code=response.status_code,
                 detail=response.json() if response.content else {"error": "STT service error"},
+                headers=_retry_after(response),
             )
 
+    except HTTPException:
+        raise
+    except AdmissionRejectedError as e:
+        raise _overloaded(e)
+    except CircuitOpenError as e:
+        raise _circuit_open(e)
     except httpx.TimeoutException:
         logger.error("STT service timeout")
         raise HTTPException(
@@ -111,12 +384,111 @@ async def create_transcription(
         )
 
 
+SPEECH_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "flac": "audio/flac",
+    "opus": "audio/opus",
+    "aac": "audio/aac",
+    "pcm": "audio/pcm",
+}
+
+# Upstream headers relayed on streamed audio responses. The body is relayed
+# undecoded, so content-length and content-encoding stay valid together.
+STREAM_PASSTHROUGH_HEADERS = ("content-length", "content-encoding", "x-sample-rate")
+
+
+async def _finish_stream(response: httpx.Response, ticket: AdmissionTicket) -> None:
+    """Close the upstream response and return its admission cost (idempotent)"""
+    try:
+        await response.aclose()
+    finally:
+        ticket.release()
+
+
+async def _start_speech(
+    tts_request: Dict, cost: float, transcode: bool = False, cache_key: Optional[str] = None
+) -> Union[ResponseBroadcast, httpx.Response]:
+    """
+    Wait for capacity and send a synthesis request to the TTS service
+
+    Args:
+        tts_request: TTS service request
+        cost: Admission cost (characters)
+        transcode: Request raw PCM and encode it to the requested format here
+        cache_key: Cache key for the encoded audio when transcoding
+
+    Returns:
+        A broadcast relaying the body as it arrives for a 200 response,
+        otherwise the buffered error response
+    """
+    ticket = await backends.tts.admission.acquire(cost)
+    upstream_request = transcoder.upstream_request(tts_request) if transcode else tts_request
+    try:
+        # Same voice, same replica: its voice conditioning and caches stay warm
+        response = await backends.tts.request(
+            "POST",
+            "/v1/audio/speech" if backends.tts.monolith else "/synthesize",
+            json=upstream_request,
+            stream=True,
+            routing_key=tts_request.get("speaker"),
+        )
+    except BaseException:
+        ticket.release()
+        raise
+
+    if response.status_code != 200:
+        try:
+            await response.aread()
+        finally:
+            await _finish_stream(response, ticket)
+        return response
+
+    if transcode:
+        try:
+            response = await transcoder.open(response, tts_request["response_format"], cache_key)
+        except BaseException:
+            await _finish_stream(response, ticket)
+            raise
+
+    # The admission ticket is held until the body has been relayed
+    return ResponseBroadcast(response, on_close=partial(_finish_stream, response, ticket))
+
+
+def _subscribe(
+    response: Union[ResponseBroadcast, httpx.Response],
+) -> Tuple[Union[ResponseBroadcast, httpx.Response], Optional[Subscription]]:
+    """Per-caller view of a shared speech response (coalescer attach hook)"""
+    if isinstance(response, ResponseBroadcast):
+        return response, response.subscribe()
+    return response, None
+
+
+async def _unsubscribe(
+    joined: Tuple[Union[ResponseBroadcast, httpx.Response], Optional[Subscription]],
+) -> None:
+    """Release a subscription nobody will stream (coalescer detach hook)"""
+    _, subscription = joined
+    if subscription is not None:
+        await subscription.close()
+
+
 @router.post("/speech")
-async def create_speech(request: TTSRequest):
+async def create_speech(
+    request: TTSRequest,
+    x_priority: Optional[str] = Header(default=None),
+):
     """
     Generate speech from text (OpenAI-compatible)
 
-    Proxies request to TTS service
+    Proxies request to TTS service. The scheduling class (interactive/bulk)
+    is taken from the priority field or the X-Priority header. Audio is
+    streamed back as the TTS service sends it rather than buffered first;
+    identical concurrent requests share one upstream synthesis. A client
+    disconnecting only cancels the upstream request once no other client is
+    waiting on it. With gateway transcoding enabled, compressed formats are
+    encoded here from raw PCM and served from the encoded audio cache when
+    possible.
     """
     try:
         logger.info(
@@ -124,67 +496,92 @@ async def create_speech(request: TTSRequest):
             f"format={request.response_format}, text_length={len(request.input)}"
         )
 
-        # Map OpenAI-style request to TTS service format
-        # Language detection: auto-detect from voice name or text
-        language = None
-        speaker = request.voice
-
-        # Map common voice names to language names (TTS service expects full names)
-        chinese_speakers = ["vivian", "serena", "uncle_fu", "dylan", "eric"]
-        english_speakers = ["ryan", "aiden"]
-        japanese_speakers = ["ono_anna"]
-        korean_speakers = ["sohee"]
-
-        if speaker.lower() in chinese_speakers:
-            language = "Chinese"
-        elif speaker.lower() in english_speakers:
-            language = "English"
-        elif speaker.lower() in japanese_speakers:
-            language = "Japanese"
-        elif speaker.lower() in korean_speakers:
-            language = "Korean"
-        # If not matched, let TTS service auto-detect
-
-        # Prepare TTS service request
-        tts_request = {
-            "input": request.input,
-            "speaker": speaker,
-            "language": language,
-            "response_format": request.response_format,
-            "speed": request.speed,
+        if backends.tts.monolith:
+            # Monolith replicas take the OpenAI-compatible request and its voices
+            # (registered voice ids or reference audio) as is; they have no priorities
+            tts_request = request.model_dump(exclude={"priority"}, exclude_none=True)
+        else:
+            # Map OpenAI-style request to TTS service format
+            speaker, language = _map_voice(request.voice)
+
+            # Prepare TTS service request
+            tts_request = {
+                "input": request.input,
+                "speaker": speaker,
+                "language": language,
+                "response_format": request.response_format,
+                "speed": request.speed,
+            }
+            priority = request.priority or x_priority
+            if priority:
+                tts_request["priority"] = priority.lower()
+            if request.sample_rate:
+                tts_request["sample_rate"] = request.sample_rate
+            if request.sample_format:
+                tts_request["sample_format"] = request.sample_format
+
+        media_type = SPEECH_MEDIA_TYPES.get(request.response_format, "audio/wav")
+        headers = {
+            "Content-Disposition": f'attachment; filename="speech.{request.response_format}"'
         }
 
-        # Forward to TTS service
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.tts_service_url}/synthesize",
-                json=tts_request,
-                timeout=settings.tts_timeout,
+        # Encoded variants are cached by what they sound like (not by priority)
+        transcode = transcoder.handles(request.response_format, request.sample_format)
+        cache_key = None
+        if transcode:
+            cache_key = request_key(
+                "speech", {name: value for name, value in tts_request.items() if name != "priority"}
             )
+            cached = transcoder.cache.get(cache_key)
+            if cached is not None:
+                audio, sample_rate = cached
+                logger.info("Speech served from the encoded audio cache")
+                return Response(
+                    content=audio,
+                    media_type=media_type,
+                    headers={**headers, "X-Sample-Rate": sample_rate},
+                )
 
-        # Return response
-        if response.status_code == 200:
-            media_types = {
-                "wav": "audio/wav",
-                "mp3": "audio/mpeg",
-                "flac": "audio/flac",
-                "opus": "audio/opus",
-            }
-            media_type = media_types.get(request.response_format, "audio/wav")
+        # Identical concurrent requests share one upstream synthesis; every
+        # caller is subscribed inside the flight, before any starts streaming
+        key = request_key("speech", tts_request)
+        (response, subscription), shared = await backends.tts.coalescer.do(
+            key,
+            lambda: _start_speech(tts_request, len(request.input), transcode, cache_key),
+            attach=_subscribe,
+            detach=_unsubscribe,
+        )
+        if shared:
+            logger.info("Speech request coalesced with an identical in-flight request")
 
-            return Response(
-                content=response.content,
-                media_type=media_type,
-                headers={
-                    "Content-Disposition": f'attachment; filename="speech.{request.response_format}"'
-                },
-            )
-        else:
+        if subscription is None:
             raise HTTPException(
                 status_code=response.status_code,
                 detail=response.json() if response.content else {"error": "TTS service error"},
+                headers=_retry_after(response),
             )
 
+        if request.response_format == "pcm":
+            # G.711 output is labelled audio/PCMU or audio/PCMA by the TTS service
+            media_type = response.headers.get("content-type", media_type)
+
+        for name in STREAM_PASSTHROUGH_HEADERS:
+            if name in response.headers:
+                headers[name] = response.headers[name]
+
+        return StreamingResponse(
+            subscription.stream(),
+            media_type=media_type,
+            headers=headers,
+            background=BackgroundTask(subscription.close),
+        )
+
+    except HTTPException:
+        raise
+    except AdmissionRejectedError as e:
+        raise _overloaded(e)
+    except CircuitOpenError as e:
+        raise _circuit_open(e)
     except httpx.TimeoutException:
         logger.error("TTS service timeout")
         raise HTTPException(
@@ -203,3 +600,175 @@ async def create_speech(request: TTSRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": str(e)},
         )
+
+
+# ============================================
+# Long-form TTS jobs
+# ============================================
+
+
+def _job_error(response: httpx.Response) -> HTTPException:
+    return HTTPException(
+        status_code=response.status_code,
+        detail=response.json() if response.content else {"error": "TTS service error"},
+        headers=_retry_after(response),
+    )
+
+
+async def _tts_job_request(method: str, path: str, **kwargs) -> httpx.Response:
+    """Send a job request to the TTS service, mapping transport errors"""
+    if backends.tts.monolith:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail={"error": "Speech jobs require the TTS service (monolith replicas lack them)"},
+        )
+    try:
+        return await backends.tts.request(method, path, **kwargs)
+    except CircuitOpenError as e:
+        raise _circuit_open(e)
+    except httpx.TimeoutException:
+        logger.error("TTS service timeout")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={"error": "TTS service timeout"},
+        )
+    except httpx.RequestError as e:
+        logger.error(f"TTS service connection error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": f"TTS service unavailable: {e}"},
+        )
+
+
+async def _tts_job_lookup(method: str, path: str, **kwargs) -> httpx.Response:
+    """
+    Send a request about an existing job to the replica that owns it
+
+    Job state lives on the disk of the TTS replica that created the job, so
+    replicas are asked in turn until one does not answer 404. With
+    stream=True the returned response must be closed by the caller.
+    """
+    response = None
+    unreachable = None
+    for replica in backends.tts.replicas:
+        if response is not None:
+            await response.aclose()
+        try:
+            response = await _tts_job_request(method, path, replica=replica, **kwargs)
+        except HTTPException as e:
+            # The job may still live on another replica
+            unreachable = e
+            response = None
+            continue
+        if response.status_code != status.HTTP_404_NOT_FOUND:
+            return response
+    if response is None:
+        raise unreachable
+    return response
+
+
+@router.post("/speech/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_speech_job(request: TTSJobRequest):
+    """
+    Create a long-form speech job
+
+    Accepts text of any length; rendering runs in the background on the TTS
+    service at bulk priority.
+    """
+    logger.info(
+        f"Speech job request: format={request.response_format}, text_length={len(request.input)}"
+    )
+    speaker, language = _map_voice(request.voice)
+    response = await _tts_job_request(
+        "POST",
+        "/jobs",
+        routing_key=speaker,
+        json={
+            "input": request.input,
+            "speaker": speaker,
+            "language": language,
+            "response_format": request.response_format,
+            "speed": request.speed,
+        },
+    )
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        raise _job_error(response)
+    return response.json()
+
+
+@router.post("/speech/jobs/file", status_code=status.HTTP_202_ACCEPTED)
+async def create_speech_job_from_file(
+    file: UploadFile = File(...),
+    voice: str = Form(...),
+    response_format: str = Form(default="wav"),
+    speed: float = Form(default=1.0),
+):
+    """Create a long-form speech job from an uploaded UTF-8 text file"""
+    speaker, language = _map_voice(voice)
+    data = {"speaker": speaker, "response_format": response_format, "speed": speed}
+    if language:
+        data["language"] = language
+    response = await _tts_job_request(
+        "POST",
+        "/jobs/file",
+        routing_key=speaker,
+        files={"file": (file.filename, await file.read(), file.content_type)},
+        data=data,
+    )
+    if response.status_code != status.HTTP_202_ACCEPTED:
+        raise _job_error(response)
+    return response.json()
+
+
+@router.get("/speech/jobs/{job_id}")
+async def get_speech_job(job_id: str):
+    """Speech job status and progress"""
+    response = await _tts_job_lookup("GET", f"/jobs/{job_id}")
+    if response.status_code != 200:
+        raise _job_error(response)
+    return response.json()
+
+
+@router.get("/speech/jobs/{job_id}/content")
+async def get_speech_job_content(
+    job_id: str,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+):
+    """
+    Download the rendered part of a speech job, honoring Range requests
+
+    The audio is relayed as it is read from the TTS replica, never held in
+    full on the gateway (a finished job can be an entire audiobook).
+    """
+    headers = {"Range": range_header} if range_header else None
+    response = await _tts_job_lookup("GET", f"/jobs/{job_id}/audio", headers=headers, stream=True)
+    if response.status_code not in (200, 206, 416):
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        raise _job_error(response)
+
+    passthrough = (
+        "content-length",
+        "content-range",
+        "accept-ranges",
+        "content-disposition",
+        "x-job-status",
+    )
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        headers={k: v for k, v in response.headers.items() if k.lower() in passthrough},
+        background=BackgroundTask(response.aclose),
+    )
+
+
+@router.delete("/speech/jobs/{job_id}")
+async def delete_speech_job(job_id: str):
+    """Cancel a speech job and delete its output"""
+    response = await _tts_job_lookup("DELETE", f"/jobs/{job_id}")
+    if response.status_code != 200:
+        raise _job_error(response)
+    return response.json()
@@ -4,10 +4,12 @@ Health Router - Health check and service status
 
 import logging
 
-import httpx
 from fastapi import APIRouter
 
-from app.config import settings
+from app.clients import backends
+from app.health_monitor import health_monitor
+from app.prenormalize import normalizer
+from app.transcode import transcoder
 
 logger = logging.getLogger(__name__)
 
@@ -19,63 +21,25 @@ async def health_check():
     """
     Gateway health check
 
-    Checks status of STT and TTS services
+    Served from the health monitor's latest snapshot of every STT and TTS
+    replica; the backends are not contacted on this request
     """
-    try:
-        stt_status = "unknown"
-        tts_status = "unknown"
+    return health_monitor.snapshot()
 
-        # Check STT service
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{settings.stt_service_url}/health", timeout=5)
-                if response.status_code == 200:
-                    stt_data = response.json()
-                    stt_status = stt_data.get("status", "unknown")
-        except Exception as e:
-            logger.warning(f"STT service health check failed: {e}")
-            stt_status = "unavailable"
 
-        # Check TTS service
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{settings.tts_service_url}/health", timeout=5)
-                if response.status_code == 200:
-                    tts_data = response.json()
-                    tts_status = tts_data.get("status", "unknown")
-        except Exception as e:
-            logger.warning(f"TTS service health check failed: {e}")
-            tts_status = "unavailable"
-
-        # Determine overall status
-        if stt_status == "healthy" and tts_status == "healthy":
-            overall_status = "healthy"
-        elif stt_status == "unavailable" and tts_status == "unavailable":
-            overall_status = "unhealthy"
-        else:
-            overall_status = "degraded"
-
-        return {
-            "status": overall_status,
-            "gateway": "healthy",
-            "services": {
-                "stt": {
-                    "status": stt_status,
-                    "url": settings.stt_service_url,
-                },
-                "tts": {
-                    "status": tts_status,
-                    "url": settings.tts_service_url,
-                },
-            },
-        }
+@router.get("/metrics")
+async def metrics():
+    """
+    Gateway metrics
 
-    except Exception as e:
-        logger.error(f"Health check failed: {e}", exc_info=True)
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-        }
+    Connection pool and load balancer statistics per backend, STT audio
+    pre-normalization counters and TTS transcoding/cache counters
+    """
+    return {
+        "backends": backends.stats(),
+        "prenormalize": normalizer.stats(),
+        "transcode": transcoder.stats(),
+    }
 
 
 @router.get("/v1/models")
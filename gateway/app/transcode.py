@@ -0,0 +1,273 @@
+"""
+Output Transcoding - Encode TTS audio on the gateway
+Requests raw PCM from the TTS service and encodes it to the client's format
+(mp3/opus/aac/flac) in ffmpeg processes on the gateway, streaming the encoded
+audio as it is produced, so compression no longer competes with the model for
+CPU on the GPU host. Finished encodings are kept in an LRU cache.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from opentalker_common.codecs import (
+    FFMPEG_FORMATS,
+    STREAM_READ_SIZE,
+    encoded_sample_rate,
+)
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Formats the gateway can encode: (codec, muxer); flac is lossless and takes no bitrate
+TRANSCODE_FORMATS = {**FFMPEG_FORMATS, "flac": ("flac", "flac")}
+
+# Sample rate assumed when the TTS service does not report one
+_DEFAULT_SAMPLE_RATE = 24000
+
+
+class EncodedAudioCache:
+    """LRU cache of encoded responses, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Encoded audio and its sample rate, None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, audio: bytes, sample_rate: str) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[0])
+        self._entries[key] = (audio, sample_rate)
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class TranscodedResponse:
+    """
+    Upstream raw PCM response re-encoded by an ffmpeg process
+
+    Mimics the parts of httpx.Response used by ResponseBroadcast
+    (status_code, headers, aiter_raw, aclose): upstream chunks are fed to the
+    encoder as they arrive and the encoder's output is yielded as it comes.
+    """
+
+    def __init__(
+        self,
+        transcoder: "AudioTranscoder",
+        upstream: httpx.Response,
+        process: asyncio.subprocess.Process,
+        cache_key: Optional[str],
+        sample_rate: str,
+    ):
+        self.status_code = upstream.status_code
+        self.headers = httpx.Headers({"x-sample-rate": sample_rate})
+        self._transcoder = transcoder
+        self._upstream = upstream
+        self._process = process
+        self._cache_key = cache_key
+        self._sample_rate = sample_rate
+        self._feeder: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def _feed(self) -> None:
+        stdin = self._process.stdin
+        try:
+            async for chunk in self._upstream.aiter_bytes():
+                stdin.write(chunk)
+                await stdin.drain()
+        finally:
+            stdin.close()
+
+    async def aiter_raw(self) -> AsyncIterator[bytes]:
+        self._feeder = asyncio.create_task(self._feed())
+        # Output is kept for the cache until it outgrows the cache
+        encoded: Optional[List[bytes]] = [] if self._cache_key is not None else None
+        size = 0
+        while True:
+            chunk = await self._process.stdout.read(STREAM_READ_SIZE)
+            if not chunk:
+                break
+            if encoded is not None:
+                size += len(chunk)
+                if size > self._transcoder.cache.max_bytes:
+                    encoded = None
+                else:
+                    encoded.append(chunk)
+            yield chunk
+
+        # Surface upstream read errors before checking the encoder
+        await self._feeder
+        returncode = await self._process.wait()
+        if returncode != 0:
+            stderr = (await self._process.stderr.read()).decode("utf-8", errors="replace")
+            raise RuntimeError(f"ffmpeg encoding failed: {stderr.strip()}")
+        self._transcoder.encoded += 1
+        if encoded is not None:
+            self._transcoder.cache.put(self._cache_key, b"".join(encoded), self._sample_rate)
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._feeder is not None and not self._feeder.done():
+                self._feeder.cancel()
+                try:
+                    await self._feeder
+                except BaseException:
+                    pass
+            if self._process.returncode is None:
+                self._process.kill()
+                await self._process.wait()
+        finally:
+            self._transcoder._slots.release()
+            await self._upstream.aclose()
+
+
+class AudioTranscoder:
+    """
+    Gateway-side encoder for TTS responses
+
+    At most `workers` ffmpeg encoders run at once (0 = one per CPU); further
+    requests wait for a free encoder while holding their upstream response.
+    `bitrates` maps lossy formats to their ffmpeg bitrate (e.g. {"mp3": "128k"}).
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        formats: str,
+        workers: int,
+        cache_bytes: int,
+        bitrates: Optional[Dict[str, str]] = None,
+    ):
+        self.ffmpeg = shutil.which("ffmpeg")
+        if enabled and self.ffmpeg is None:
+            logger.warning("TTS transcoding on the gateway disabled: ffmpeg not found")
+        self.enabled = enabled and self.ffmpeg is not None
+        self.formats = [
+            name.strip() for name in formats.split(",") if name.strip() in TRANSCODE_FORMATS
+        ]
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._slots = asyncio.Semaphore(self.workers)
+        self.cache = EncodedAudioCache(cache_bytes)
+        self.bitrates = bitrates or {}
+        self.encoded = 0
+
+    def handles(self, response_format: str, sample_format: Optional[str]) -> bool:
+        """Whether a speech request is encoded on the gateway"""
+        return self.enabled and response_format in self.formats and sample_format in (None, "pcm16")
+
+    @staticmethod
+    def upstream_request(tts_request: Dict) -> Dict:
+        """The TTS service request asking for raw PCM16 instead of the client's format"""
+        return {**tts_request, "response_format": "pcm", "sample_format": "pcm16"}
+
+    async def open(
+        self, upstream: httpx.Response, response_format: str, cache_key: Optional[str]
+    ) -> TranscodedResponse:
+        """
+        Start encoding a streamed raw PCM response
+
+        Args:
+            upstream: Streamed 200 response from the TTS service (raw PCM16 mono)
+            response_format: Target format
+            cache_key: Key to cache the finished encoding under, None to skip
+
+        Returns:
+            Response-like object streaming the encoded audio; closing it stops
+            the encoder and closes the upstream response
+        """
+        codec, muxer = TRANSCODE_FORMATS[response_format]
+        bitrate = self.bitrates.get(response_format)
+        sample_rate = upstream.headers.get("x-sample-rate", str(_DEFAULT_SAMPLE_RATE))
+        command = [
+            self.ffmpeg,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            sample_rate,
+            "-ac",
+            "1",
+            "-i",
+            "pipe:0",
+            "-c:a",
+            codec,
+        ]
+        if bitrate:
+            command += ["-b:a", bitrate]
+        output_rate = str(encoded_sample_rate(response_format, int(sample_rate)))
+        if output_rate != sample_rate:
+            sample_rate = output_rate
+            command += ["-ar", sample_rate]
+        command += ["-f", muxer, "pipe:1"]
+
+        await self._slots.acquire()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        return TranscodedResponse(self, upstream, process, cache_key, sample_rate)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "formats": self.formats,
+            "workers": self.workers,
+            "encoded": self.encoded,
+            "cache": self.cache.stats(),
+        }
+
+
+# Global transcoder
+transcoder = AudioTranscoder(
+    settings.tts_transcode,
+    settings.tts_transcode_formats,
+    settings.tts_transcode_workers,
+    settings.tts_transcode_cache_bytes,
+    {
+        "mp3": settings.tts_transcode_mp3_bitrate,
+        "opus": settings.tts_transcode_opus_bitrate,
+        "aac": settings.tts_transcode_aac_bitrate,
+    },
+)
@@ -0,0 +1,296 @@
+"""
+Tests for replica selection (app.balancer).
+"""
+
+import math
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.balancer import ReplicaPool, ResidencyTable
+from app.clients import BackendClient
+
+URLS = ["http://a", "http://b", "http://c"]
+
+
+def _pool(policy="p2c", urls=URLS, **options):
+    return ReplicaPool("tts", urls, policy=policy, **options)
+
+
+def _replica(pool, url):
+    return next(replica for replica in pool.replicas if replica.url == url)
+
+
+class TestSelection:
+    """Test the p2c and least_outstanding policies."""
+
+    def test_rejects_bad_configuration(self):
+        with pytest.raises(ValueError):
+            ReplicaPool("tts", [])
+        with pytest.raises(ValueError):
+            _pool(policy="round_robin")
+
+    def test_least_outstanding_picks_fewest_in_flight(self):
+        pool = _pool("least_outstanding")
+        for url, in_flight in zip(URLS, (3, 1, 2)):
+            _replica(pool, url).in_flight = in_flight
+        assert all(pool.pick().url == "http://b" for _ in range(20))
+
+    def test_p2c_picks_less_loaded_of_two(self):
+        """With two random choices the most loaded replica can never win."""
+        pool = _pool("p2c")
+        for url, in_flight in zip(URLS, (0, 1, 5)):
+            _replica(pool, url).in_flight = in_flight
+        picks = Counter(pool.pick().url for _ in range(300))
+        assert picks["http://c"] == 0
+        assert picks["http://a"] > picks["http://b"] > 0
+
+    def test_markedly_slow_replica_skipped_on_ties(self):
+        pool = _pool("least_outstanding")
+        _replica(pool, "http://a").ewma_latency = 0.1
+        _replica(pool, "http://b").ewma_latency = 0.12
+        _replica(pool, "http://c").ewma_latency = 1.0
+        picks = {pool.pick().url for _ in range(100)}
+        assert picks == {"http://a", "http://b"}
+
+    def test_unhealthy_replicas_skipped(self):
+        pool = _pool("least_outstanding")
+        _replica(pool, "http://a").record_health("loading", 0.01)
+        _replica(pool, "http://b").record_health("unreachable", 0.01)
+        assert all(pool.pick().url == "http://c" for _ in range(20))
+
+    def test_fails_open_when_nothing_available(self):
+        pool = _pool("least_outstanding")
+        for replica in pool.replicas:
+            replica.record_health("unreachable", 0.01)
+        assert {pool.pick().url for _ in range(100)} == set(URLS)
+
+    def test_pick_other(self):
+        pool = _pool()
+        a, b, c = pool.replicas
+        b.ejected = True
+        assert pool.pick_other(a) is c
+        c.record_health("unreachable", 0.01)
+        assert pool.pick_other(a) is None
+
+    def test_latency_ewma(self):
+        pool = _pool()
+        replica = pool.replicas[0]
+        for latency in (1.0, 2.0):
+            pool.begin(replica)
+            pool.end(replica, latency)
+        assert replica.ewma_latency == pytest.approx(1.3)
+        assert replica.in_flight == 0
+        assert replica.requests == 2
+
+
+class TestEjection:
+    """Test passive ejection and re-admission."""
+
+    def _fail(self, pool, replica, times):
+        for _ in range(times):
+            pool.begin(replica)
+            pool.end(replica, failed=True)
+
+    def test_consecutive_failures_eject(self):
+        pool = _pool("least_outstanding", eject_failures=3)
+        a = _replica(pool, "http://a")
+        self._fail(pool, a, 2)
+        assert not a.ejected
+        self._fail(pool, a, 1)
+        assert a.ejected
+        assert a.errors == 3
+        assert all(pool.pick() is not a for _ in range(20))
+
+    def test_success_resets_failures(self):
+        pool = _pool(eject_failures=3)
+        a = pool.replicas[0]
+        self._fail(pool, a, 2)
+        pool.begin(a)
+        pool.end(a, 0.1)
+        self._fail(pool, a, 2)
+        assert not a.ejected
+
+    def test_abandoned_request_does_not_reset_failures(self):
+        """A cancelled request says nothing about the replica's health."""
+        pool = _pool(eject_failures=3)
+        a = pool.replicas[0]
+        self._fail(pool, a, 2)
+        pool.begin(a)
+        pool.abandon(a)
+        assert a.in_flight == 0
+        self._fail(pool, a, 1)
+        assert a.ejected
+
+    def test_readmit_after_recovery(self):
+        pool = _pool("least_outstanding", eject_failures=1)
+        a = _replica(pool, "http://a")
+        self._fail(pool, a, 1)
+        assert a.ejected
+        pool.readmit(a)
+        assert not a.ejected
+        assert a.consecutive_failures == 0
+        assert a.available
+
+
+class TestConsistentHash:
+    """Test voice affinity with bounded loads."""
+
+    VOICES = [f"voice-{i}" for i in range(200)]
+
+    def test_same_key_same_replica(self):
+        pool = _pool("consistent_hash")
+        assert len({pool.pick("vivian").url for _ in range(20)}) == 1
+
+    def test_ring_is_stable_across_pools(self):
+        """Every gateway instance maps a voice to the same replica."""
+        first, second = _pool("consistent_hash"), _pool("consistent_hash")
+        assert [first.pick(v).url for v in self.VOICES] == [second.pick(v).url for v in self.VOICES]
+
+    def test_keys_spread_over_replicas(self):
+        pool = _pool("consistent_hash")
+        owners = Counter(pool.pick(voice).url for voice in self.VOICES)
+        assert set(owners) == set(URLS)
+        assert min(owners.values()) > len(self.VOICES) / len(URLS) / 2
+
+    def test_spills_past_overloaded_owner(self):
+        pool = _pool("consistent_hash", load_factor=1.25)
+        owner = pool.pick("vivian")
+        for replica in pool.replicas:
+            replica.in_flight = 2
+        # Bound: ceil(1.25 * (6 + 1) / 3) = 3
+        assert pool.pick("vivian") is owner
+        owner.in_flight = 4
+        # Bound: ceil(1.25 * (8 + 1) / 3) = 4
+        assert pool.pick("vivian") is not owner
+        assert pool.affinity_stats()["spilled"] == 1
+
+    def test_load_stays_bounded(self):
+        """Piling one hot voice on the pool never exceeds the bound on any replica."""
+        pool = _pool("consistent_hash", load_factor=1.25)
+        for placed in range(1, 31):
+            pool.begin(pool.pick("hot-voice"))
+            bound = math.ceil(1.25 * placed / len(URLS))
+            assert max(replica.in_flight for replica in pool.replicas) <= bound
+
+    def test_only_unavailable_owners_lose_keys(self):
+        """Ejecting a replica moves its keys elsewhere and leaves the others in place."""
+        pool = _pool("consistent_hash")
+        before = {voice: pool.pick(voice) for voice in self.VOICES}
+        ejected = _replica(pool, "http://a")
+        ejected.ejected = True
+        for voice, owner in before.items():
+            replica = pool.pick(voice)
+            if owner is ejected:
+                assert replica is not ejected
+            else:
+                assert replica is owner
+
+    def test_unkeyed_requests_go_to_least_loaded(self):
+        pool = _pool("consistent_hash")
+        for url, in_flight in zip(URLS, (2, 0, 1)):
+            _replica(pool, url).in_flight = in_flight
+        assert all(pool.pick().url == "http://b" for _ in range(50))
+        assert pool.affinity_stats()["routed"] == 0
+
+
+class TestResidency:
+    """Test model residency routing across monolith replicas."""
+
+    def _pools(self, **options):
+        options.setdefault("load_factor", 2.0)
+        table = ResidencyTable()
+        stt = ReplicaPool("stt", URLS, policy="residency", residency=table, **options)
+        tts = ReplicaPool("tts", URLS, policy="residency", residency=table, **options)
+        return table, stt, tts
+
+    def test_prefers_replica_holding_the_model(self):
+        table, stt, tts = self._pools()
+        table.record("http://a", "tts", 0)
+        table.record("http://b", "stt", 1)
+        table.record("http://c", "none", 0)
+        assert all(stt.pick().url == "http://b" for _ in range(20))
+        assert all(tts.pick().url == "http://a" for _ in range(20))
+        assert stt.residency_stats()["switches"] == 0
+
+    def test_least_loaded_resident_replica(self):
+        table, stt, _ = self._pools()
+        table.record("http://a", "stt", 3)
+        table.record("http://b", "stt", 1)
+        table.record("http://c", "stt", 2)
+        assert stt.pick().url == "http://b"
+
+    def test_switch_prefers_empty_replica_and_sticks(self):
+        """Requests after a switch follow it instead of flipping other replicas."""
+        table, stt, _ = self._pools()
+        table.record("http://a", "tts", 0)
+        table.record("http://b", "none", 1)
+        table.record("http://c", "tts", 0)
+        first = stt.pick()
+        assert first.url == "http://b"
+        assert table.models["http://b"] == "stt"
+        stt.begin(first)
+        assert stt.pick() is first
+        assert stt.residency_stats()["switches"] == 1
+
+    def test_switches_least_loaded_when_none_is_empty(self):
+        table, _, tts = self._pools()
+        table.record("http://a", "stt", 2)
+        table.record("http://b", "stt", 0)
+        table.record("http://c", "stt", 1)
+        assert tts.pick().url == "http://b"
+
+    def test_load_counts_both_pools(self):
+        """A replica busy with transcriptions is loaded for speech requests too."""
+        table, stt, tts = self._pools()
+        for url in URLS:
+            table.record(url, "tts", 0)
+        stt_a = _replica(stt, "http://a")
+        for _ in range(2):
+            stt.begin(stt_a)
+        assert table.load(_replica(tts, "http://a")) == 2
+        assert tts.pick().url in {"http://b", "http://c"}
+
+    def test_overloaded_resident_replica_spills(self):
+        """A lone resident replica far above the average load gets help."""
+        table, stt, _ = self._pools()
+        table.record("http://a", "stt", 0)
+        table.record("http://b", "tts", 0)
+        table.record("http://c", "tts", 0)
+        a = _replica(stt, "http://a")
+        for _ in range(2):
+            stt.begin(a)
+        # Bound: ceil(2.0 * (2 + 1) / 3) = 2
+        assert stt.pick() is not a
+        assert stt.residency_stats()["switches"] == 1
+
+    def test_unavailable_resident_replica_skipped(self):
+        table, stt, _ = self._pools()
+        table.record("http://a", "stt", 0)
+        table.record("http://b", "tts", 0)
+        table.record("http://c", "tts", 0)
+        _replica(stt, "http://a").record_health("unavailable", 0.01)
+        assert stt.pick().url != "http://a"
+
+    @pytest.mark.asyncio
+    async def test_probe_records_monolith_residency(self):
+        def health(request):
+            return httpx.Response(
+                200,
+                json={"status": "healthy", "model": {"model_type": "tts"}, "queue_depth": 4},
+            )
+
+        table = ResidencyTable()
+        backend = BackendClient(
+            "stt", ["http://a"], 10.0, 1.0, 10, 10, 5.0, policy="residency", residency=table
+        )
+        assert backend.monolith
+        replica = backend.replicas[0]
+        replica.client = httpx.AsyncClient(
+            base_url=replica.url, transport=httpx.MockTransport(health)
+        )
+        async with replica.client:
+            assert await backend.probe(replica) == "healthy"
+        assert table.models == {"http://a": "tts"}
+        assert table.load(replica) == 4
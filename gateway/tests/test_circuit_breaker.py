@@ -0,0 +1,159 @@
+"""
+Tests for the backend circuit breaker (app.circuit_breaker).
+"""
+
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _breaker(clock, **options):
+    options.setdefault("min_requests", 4)
+    options.setdefault("open_seconds", 10.0)
+    return CircuitBreaker("stt", clock=clock, **options)
+
+
+def _send(breaker, failed=False, timed_out=False):
+    trial = breaker.allow()
+    breaker.record(trial, failed, timed_out)
+    return trial
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_requests):
+        _send(breaker, failed=True)
+    assert breaker.state == OPEN
+
+
+class TestClosed:
+    """Test when a closed circuit opens."""
+
+    def test_opens_on_failure_ratio(self, clock):
+        breaker = _breaker(clock)
+        _send(breaker)
+        _send(breaker)
+        _send(breaker, failed=True)
+        assert breaker.state == CLOSED
+        _send(breaker, failed=True)
+        assert breaker.state == OPEN
+        assert breaker.opened == 1
+
+    def test_opens_on_timeout_ratio(self, clock):
+        breaker = _breaker(clock, failure_ratio=0.9, timeout_ratio=0.25)
+        for _ in range(3):
+            _send(breaker)
+        _send(breaker, failed=True, timed_out=True)
+        assert breaker.state == OPEN
+
+    def test_needs_min_requests(self, clock):
+        breaker = _breaker(clock)
+        for _ in range(3):
+            _send(breaker, failed=True)
+        assert breaker.state == CLOSED
+
+    def test_old_outcomes_expire(self, clock):
+        breaker = _breaker(clock, window=60.0)
+        for _ in range(3):
+            _send(breaker, failed=True)
+        clock.now += 61.0
+        for _ in range(3):
+            _send(breaker)
+        assert breaker.state == CLOSED
+        assert breaker.stats()["window_failures"] == 0
+
+    def test_disabled_never_opens(self, clock):
+        breaker = _breaker(clock, enabled=False)
+        for _ in range(10):
+            _send(breaker, failed=True)
+        assert breaker.state == CLOSED
+
+
+class TestOpen:
+    """Test refusing requests and the transition to half-open."""
+
+    def test_refuses_with_retry_after(self, clock):
+        breaker = _breaker(clock)
+        _trip(breaker)
+        clock.now += 3.5
+        with pytest.raises(CircuitOpenError) as refused:
+            breaker.allow()
+        assert refused.value.retry_after == 7
+        assert breaker.rejected == 1
+        assert breaker.stats()["retry_after"] == 7
+
+    def test_half_open_after_cool_down(self, clock):
+        breaker = _breaker(clock)
+        _trip(breaker)
+        clock.now += 9.9
+        assert breaker.state == OPEN
+        clock.now += 0.1
+        assert breaker.state == HALF_OPEN
+
+
+class TestHalfOpen:
+    """Test trial requests deciding between closed and open."""
+
+    def _half_open(self, clock, **options):
+        breaker = _breaker(clock, **options)
+        _trip(breaker)
+        clock.now += 10.0
+        assert breaker.state == HALF_OPEN
+        return breaker
+
+    def test_successful_trials_close(self, clock):
+        breaker = self._half_open(clock, half_open_requests=2)
+        first, second = breaker.allow(), breaker.allow()
+        assert first and second
+        breaker.record(first, failed=False)
+        assert breaker.state == HALF_OPEN
+        breaker.record(second, failed=False)
+        assert breaker.state == CLOSED
+        assert breaker.allow() is False
+
+    def test_failed_trial_reopens(self, clock):
+        breaker = self._half_open(clock)
+        trial = breaker.allow()
+        breaker.record(trial, failed=True)
+        assert breaker.state == OPEN
+        assert breaker.opened == 2
+        with pytest.raises(CircuitOpenError) as refused:
+            breaker.allow()
+        assert refused.value.retry_after == 10
+
+    def test_trial_slots_are_limited(self, clock):
+        breaker = self._half_open(clock)
+        assert breaker.allow()
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+
+    def test_abandoned_trial_releases_its_slot(self, clock):
+        """A cancelled trial frees its slot without deciding the circuit."""
+        breaker = self._half_open(clock)
+        breaker.abandon(breaker.allow())
+        assert breaker.state == HALF_OPEN
+        trial = breaker.allow()
+        assert trial
+        breaker.record(trial, failed=False)
+        assert breaker.state == CLOSED
+
+    def test_late_non_trial_outcome_is_ignored(self, clock):
+        """Requests admitted before the circuit opened do not count once it has."""
+        breaker = self._half_open(clock)
+        breaker.record(False, failed=True)
+        assert breaker.state == HALF_OPEN
+        assert breaker.stats()["window_requests"] == 0
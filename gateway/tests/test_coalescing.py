@@ -0,0 +1,134 @@
+"""
+Tests for coalesced speech requests (app.routers.audio, app.broadcast).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.clients import BackendClient, backends
+from app.routers import audio
+
+BODY = [bytes([index]) * 4096 for index in range(64)]
+
+
+class UpstreamBody(httpx.AsyncByteStream):
+    """Upstream audio whose chunks are all available at once; records closing."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeTTS:
+    """TTS service answering /synthesize after a short delay."""
+
+    def __init__(self, status_code=200):
+        self.requests = 0
+        self.bodies = []
+        self._status_code = status_code
+
+    async def __call__(self, request):
+        self.requests += 1
+        # Let every concurrent client join the flight before the upstream answers
+        await asyncio.sleep(0.05)
+        if self._status_code != 200:
+            return httpx.Response(self._status_code, json={"error": "overloaded"})
+        body = UpstreamBody(BODY)
+        self.bodies.append(body)
+        return httpx.Response(200, headers={"content-type": "audio/wav"}, stream=body)
+
+
+def _asgi_2_4(app):
+    """Report ASGI spec 2.4 like uvicorn, so Starlette streams responses inline."""
+
+    async def wrapped(scope, receive, send):
+        scope["asgi"] = {**scope.get("asgi", {}), "spec_version": "2.4"}
+        await app(scope, receive, send)
+
+    return wrapped
+
+
+@pytest_asyncio.fixture
+async def gateway(monkeypatch):
+    async def make(tts):
+        client = BackendClient(
+            "tts",
+            ["http://tts"],
+            timeout=5.0,
+            connect_timeout=1.0,
+            max_connections=10,
+            max_keepalive_connections=10,
+            keepalive_expiry=5.0,
+            coalesce=True,
+        )
+        await client.start()
+        replica = client.replicas[0]
+        await replica.client.aclose()
+        replica.client = httpx.AsyncClient(
+            base_url="http://tts", transport=httpx.MockTransport(tts)
+        )
+        clients.append(client)
+        monkeypatch.setattr(backends, "tts", client)
+
+        app = FastAPI()
+        app.include_router(audio.router, prefix="/v1/audio")
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=_asgi_2_4(app)), base_url="http://gw"
+        )
+
+    clients = []
+    yield make
+    for client in clients:
+        await client.close()
+
+
+SPEECH = {"input": "Hello there.", "voice": "Vivian"}
+
+
+class TestCoalescedSpeech:
+    """Test identical concurrent speech requests sharing one synthesis."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests(self, gateway):
+        """Every coalesced client receives the complete body."""
+        tts = FakeTTS()
+        client = await gateway(tts)
+        responses = await asyncio.gather(
+            *(client.post("/v1/audio/speech", json=SPEECH) for _ in range(5))
+        )
+        assert [response.status_code for response in responses] == [200] * 5
+        assert all(response.content == b"".join(BODY) for response in responses)
+        assert tts.requests == 1
+        assert tts.bodies[0].closed
+        assert backends.tts.coalescer.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_different_requests_are_not_coalesced(self, gateway):
+        tts = FakeTTS()
+        client = await gateway(tts)
+        await asyncio.gather(
+            client.post("/v1/audio/speech", json=SPEECH),
+            client.post("/v1/audio/speech", json={**SPEECH, "speed": 1.5}),
+        )
+        assert tts.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_reaches_every_client(self, gateway):
+        tts = FakeTTS(status_code=503)
+        client = await gateway(tts)
+        responses = await asyncio.gather(
+            *(client.post("/v1/audio/speech", json=SPEECH) for _ in range(3))
+        )
+        assert [response.status_code for response in responses] == [503] * 3
+        assert tts.requests == 1
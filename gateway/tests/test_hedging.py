@@ -0,0 +1,186 @@
+"""
+Tests for request hedging (app.hedging).
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+import pytest
+
+from app.hedging import HedgeBudget, hedged_request
+
+HEDGE_DELAY = 0.02
+SLOW = 1.0
+
+
+class FakeReplica:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakePool:
+    def __init__(self, urls):
+        self.replicas = [FakeReplica(url) for url in urls]
+
+    def pick(self):
+        return self.replicas[0]
+
+    def pick_other(self, exclude):
+        others = [replica for replica in self.replicas if replica is not exclude]
+        return others[0] if others else None
+
+
+class FakeBackend:
+    """BackendClient stand-in whose replicas answer after a set delay."""
+
+    def __init__(self, outcomes: Dict[str, tuple], budget: float = 1.0, delay=HEDGE_DELAY):
+        # url -> (seconds, status code or exception)
+        self.outcomes = outcomes
+        self.name = "stt"
+        self.pool = FakePool(outcomes)
+        self.hedge_budget = HedgeBudget(budget)
+        self.delay = delay
+        self.started = []
+        self.cancelled = []
+
+    def latency_quantile(self, quantile: float, min_samples: int) -> Optional[float]:
+        return self.delay
+
+    async def request(self, method, path, replica, **kwargs):
+        self.started.append((replica.url, kwargs))
+        seconds, outcome = self.outcomes[replica.url]
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            self.cancelled.append(replica.url)
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, text=replica.url)
+
+
+async def _send(backend, hedge_kwargs=lambda: {"content": b"retry"}):
+    return await hedged_request(
+        backend, 0.95, 20, "POST", "/transcribe", hedge_kwargs, content=b"first"
+    )
+
+
+class TestHedgeBudget:
+    """Test the token bucket capping hedges."""
+
+    def test_starts_empty(self):
+        budget = HedgeBudget(0.5)
+        assert not budget.try_spend()
+        assert budget.denied == 1
+
+    def test_ratio_of_requests(self):
+        budget = HedgeBudget(0.25)
+        spent = 0
+        for _ in range(100):
+            budget.deposit()
+            spent += budget.try_spend()
+        assert spent == 25
+        assert budget.stats()["hedged"] == 25
+
+    def test_burst_caps_saved_tokens(self):
+        budget = HedgeBudget(1.0, burst=2.0)
+        for _ in range(5):
+            budget.deposit()
+        assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+    def test_zero_ratio_never_hedges(self):
+        budget = HedgeBudget(0.0)
+        for _ in range(10):
+            budget.deposit()
+        assert not budget.try_spend()
+
+
+class TestHedgedRequest:
+    """Test sending, racing and cancelling hedged attempts."""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        backend = FakeBackend({"http://a": (0, 200), "http://b": (0, 200)})
+        response = await _send(backend)
+        assert response.text == "http://a"
+        assert [url for url, _ in backend.started] == ["http://a"]
+
+    @pytest.mark.asyncio
+    async def test_no_latency_history_is_not_hedged(self):
+        backend = FakeBackend({"http://a": (0.05, 200), "http://b": (0, 200)}, delay=None)
+        response = await _send(backend)
+        assert response.text == "http://a"
+        assert len(backend.started) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_and_primary_is_cancelled(self):
+        backend = FakeBackend({"http://a": (SLOW, 200), "http://b": (0, 200)})
+        response = await _send(backend)
+        assert response.text == "http://b"
+        assert backend.started[1] == ("http://b", {"content": b"retry"})
+        assert backend.cancelled == ["http://a"]
+        assert backend.hedge_budget.hedge_wins == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_wins_and_hedge_is_cancelled(self):
+        backend = FakeBackend({"http://a": (0.1, 200), "http://b": (SLOW, 200)})
+        response = await _send(backend)
+        assert response.text == "http://a"
+        assert backend.cancelled == ["http://b"]
+        assert backend.hedge_budget.hedge_wins == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_does_not_win(self):
+        """A 5xx from the faster attempt waits for the other one."""
+        backend = FakeBackend({"http://a": (0.1, 200), "http://b": (0, 503)})
+        response = await _send(backend)
+        assert response.text == "http://a"
+
+    @pytest.mark.asyncio
+    async def test_both_failed_returns_primary_response(self):
+        backend = FakeBackend({"http://a": (0.1, 502), "http://b": (0, 503)})
+        response = await _send(backend)
+        assert response.status_code == 502
+
+    @pytest.mark.asyncio
+    async def test_both_failed_raises_primary_error(self):
+        backend = FakeBackend(
+            {"http://a": (0.1, httpx.ReadTimeout("a")), "http://b": (0, httpx.ConnectError("b"))}
+        )
+        with pytest.raises(httpx.ReadTimeout):
+            await _send(backend)
+
+    @pytest.mark.asyncio
+    async def test_unrepeatable_request_is_not_hedged(self):
+        backend = FakeBackend({"http://a": (0.05, 200), "http://b": (0, 200)})
+        response = await _send(backend, hedge_kwargs=lambda: None)
+        assert response.text == "http://a"
+        assert len(backend.started) == 1
+        assert backend.hedge_budget.hedged == 0
+
+    @pytest.mark.asyncio
+    async def test_single_replica_is_not_hedged(self):
+        backend = FakeBackend({"http://a": (0.05, 200)})
+        response = await _send(backend)
+        assert response.text == "http://a"
+        assert len(backend.started) == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_budget_is_not_hedged(self):
+        backend = FakeBackend({"http://a": (0.05, 200), "http://b": (0, 200)}, budget=0.5)
+        response = await _send(backend)
+        assert response.text == "http://a"
+        assert len(backend.started) == 1
+        assert backend.hedge_budget.denied == 1
+
+    @pytest.mark.asyncio
+    async def test_caller_cancellation_cancels_both_attempts(self):
+        backend = FakeBackend({"http://a": (SLOW, 200), "http://b": (SLOW, 200)})
+        task = asyncio.create_task(_send(backend))
+        while len(backend.started) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert sorted(backend.cancelled) == ["http://a", "http://b"]
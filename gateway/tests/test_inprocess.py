@@ -0,0 +1,219 @@
+"""
+Tests for in-process backends (app.inprocess).
+"""
+
+import asyncio
+import sys
+import textwrap
+
+import httpx
+import pytest
+
+from app.inprocess import InProcessServices, InProcessTransport
+
+
+class UploadError(Exception):
+    pass
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return body
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+async def _start(send, status=200):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"x-app", b"test")]})
+
+
+def _client(app, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=InProcessTransport(app), base_url="http://svc", **kwargs)
+
+
+async def _upload(*chunks, error=None):
+    for chunk in chunks:
+        yield chunk
+    if error is not None:
+        raise error
+
+
+class TestInProcessTransport:
+    """Test calling an ASGI app through the in-process transport."""
+
+    @pytest.mark.asyncio
+    async def test_streams_request_body(self):
+        received = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                received.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    break
+            await _start(send)
+            await send({"type": "http.response.body", "body": b"".join(received)})
+
+        async with _client(app) as client:
+            response = await client.post("/echo", content=_upload(b"ab", b"cd", b"ef"))
+        assert response.status_code == 200
+        assert response.headers["x-app"] == "test"
+        assert response.content == b"abcdef"
+        # Each chunk reached the app as its own message
+        assert received[:3] == [b"ab", b"cd", b"ef"]
+
+    @pytest.mark.asyncio
+    async def test_streams_response_body(self):
+        """The first chunk is readable before the app produces the rest."""
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await _read_body(receive)
+            await _start(send)
+            await send({"type": "http.response.body", "body": b"first", "more_body": True})
+            await release.wait()
+            await send({"type": "http.response.body", "body": b"second"})
+
+        async with _client(app) as client:
+            async with client.stream("GET", "/stream") as response:
+                chunks = response.aiter_raw()
+                assert await asyncio.wait_for(chunks.__anext__(), 1.0) == b"first"
+                release.set()
+                assert [chunk async for chunk in chunks] == [b"second"]
+
+    @pytest.mark.asyncio
+    async def test_read_timeout(self):
+        cancelled = asyncio.Event()
+
+        async def app(scope, receive, send):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async with _client(app, timeout=httpx.Timeout(5.0, read=0.05)) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                await client.get("/slow")
+        await asyncio.wait_for(cancelled.wait(), 1.0)
+
+    @pytest.mark.asyncio
+    async def test_upload_error_reaches_caller(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                seen.append(message["type"])
+                if message["type"] == "http.disconnect":
+                    return
+
+        async with _client(app) as client:
+            with pytest.raises(UploadError):
+                await client.post("/upload", content=_upload(b"abc", error=UploadError()))
+        # The app saw the upload end as a client disconnect
+        assert seen == ["http.request", "http.disconnect"]
+
+    @pytest.mark.asyncio
+    async def test_app_error_before_response(self):
+        async def app(scope, receive, send):
+            raise RuntimeError("boom")
+
+        async with _client(app) as client:
+            with pytest.raises(httpx.RemoteProtocolError):
+                await client.get("/fail")
+
+    @pytest.mark.asyncio
+    async def test_aclose_cancels_app(self):
+        cancelled = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await _start(send)
+            await send({"type": "http.response.body", "body": b"partial", "more_body": True})
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async with _client(app) as client:
+            response = await client.send(client.build_request("GET", "/stream"), stream=True)
+            assert await response.aiter_raw().__anext__() == b"partial"
+            await response.aclose()
+        assert cancelled.is_set()
+
+
+def _service(root, directory: str, name: str):
+    """Minimal service package named `app`, with a module bound at import time"""
+    package = root / directory / "app"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "identity.py").write_text(f"NAME = {name!r}\n")
+    (package / "main.py").write_text(textwrap.dedent("""
+            from contextlib import asynccontextmanager
+
+            from fastapi import FastAPI
+
+            from app.identity import NAME
+
+            events = []
+
+
+            @asynccontextmanager
+            async def lifespan(app):
+                events.append("startup")
+                yield
+                events.append("shutdown")
+
+
+            app = FastAPI(lifespan=lifespan)
+
+
+            @app.get("/name")
+            async def name():
+                return {"name": NAME}
+            """))
+
+
+class TestInProcessServices:
+    """Test hosting both services' `app` packages in the gateway process."""
+
+    @pytest.mark.asyncio
+    async def test_loads_services_side_by_side(self, tmp_path):
+        _service(tmp_path, "stt-service", "stt")
+        _service(tmp_path, "tts-service", "tts")
+        gateway_app = sys.modules["app"]
+        gateway_inprocess = sys.modules["app.inprocess"]
+
+        services = InProcessServices(str(tmp_path))
+        stt_app = services.app("inprocess://stt")
+        tts_app = services.app("inprocess://tts")
+        assert services.app("inprocess://stt/") is stt_app
+        assert stt_app is not tts_app
+
+        # The gateway's own modules are back in place after each import
+        assert sys.modules["app"] is gateway_app
+        assert sys.modules["app.inprocess"] is gateway_inprocess
+        assert "app.identity" not in sys.modules
+        stt_main = services._modules["stt"]["app.main"]
+        tts_main = services._modules["tts"]["app.main"]
+        assert stt_main is not tts_main
+
+        await services.start(["inprocess://stt", "http://remote:8002", "inprocess://tts"])
+        assert stt_main.events == ["startup"]
+        assert tts_main.events == ["startup"]
+        for url, name in (("inprocess://stt", "stt"), ("inprocess://tts", "tts")):
+            async with _client(services.app(url)) as client:
+                response = await client.get("/name")
+            assert response.json()["name"] == name
+        await services.stop()
+        assert stt_main.events == ["startup", "shutdown"]
+        assert tts_main.events == ["startup", "shutdown"]
+
+    def test_unknown_service(self, tmp_path):
+        with pytest.raises(ValueError):
+            InProcessServices(str(tmp_path)).app("inprocess://asr")
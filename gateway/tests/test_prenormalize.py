@@ -0,0 +1,105 @@
+"""
+Tests for gateway audio pre-normalization (app.prenormalize).
+"""
+
+import io
+import os
+import stat
+import tempfile
+import wave
+
+import pytest
+
+from app.prenormalize import TARGET_SAMPLE_RATE, AudioNormalizer
+
+
+def _wav(rate=TARGET_SAMPLE_RATE, channels=1, frames=1600) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x01\x00" * channels * frames)
+    buffer.seek(0)
+    return buffer
+
+
+def _script(tmp_path, body: str) -> str:
+    """Executable standing in for ffmpeg; it ignores the ffmpeg arguments"""
+    path = tmp_path / "ffmpeg"
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def _normalizer(tmp_path, body="exec cat", format="wav", timeout=10.0) -> AudioNormalizer:
+    normalizer = AudioNormalizer(False, format, workers=2, timeout=timeout)
+    normalizer.ffmpeg = _script(tmp_path, body)
+    return normalizer
+
+
+def _upload(data: bytes):
+    upload = tempfile.SpooledTemporaryFile(max_size=1024)
+    upload.write(data)
+    return upload
+
+
+class TestAudioNormalizer:
+    """Test streaming uploads through ffmpeg."""
+
+    @pytest.mark.asyncio
+    async def test_normalized_wav_passes_through(self, tmp_path):
+        normalizer = _normalizer(tmp_path, body="exit 1")
+        upload = _wav()
+        file, duration = await normalizer.normalize(upload)
+        assert file is upload
+        assert file.tell() == 0
+        assert duration == pytest.approx(0.1)
+        assert normalizer.stats()["passthrough"] == 1
+
+    @pytest.mark.asyncio
+    async def test_streams_large_upload_into_wav(self, tmp_path):
+        """The upload is piped in chunks and the output spools past memory."""
+        pcm = os.urandom(3 * 1024 * 1024)
+        normalizer = _normalizer(tmp_path)
+        with _upload(pcm) as upload:
+            file, duration = await normalizer.normalize(upload)
+        with file, wave.open(file, "rb") as wav:
+            assert wav.getframerate() == TARGET_SAMPLE_RATE
+            assert wav.getnchannels() == 1
+            assert wav.readframes(wav.getnframes()) == pcm
+        assert duration == pytest.approx(len(pcm) / (2 * TARGET_SAMPLE_RATE))
+        stats = normalizer.stats()
+        assert stats["normalized"] == 1
+        assert stats["bytes_in"] == len(pcm)
+        assert stats["bytes_out"] == len(pcm) + 44
+
+    @pytest.mark.asyncio
+    async def test_flac_runs_a_second_pass(self, tmp_path):
+        normalizer = _normalizer(tmp_path, format="flac")
+        with _upload(b"\x02\x00" * 8000) as upload:
+            file, duration = await normalizer.normalize(upload)
+        with file:
+            assert file.read() == b"\x02\x00" * 8000
+        assert duration == pytest.approx(0.5)
+
+    @pytest.mark.asyncio
+    async def test_failure_forwards_original(self, tmp_path):
+        normalizer = _normalizer(tmp_path, body="cat > /dev/null; echo bad input >&2; exit 1")
+        with _upload(b"not audio" * 10000) as upload:
+            assert await normalizer.normalize(upload) is None
+        assert normalizer.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_early_exit_does_not_hang(self, tmp_path):
+        """ffmpeg quitting before reading the whole upload is reported as a failure."""
+        normalizer = _normalizer(tmp_path, body="exit 1")
+        with _upload(os.urandom(4 * 1024 * 1024)) as upload:
+            assert await normalizer.normalize(upload) is None
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, tmp_path):
+        normalizer = _normalizer(tmp_path, body="exec sleep 5", timeout=0.2)
+        with _upload(b"\x00" * 100) as upload:
+            assert await normalizer.normalize(upload) is None
+        assert normalizer.stats()["running"] == 0
@@ -0,0 +1,164 @@
+"""
+Tests for gateway output transcoding (app.transcode).
+"""
+
+import asyncio
+import stat
+
+import httpx
+import pytest
+
+from app.transcode import AudioTranscoder, EncodedAudioCache
+
+
+def _transcoder(tmp_path, body="exec cat", workers=2, cache_bytes=1024, bitrates=None):
+    """Transcoder whose ffmpeg is a script; `echo "$@"` makes it print its arguments"""
+    transcoder = AudioTranscoder(True, "mp3,opus,aac,flac", workers, cache_bytes, bitrates)
+    path = tmp_path / "ffmpeg"
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    transcoder.ffmpeg = str(path)
+    return transcoder
+
+
+def _upstream(pcm=b"\x01\x00" * 100, sample_rate="24000") -> httpx.Response:
+    return httpx.Response(200, headers={"x-sample-rate": sample_rate}, content=pcm)
+
+
+async def _encode(response) -> bytes:
+    try:
+        return b"".join([chunk async for chunk in response.aiter_raw()])
+    finally:
+        await response.aclose()
+
+
+class TestEncodedAudioCache:
+    """Test the LRU cache of encoded responses."""
+
+    def test_hit_and_miss(self):
+        cache = EncodedAudioCache(100)
+        assert cache.get("a") is None
+        cache.put("a", b"x" * 10, "24000")
+        assert cache.get("a") == (b"x" * 10, "24000")
+        assert cache.stats() == {
+            "entries": 1,
+            "bytes": 10,
+            "max_bytes": 100,
+            "hits": 1,
+            "misses": 1,
+        }
+
+    def test_evicts_least_recently_used(self):
+        cache = EncodedAudioCache(100)
+        cache.put("a", b"a" * 40, "24000")
+        cache.put("b", b"b" * 40, "24000")
+        cache.get("a")
+        cache.put("c", b"c" * 40, "24000")
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] == 80
+
+    def test_evicts_until_within_bytes(self):
+        cache = EncodedAudioCache(100)
+        for key in "abcd":
+            cache.put(key, b"x" * 25, "24000")
+        cache.put("e", b"y" * 90, "24000")
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] == 90
+
+    def test_replacing_entry_updates_size(self):
+        cache = EncodedAudioCache(100)
+        cache.put("a", b"x" * 60, "24000")
+        cache.put("a", b"y" * 30, "24000")
+        assert cache.stats()["bytes"] == 30
+        assert cache.get("a") == (b"y" * 30, "24000")
+
+    def test_oversized_entry_not_stored(self):
+        cache = EncodedAudioCache(100)
+        cache.put("a", b"x" * 50, "24000")
+        cache.put("b", b"x" * 101, "24000")
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_disabled(self):
+        cache = EncodedAudioCache(0)
+        cache.put("a", b"x", "24000")
+        assert cache.get("a") is None
+
+
+class TestAudioTranscoder:
+    """Test encoding raw PCM responses through ffmpeg."""
+
+    @pytest.mark.asyncio
+    async def test_streams_and_caches_completed_encode(self, tmp_path):
+        transcoder = _transcoder(tmp_path)
+        pcm = b"\x02\x00" * 200
+        response = await transcoder.open(_upstream(pcm), "mp3", "key")
+        assert response.status_code == 200
+        assert await _encode(response) == pcm
+        assert transcoder.cache.get("key") == (pcm, "24000")
+        assert transcoder.encoded == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_encode_not_cached(self, tmp_path):
+        transcoder = _transcoder(tmp_path, body="cat; echo bad >&2; exit 1")
+        response = await transcoder.open(_upstream(), "mp3", "key")
+        with pytest.raises(RuntimeError, match="bad"):
+            await _encode(response)
+        assert transcoder.cache.get("key") is None
+        assert transcoder.encoded == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_encode_not_cached(self, tmp_path):
+        """A client disconnecting mid-stream leaves nothing in the cache."""
+        transcoder = _transcoder(tmp_path)
+        response = await transcoder.open(_upstream(b"\x00" * 100000), "mp3", "key")
+        chunks = response.aiter_raw()
+        assert await chunks.__anext__()
+        await chunks.aclose()
+        await response.aclose()
+        assert transcoder.cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_output_larger_than_cache_not_cached(self, tmp_path):
+        transcoder = _transcoder(tmp_path, cache_bytes=100)
+        response = await transcoder.open(_upstream(b"\x00" * 1000), "mp3", "key")
+        assert len(await _encode(response)) == 1000
+        assert transcoder.cache.get("key") is None
+        assert transcoder.encoded == 1
+
+    @pytest.mark.asyncio
+    async def test_aclose_releases_worker(self, tmp_path):
+        transcoder = _transcoder(tmp_path, workers=1)
+        first = await transcoder.open(_upstream(), "mp3", None)
+        await first.aclose()
+        await first.aclose()
+        # The single encoder slot is free again, and released only once
+        second = await asyncio.wait_for(transcoder.open(_upstream(), "mp3", None), 1.0)
+        assert transcoder._slots.locked()
+        await second.aclose()
+        assert not transcoder._slots.locked()
+
+    @pytest.mark.asyncio
+    async def test_opus_output_tagged_48khz(self, tmp_path):
+        transcoder = _transcoder(tmp_path, body='cat > /dev/null; echo "$@"')
+        response = await transcoder.open(_upstream(sample_rate="22050"), "opus", None)
+        assert response.headers["x-sample-rate"] == "48000"
+        command = (await _encode(response)).decode()
+        # Input stays at the upstream rate, output is resampled to 48 kHz
+        assert "-ar 22050 -ac 1 -i pipe:0" in command
+        assert "-ar 48000 -f" in command
+
+    @pytest.mark.asyncio
+    async def test_configured_bitrate(self, tmp_path):
+        transcoder = _transcoder(
+            tmp_path, body='cat > /dev/null; echo "$@"', bitrates={"mp3": "192k"}
+        )
+        response = await transcoder.open(_upstream(), "mp3", None)
+        arguments = (await _encode(response)).decode().split()
+        assert arguments[arguments.index("-b:a") + 1] == "192k"
+        assert response.headers["x-sample-rate"] == "24000"
+
+        response = await transcoder.open(_upstream(), "flac", None)
+        assert "-b:a" not in (await _encode(response)).decode().split()
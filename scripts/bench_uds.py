@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+UDS Benchmark - Unix domain socket vs loopback TCP for backend traffic
+Starts a local echo server on both a TCP port and a Unix socket and pushes
+multi-MB bodies through each with the same httpx pooled client setup the
+gateway uses, reporting requests/s and MB/s per transport.
+
+Usage:
+    python scripts/bench_uds.py --size-mb 4 --requests 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import httpx
+    import uvicorn
+except ImportError:
+    print("Error: httpx and uvicorn are required")
+    print("Please install them: pip install httpx uvicorn")
+    raise SystemExit(1)
+
+
+async def echo_app(scope, receive, send):
+    """Minimal ASGI app returning the request body, like an audio round trip"""
+    if scope["type"] != "http":
+        return
+    body = bytearray()
+    while True:
+        message = await receive()
+        body.extend(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/octet-stream"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": bytes(body)})
+
+
+def start_server(host: Optional[str] = None, port: int = 0, uds: Optional[str] = None):
+    """Run uvicorn in a background thread and wait until it accepts requests"""
+    if uds:
+        config = uvicorn.Config(echo_app, uds=uds, log_level="warning")
+    else:
+        config = uvicorn.Config(echo_app, host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_benchmark(
+    label: str, base_url: str, uds: Optional[str], body: bytes, requests: int, concurrency: int
+) -> Dict:
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        uds=uds,
+    )
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, timeout=60) as client:
+        # Warm up the connection pool
+        await asyncio.gather(*(client.post("/", content=body) for _ in range(concurrency)))
+
+        remaining = requests
+        latencies = []
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.post("/", content=body)
+                response.raise_for_status()
+                assert len(response.content) == len(body)
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    # Each request carries the body both ways
+    megabytes = 2 * len(body) * requests / (1024 * 1024)
+    return {
+        "transport": label,
+        "requests_per_second": requests / elapsed,
+        "mb_per_second": megabytes / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Unix domain socket vs loopback TCP")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Request body size (MB)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per transport")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--port", type=int, default=18765, help="Loopback TCP port")
+    args = parser.parse_args()
+
+    body = os.urandom(int(args.size_mb * 1024 * 1024))
+    socket_dir = tempfile.mkdtemp(prefix="opentalker-bench-")
+    socket_path = os.path.join(socket_dir, "echo.sock")
+
+    tcp_server, tcp_thread = start_server(host="127.0.0.1", port=args.port)
+    uds_server, uds_thread = start_server(uds=socket_path)
+    try:
+        results = [
+            asyncio.run(
+                run_benchmark(
+                    "tcp",
+                    f"http://127.0.0.1:{args.port}",
+                    None,
+                    body,
+                    args.requests,
+                    args.concurrency,
+                )
+            ),
+            asyncio.run(
+                run_benchmark(
+                    "uds", "http://localhost", socket_path, body, args.requests, args.concurrency
+                )
+            ),
+        ]
+    finally:
+        for server, thread in ((tcp_server, tcp_thread), (uds_server, uds_thread)):
+            server.should_exit = True
+            thread.join()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        os.rmdir(socket_dir)
+
+    print(f"\nbody={args.size_mb} MB, requests={args.requests}, concurrency={args.concurrency}\n")
+    print(f"{'transport':<10}{'req/s':>10}{'MB/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for result in results:
+        print(
+            f"{result['transport']:<10}{result['requests_per_second']:>10.1f}"
+            f"{result['mb_per_second']:>10.1f}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+        )
+    tcp, uds = results
+    print(f"\nUDS throughput vs TCP: {uds['mb_per_second'] / tcp['mb_per_second']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@
 
 set -e
 
+# 以仓库根目录为构建上下文（各镜像需要复制 common/ 共享包）
+cd "$(dirname "$0")/.."
+
 echo "========================================="
 echo "  OpenTalker Docker 编译测试"
 echo "========================================="
@@ -25,31 +28,25 @@ VERSION="v0.3.0"
 echo "========================================="
 echo "1. 编译Gateway镜像"
 echo "========================================="
-cd gateway
-docker build -t ${REGISTRY}/gateway:${VERSION} -t ${REGISTRY}/gateway:latest .
+docker build -f gateway/Dockerfile -t ${REGISTRY}/gateway:${VERSION} -t ${REGISTRY}/gateway:latest .
 echo "✅ Gateway镜像编译完成"
 echo ""
-cd ..
 
 # 编译STT Service
 echo "========================================="
 echo "2. 编译STT Service镜像"
 echo "========================================="
-cd stt-service
-docker build -t ${REGISTRY}/stt-service:${VERSION} -t ${REGISTRY}/stt-service:latest .
+docker build -f stt-service/Dockerfile -t ${REGISTRY}/stt-service:${VERSION} -t ${REGISTRY}/stt-service:latest .
 echo "✅ STT Service镜像编译完成"
 echo ""
-cd ..
 
 # 编译TTS Service
 echo "========================================="
 echo "3. 编译TTS Service镜像"
 echo "========================================="
-cd tts-service
-docker build -t ${REGISTRY}/tts-service:${VERSION} -t ${REGISTRY}/tts-service:latest .
+docker build -f tts-service/Dockerfile -t ${REGISTRY}/tts-service:${VERSION} -t ${REGISTRY}/tts-service:latest .
 echo "✅ TTS Service镜像编译完成"
 echo ""
-cd ..
 
 # 显示镜像列表
 echo "========================================="
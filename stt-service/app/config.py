@@ -2,7 +2,9 @@
 STT Service Configuration
 """
 
-from pydantic import Field
+from typing import Optional
+
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,7 +20,15 @@ class Settings(BaseSettings):
     # Service
     service_host: str = Field(default="0.0.0.0", description="Service host")
     service_port: int = Field(default=8001, description="Service port")
-    log_level: str = Field(default="INFO", description="Log level")
+    service_uds: Optional[str] = Field(
+        default=None,
+        description="Listen on this Unix domain socket instead of host:port",
+    )
+    qwen_asr_log_level: str = Field(
+        default="INFO",
+        validation_alias=AliasChoices("qwen_asr_log_level", "log_level"),
+        description="Log level",
+    )
 
     # Qwen3-ASR Model
     qwen_asr_model: str = Field(
@@ -33,7 +43,33 @@ class Settings(BaseSettings):
     )
 
     # File Upload
-    max_upload_size: int = Field(default=52428800, description="Max upload size (50MB)")
+    qwen_asr_max_upload_size: int = Field(
+        default=52428800,
+        validation_alias=AliasChoices("qwen_asr_max_upload_size", "max_upload_size"),
+        description="Max upload size (50MB)",
+    )
+    temp_dir: str = Field(
+        default="./tmp",
+        description="Directory for uploaded audio while it is transcribed (created at startup)",
+    )
+
+    # Admission control
+    qwen_asr_admission_budget: float = Field(
+        default=600.0,
+        description="Seconds of audio transcribed concurrently before requests queue (0 = off)",
+    )
+    qwen_asr_admission_max_queue: int = Field(
+        default=32, description="Requests allowed to wait for capacity before 429"
+    )
+    qwen_asr_admission_queue_timeout: float = Field(
+        default=30.0, description="Max time a request waits for capacity (seconds)"
+    )
+
+    # Request coalescing
+    qwen_asr_coalesce_requests: bool = Field(
+        default=True,
+        description="Share one transcription among identical concurrent requests",
+    )
 
     # HuggingFace
     hf_endpoint: str = Field(
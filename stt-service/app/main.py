@@ -4,21 +4,26 @@ Qwen3-ASR Speech-to-Text Service
 """
 
 import asyncio
+import io
 import logging
 import os
 import tempfile
 import time
-from typing import Optional
+from functools import partial
+from typing import List, Optional
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile, status
+import soundfile as sf
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile, status
 from fastapi.responses import Response
+from opentalker_common.admission import AdmissionController, AdmissionRejectedError
+from opentalker_common.singleflight import SingleFlight, request_key
 
 from app.config import settings
 from app.service import QwenASRService
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.log_level.upper()),
+    level=getattr(logging, settings.qwen_asr_log_level.upper()),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
@@ -33,6 +38,29 @@ app = FastAPI(
 # Initialize STT service
 stt_service = QwenASRService()
 
+# Admission control, budgeted in seconds of audio being transcribed
+admission = AdmissionController(
+    "stt",
+    budget=settings.qwen_asr_admission_budget,
+    max_queue=settings.qwen_asr_admission_max_queue,
+    queue_timeout=settings.qwen_asr_admission_queue_timeout,
+)
+
+# Coalescing of identical in-flight transcriptions
+coalescer = SingleFlight("stt", enabled=settings.qwen_asr_coalesce_requests)
+
+# Cost estimate for audio soundfile cannot read (~128 kbps compressed audio)
+_BYTES_PER_AUDIO_SECOND = 16000
+
+
+def _audio_seconds(audio_path: str, file_size: int) -> float:
+    """Audio duration used as admission cost, read from the file header when possible"""
+    try:
+        info = sf.info(audio_path)
+        return info.frames / info.samplerate
+    except Exception:
+        return file_size / _BYTES_PER_AUDIO_SECOND
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -45,6 +73,11 @@ async def startup_event():
     # Set HuggingFace endpoint
     os.environ["HF_ENDPOINT"] = settings.hf_endpoint
 
+    # Relative paths resolve against the working directory of the process,
+    # which is the gateway's when the service runs in-process
+    os.makedirs(settings.temp_dir, exist_ok=True)
+    logger.info(f"Upload temp dir: {os.path.abspath(settings.temp_dir)}")
+
     # Load model
     try:
         logger.info("Loading Qwen3-ASR model...")
@@ -66,6 +99,97 @@ async def health_check():
     }
 
 
+@app.get("/stats")
+async def get_stats():
+    """Admission control and request coalescing statistics"""
+    return {"admission": admission.stats(), "coalescing": coalescer.stats()}
+
+
+# Formats the gateway forwards after decoding to 16 kHz mono (X-Audio-Prenormalized)
+PRENORMALIZED_FORMATS = ("wav", "flac")
+
+
+def _decode_prenormalized(file_content: bytes):
+    """Decode a gateway pre-normalized upload to (mono float32 samples, sample_rate)"""
+    samples, sample_rate = sf.read(io.BytesIO(file_content), dtype="float32")
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples, sample_rate
+
+
+async def _transcribe_prenormalized(
+    file_content: bytes,
+    duration: Optional[float],
+    language: Optional[str],
+    response_format: str,
+    granularities: Optional[List[str]],
+    temperature: float,
+):
+    """
+    Transcribe audio the gateway already decoded to 16 kHz mono
+
+    The admission cost comes from the gateway's duration header instead of
+    probing a temp file, and the model gets the samples directly.
+    """
+    if duration is None:
+        duration = len(file_content) / (2 * 16000)
+    async with admission.admit(duration):
+        start_time = time.time()
+        waveform = await asyncio.to_thread(_decode_prenormalized, file_content)
+        result = await asyncio.to_thread(
+            stt_service.transcribe,
+            language=language,
+            response_format=response_format,
+            timestamp_granularities=granularities,
+            temperature=temperature,
+            waveform=waveform,
+        )
+
+    elapsed = time.time() - start_time
+    logger.info(f"Transcription completed in {elapsed:.2f}s (pre-normalized {duration:.2f}s)")
+    return result
+
+
+async def _transcribe_file(
+    file_content: bytes,
+    suffix: str,
+    language: Optional[str],
+    response_format: str,
+    granularities: Optional[List[str]],
+    temperature: float,
+):
+    """Save the upload to a temp file, wait for capacity and transcribe it"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=settings.temp_dir)
+    temp_file.write(file_content)
+    temp_file.close()
+    audio_path = temp_file.name
+
+    logger.info(f"Audio saved: {audio_path} ({len(file_content)} bytes)")
+
+    try:
+        audio_seconds = _audio_seconds(audio_path, len(file_content))
+        async with admission.admit(audio_seconds):
+            start_time = time.time()
+
+            result = await asyncio.to_thread(
+                stt_service.transcribe,
+                audio_path=audio_path,
+                language=language,
+                response_format=response_format,
+                timestamp_granularities=granularities,
+                temperature=temperature,
+            )
+
+        elapsed = time.time() - start_time
+        logger.info(f"Transcription completed in {elapsed:.2f}s")
+        return result
+
+    finally:
+        # Cleanup
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+
 @app.post("/transcribe")
 async def transcribe(
     file: UploadFile = File(..., description="Audio file to transcribe"),
@@ -75,6 +199,8 @@ async def transcribe(
         default=None, description="Comma-separated: word,segment"
     ),
     temperature: Optional[float] = Form(default=0.0, description="Sampling temperature"),
+    x_audio_prenormalized: Optional[str] = Header(default=None),
+    x_audio_duration: Optional[float] = Header(default=None),
 ):
     """
     Transcribe audio to text
@@ -85,6 +211,9 @@ async def transcribe(
         response_format: Output format (json, text, srt, vtt, verbose_json)
         timestamp_granularities: Timestamp types (word, segment)
         temperature: Sampling temperature (0.0-1.0)
+        x_audio_prenormalized: Set by the gateway when it already decoded the
+            upload to 16 kHz mono wav/flac
+        x_audio_duration: Audio duration in seconds sent with pre-normalized uploads
 
     Returns:
         Transcription result in requested format
@@ -96,61 +225,61 @@ async def transcribe(
         file_content = await file.read()
         file_size = len(file_content)
 
-        if file_size > settings.max_upload_size:
+        if file_size > settings.qwen_asr_max_upload_size:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large: {file_size} bytes (max: {settings.max_upload_size})",
+                detail=f"File too large: {file_size} bytes (max: {settings.qwen_asr_max_upload_size})",
             )
 
-        # Save to temp file
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            suffix=os.path.splitext(file.filename or "audio.wav")[1],
-            dir="./tmp",
-        )
-        temp_file.write(file_content)
-        temp_file.close()
-        audio_path = temp_file.name
-
-        logger.info(f"Audio saved: {audio_path} ({file_size} bytes)")
-
-        try:
-            # Parse timestamp granularities
-            granularities = None
-            if timestamp_granularities:
-                granularities = [g.strip() for g in timestamp_granularities.split(",")]
-
-            # Perform transcription
-            start_time = time.time()
+        # Parse timestamp granularities
+        granularities = None
+        if timestamp_granularities:
+            granularities = [g.strip() for g in timestamp_granularities.split(",")]
 
-            result = await asyncio.to_thread(
-                stt_service.transcribe,
-                audio_path=audio_path,
-                language=language,
-                response_format=response_format,
-                timestamp_granularities=granularities,
-                temperature=temperature or 0.0,
+        # Identical concurrent requests share one transcription
+        key = request_key(file_content, language, response_format, granularities, temperature)
+        if x_audio_prenormalized in PRENORMALIZED_FORMATS:
+            work = partial(
+                _transcribe_prenormalized,
+                file_content,
+                x_audio_duration,
+                language,
+                response_format,
+                granularities,
+                temperature or 0.0,
             )
+        else:
+            work = partial(
+                _transcribe_file,
+                file_content,
+                os.path.splitext(file.filename or "audio.wav")[1],
+                language,
+                response_format,
+                granularities,
+                temperature or 0.0,
+            )
+        result, shared = await coalescer.do(key, work)
+        if shared:
+            logger.info("Transcription coalesced with an identical in-flight request")
 
-            elapsed = time.time() - start_time
-            logger.info(f"Transcription completed in {elapsed:.2f}s")
-
-            # Return response
-            if response_format == "text":
-                return Response(content=result, media_type="text/plain")
-            elif response_format in ["srt", "vtt"]:
-                media_type = "text/srt" if response_format == "srt" else "text/vtt"
-                return Response(content=result, media_type=media_type)
-            else:
-                return result
-
-        finally:
-            # Cleanup
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
+        # Return response
+        if response_format == "text":
+            return Response(content=result, media_type="text/plain")
+        elif response_format in ["srt", "vtt"]:
+            media_type = "text/srt" if response_format == "srt" else "text/vtt"
+            return Response(content=result, media_type=media_type)
+        else:
+            return result
 
     except HTTPException:
         raise
+    except AdmissionRejectedError as e:
+        logger.warning(f"Transcription rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"error": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Transcription failed: {e}", exc_info=True)
         raise HTTPException(
@@ -162,9 +291,13 @@ async def transcribe(
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(
-        app,
-        host=settings.service_host,
-        port=settings.service_port,
-        log_level=settings.log_level.lower(),
-    )
+    if settings.service_uds:
+        # Co-located gateway connects with unix:// backend URLs
+        uvicorn.run(app, uds=settings.service_uds, log_level=settings.qwen_asr_log_level.lower())
+    else:
+        uvicorn.run(
+            app,
+            host=settings.service_host,
+            port=settings.service_port,
+            log_level=settings.qwen_asr_log_level.lower(),
+        )
@@ -5,8 +5,9 @@ Handles audio transcription using Qwen3-ASR-0.6B model
 
 import logging
 import os
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import torch
 
 from app.config import settings
@@ -107,11 +108,12 @@ class QwenASRService:
 
     def transcribe(
         self,
-        audio_path: str,
+        audio_path: Optional[str] = None,
         language: Optional[str] = None,
         response_format: str = "json",
         timestamp_granularities: Optional[List[str]] = None,
         temperature: float = 0.0,
+        waveform: Optional[Tuple[np.ndarray, int]] = None,
     ) -> Union[str, Dict]:
         """
         Transcribe audio file
@@ -122,6 +124,9 @@ class QwenASRService:
             response_format: Output format (json, text, srt, vtt, verbose_json)
             timestamp_granularities: List of timestamp types (word, segment)
             temperature: Sampling temperature (0.0 for greedy decoding)
+            waveform: Already decoded (mono float32 samples, sample_rate),
+                used instead of audio_path so the model skips loading and
+                resampling the file
 
         Returns:
             Transcription result in requested format
@@ -130,19 +135,24 @@ class QwenASRService:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
         try:
-            # Validate audio file
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-            # Check file size (50MB limit)
-            file_size = os.path.getsize(audio_path)
-            if file_size > settings.max_upload_size:
-                raise ValueError(
-                    f"File size ({file_size} bytes) exceeds limit "
-                    f"({settings.max_upload_size} bytes)"
-                )
+            if waveform is not None:
+                audio = waveform
+                logger.info(f"Transcribing {len(waveform[0]) / waveform[1]:.2f}s of decoded audio")
+            else:
+                # Validate audio file
+                if not os.path.exists(audio_path):
+                    raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+                # Check file size (50MB limit)
+                file_size = os.path.getsize(audio_path)
+                if file_size > settings.qwen_asr_max_upload_size:
+                    raise ValueError(
+                        f"File size ({file_size} bytes) exceeds limit "
+                        f"({settings.qwen_asr_max_upload_size} bytes)"
+                    )
 
-            logger.info(f"Transcribing audio: {audio_path}")
+                audio = audio_path
+                logger.info(f"Transcribing audio: {audio_path}")
 
             # Perform transcription
             # Note: qwen-asr 0.0.6 transcribe() only accepts audio, context, language, and return_time_stamps parameters
@@ -150,7 +160,7 @@ class QwenASRService:
             transcribe_language = language if language else "Chinese"
 
             result = self.model.transcribe(
-                audio=audio_path,
+                audio=audio,
                 language=transcribe_language,
             )
 
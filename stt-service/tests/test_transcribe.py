@@ -0,0 +1,208 @@
+"""
+Tests for the transcription endpoint (app.main): admission, coalescing and
+gateway pre-normalized uploads.
+"""
+
+import asyncio
+import io
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+pytest.importorskip("torch")
+
+import httpx  # noqa: E402
+from opentalker_common.admission import AdmissionController  # noqa: E402
+from opentalker_common.singleflight import SingleFlight, request_key  # noqa: E402
+
+from app import main  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def _audio(seconds: float = 0.5, format: str = "WAV", frequency: float = 440.0) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (0.1 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, SAMPLE_RATE, format=format, subtype="PCM_16")
+    return buffer.getvalue()
+
+
+class FakeASR:
+    """Stands in for QwenASRService; optionally holds every call until released."""
+
+    def __init__(self, hold: bool = False):
+        self.calls = []
+        self.release = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def transcribe(self, **kwargs):
+        self.calls.append(kwargs)
+        assert self.release.wait(5)
+        return {"text": f"heard {kwargs.get('language')}"}
+
+
+class RecordingAdmission(AdmissionController):
+    """AdmissionController that records the cost of each request"""
+
+    def __init__(self, budget: float = 600.0, max_queue: int = 32, queue_timeout: float = 30.0):
+        super().__init__("stt", budget, max_queue, queue_timeout)
+        self.costs = []
+
+    async def acquire(self, cost: float):
+        self.costs.append(cost)
+        return await super().acquire(cost)
+
+
+@pytest.fixture
+def asr(monkeypatch, tmp_path):
+    fake = FakeASR()
+    monkeypatch.setattr(main, "stt_service", fake)
+    monkeypatch.setattr(main, "admission", RecordingAdmission())
+    monkeypatch.setattr(main, "coalescer", SingleFlight("stt"))
+    monkeypatch.setattr(main.settings, "temp_dir", str(tmp_path))
+    return fake
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://stt")
+
+
+async def _transcribe(client, audio: bytes, filename="audio.wav", headers=None, **form):
+    return await client.post(
+        "/transcribe", files={"file": (filename, audio)}, data=form, headers=headers or {}
+    )
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+class TestAdmission:
+    """Test admission control on /transcribe."""
+
+    @pytest.mark.asyncio
+    async def test_rejected_with_retry_after(self, asr, monkeypatch):
+        admission = RecordingAdmission(budget=10.0, max_queue=0, queue_timeout=7.0)
+        monkeypatch.setattr(main, "admission", admission)
+        ticket = await admission.acquire(10.0)
+        try:
+            async with _client() as client:
+                response = await _transcribe(client, _audio())
+        finally:
+            ticket.release()
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "7"
+        assert "overloaded" in response.json()["detail"]["error"]
+        assert asr.calls == []
+
+    @pytest.mark.asyncio
+    async def test_file_cost_probed_from_header(self, asr):
+        async with _client() as client:
+            response = await _transcribe(client, _audio(seconds=1.5))
+        assert response.status_code == 200
+        assert main.admission.costs == [pytest.approx(1.5)]
+        assert asr.calls[0]["audio_path"].endswith(".wav")
+
+
+class TestCoalescing:
+    """Test sharing one transcription among identical requests."""
+
+    def test_request_key(self):
+        audio = _audio()
+        key = request_key(audio, "English", "json", None, 0.0)
+        assert key == request_key(audio, "English", "json", None, 0.0)
+        assert key != request_key(audio, "Chinese", "json", None, 0.0)
+        assert key != request_key(audio, "English", "text", None, 0.0)
+        assert key != request_key(audio, "English", "json", ["word"], 0.0)
+        assert key != request_key(audio, "English", "json", None, 0.5)
+        assert key != request_key(_audio(frequency=220.0), "English", "json", None, 0.0)
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_transcription(self, asr):
+        asr.release.clear()
+        audio = _audio()
+        async with _client() as client:
+            first = asyncio.create_task(_transcribe(client, audio, language="English"))
+            await _until(lambda: len(asr.calls) == 1)
+            same = asyncio.create_task(_transcribe(client, audio, language="English"))
+            await _until(lambda: main.coalescer.coalesced == 1)
+            other_language = asyncio.create_task(_transcribe(client, audio, language="Chinese"))
+            other_audio = asyncio.create_task(
+                _transcribe(client, _audio(frequency=220.0), language="English")
+            )
+            await _until(lambda: len(asr.calls) == 3)
+            asr.release.set()
+            responses = await asyncio.gather(first, same, other_language, other_audio)
+
+        assert [response.status_code for response in responses] == [200] * 4
+        assert responses[0].json() == responses[1].json() == {"text": "heard English"}
+        assert responses[2].json() == {"text": "heard Chinese"}
+        assert len(asr.calls) == 3
+        assert main.coalescer.stats()["executions"] == 3
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, asr, monkeypatch):
+        monkeypatch.setattr(main, "coalescer", SingleFlight("stt", enabled=False))
+        audio = _audio()
+        async with _client() as client:
+            await asyncio.gather(_transcribe(client, audio), _transcribe(client, audio))
+        assert len(asr.calls) == 2
+
+
+class TestPrenormalized:
+    """Test uploads the gateway already decoded to 16 kHz mono."""
+
+    @pytest.fixture(autouse=True)
+    def no_probe(self, monkeypatch):
+        def probe(*args):
+            raise AssertionError("pre-normalized upload was probed")
+
+        monkeypatch.setattr(main, "_audio_seconds", probe)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("format", ["wav", "flac"])
+    async def test_decoded_waveform_passed_to_model(self, asr, tmp_path, format):
+        headers = {"X-Audio-Prenormalized": format, "X-Audio-Duration": "0.5"}
+        async with _client() as client:
+            response = await _transcribe(
+                client, _audio(format=format.upper()), f"audio.{format}", headers
+            )
+        assert response.status_code == 200
+        call = asr.calls[0]
+        assert "audio_path" not in call
+        samples, sample_rate = call["waveform"]
+        assert sample_rate == SAMPLE_RATE
+        assert samples.dtype == np.float32
+        assert samples.ndim == 1
+        assert len(samples) == SAMPLE_RATE // 2
+        # No temp file was written
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_duration_header_is_admission_cost(self, asr):
+        headers = {"X-Audio-Prenormalized": "wav", "X-Audio-Duration": "12.5"}
+        async with _client() as client:
+            response = await _transcribe(client, _audio(), headers=headers)
+        assert response.status_code == 200
+        assert main.admission.costs == [12.5]
+
+    @pytest.mark.asyncio
+    async def test_cost_estimated_without_duration_header(self, asr):
+        audio = _audio(seconds=1.0)
+        async with _client() as client:
+            await _transcribe(client, audio, headers={"X-Audio-Prenormalized": "wav"})
+        assert main.admission.costs == [pytest.approx(len(audio) / 32000)]
+
+    @pytest.mark.asyncio
+    async def test_unknown_format_takes_file_path(self, asr, monkeypatch):
+        monkeypatch.setattr(main, "_audio_seconds", lambda path, size: 0.5)
+        async with _client() as client:
+            await _transcribe(client, _audio(), headers={"X-Audio-Prenormalized": "mp3"})
+        assert "waveform" not in asr.calls[0]
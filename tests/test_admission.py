@@ -0,0 +1,166 @@
+"""
+Tests for cost-based admission control (opentalker_common.admission).
+"""
+
+import asyncio
+
+import pytest
+from opentalker_common.admission import AdmissionController, AdmissionRejectedError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(budget=10.0, max_queue=2, queue_timeout=5.0, clock=None):
+    return AdmissionController(
+        "test",
+        budget=budget,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        clock=clock or FakeClock(),
+    )
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmission:
+    """Test admitting, queueing and rejecting requests."""
+
+    @pytest.mark.asyncio
+    async def test_admits_within_budget(self):
+        controller = _controller()
+        first = await controller.acquire(4)
+        second = await controller.acquire(6)
+        assert controller.stats()["in_use"] == 10
+        first.release()
+        first.release()
+        assert controller.stats()["in_use"] == 6
+        second.release()
+        assert controller.stats()["admitted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_admits_everything(self):
+        controller = _controller(budget=0)
+        tickets = [await controller.acquire(1000) for _ in range(5)]
+        assert len(tickets) == 5
+        assert controller.stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_runs_alone(self):
+        """A request costing more than the budget is clamped and still admitted."""
+        controller = _controller()
+        ticket = await controller.acquire(50)
+        assert ticket.cost == 10
+
+    @pytest.mark.asyncio
+    async def test_queued_requests_granted_in_order(self):
+        controller = _controller(max_queue=3)
+        running = await controller.acquire(10)
+        order = []
+
+        async def waiter(name, cost):
+            async with controller.admit(cost):
+                order.append(name)
+
+        waiters = [asyncio.create_task(waiter(name, 5)) for name in ("a", "b")]
+        await _settle()
+        assert controller.stats()["queued"] == 2
+        running.release()
+        await asyncio.gather(*waiters)
+        assert order == ["a", "b"]
+        assert controller.stats()["in_use"] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Work that can neither run nor queue fails fast with a Retry-After."""
+        controller = _controller(max_queue=1)
+        await controller.acquire(10)
+        queued = asyncio.create_task(controller.acquire(5))
+        await _settle()
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire(5)
+        assert rejected.value.reason == "queue full"
+        assert rejected.value.retry_after >= 1
+        assert controller.stats()["rejected"] == 1
+        queued.cancel()
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_queue_timeout(self):
+        controller = _controller(queue_timeout=0.01)
+        await controller.acquire(10)
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await controller.acquire(5)
+        assert rejected.value.reason == "queue timeout"
+        assert controller.stats()["timed_out"] == 1
+        assert controller.stats()["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = _controller()
+        running = await controller.acquire(10)
+        waiter = asyncio.create_task(controller.acquire(5))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+        assert controller.stats()["queued"] == 0
+        running.release()
+        assert controller.stats()["in_use"] == 0
+
+
+class TestRetryAfter:
+    """Test the drain-rate estimate behind Retry-After."""
+
+    @pytest.mark.asyncio
+    async def test_drain_rate_over_window(self):
+        clock = FakeClock()
+        controller = _controller(clock=clock)
+        for _ in range(3):
+            ticket = await controller.acquire(4)
+            clock.now += 2.0
+            ticket.release()
+        # 12 units completed between the first and last completion, 4 s apart
+        assert controller.drain_rate() == pytest.approx(12 / 4)
+
+    @pytest.mark.asyncio
+    async def test_old_completions_expire(self):
+        clock = FakeClock()
+        controller = _controller(clock=clock)
+        (await controller.acquire(4)).release()
+        clock.now += 60.0
+        assert controller.drain_rate() == 0.0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_from_backlog(self):
+        """Retry-After is the backlog beyond the budget divided by the drain rate."""
+        clock = FakeClock()
+        controller = _controller(clock=clock)
+        for _ in range(2):
+            ticket = await controller.acquire(5)
+            clock.now += 5.0
+            ticket.release()
+        # Drain rate: 10 units over 5 s = 2/s
+        await controller.acquire(10)
+        assert controller.retry_after(6) == 3
+
+    @pytest.mark.asyncio
+    async def test_retry_after_without_history(self):
+        """With no completions to go by, the hint falls back to the queue timeout."""
+        controller = _controller(queue_timeout=5.0)
+        await controller.acquire(10)
+        assert controller.retry_after(5) == 5
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_bounded(self):
+        controller = _controller(queue_timeout=600.0)
+        await controller.acquire(10)
+        assert controller.retry_after(5) == 60
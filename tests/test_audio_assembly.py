@@ -0,0 +1,124 @@
+"""
+Tests for multi-chunk audio assembly (opentalker_common.audio_assembly).
+"""
+
+import numpy as np
+import pytest
+from opentalker_common.audio_assembly import AudioAssembler
+
+SAMPLE_RATE = 24000
+
+
+def _chunk(seconds: float, lead: float = 0.0, tail: float = 0.0, seed: int = 0) -> np.ndarray:
+    """Noise burst with leading/trailing silence (seconds)."""
+    rng = np.random.default_rng(seed)
+    voiced = 0.5 * rng.uniform(-1, 1, int(SAMPLE_RATE * seconds))
+    return np.concatenate(
+        [np.zeros(int(SAMPLE_RATE * lead)), voiced, np.zeros(int(SAMPLE_RATE * tail))]
+    ).astype(np.float32)
+
+
+def _chunks():
+    return [
+        _chunk(0.3, tail=0.2, seed=1),
+        _chunk(0.2, 0.1, 0.15, seed=2),
+        _chunk(0.25, 0.3, seed=3),
+    ]
+
+
+class TestAssemble:
+    """Test one-shot assembly."""
+
+    def test_empty_and_single(self):
+        """No chunks give empty audio; a single chunk is returned as-is."""
+        assembler = AudioAssembler(SAMPLE_RATE)
+        assert assembler.assemble([]).size == 0
+        chunk = _chunk(0.1, 0.1, 0.1)
+        assert np.array_equal(assembler.assemble([chunk]), chunk)
+
+    def test_crossfade_is_equal_power(self):
+        """Joining two constant signals crossfades with cos/sin curves."""
+        assembler = AudioAssembler(SAMPLE_RATE, crossfade_ms=10, trim_silence=False)
+        fade = assembler.crossfade
+        out = assembler.assemble([np.full(1000, 0.5), np.full(1000, -0.5)])
+
+        assert out.size == 2000 - fade
+        t = (np.arange(fade) + 0.5) / fade * (np.pi / 2)
+        expected = 0.5 * np.cos(t) - 0.5 * np.sin(t)
+        assert np.allclose(out[1000 - fade : 1000], expected, atol=1e-6)
+        assert np.all(out[: 1000 - fade] == 0.5)
+        assert np.all(out[1000:] == -0.5)
+
+    def test_boundary_silence_is_trimmed(self):
+        """Silence at chunk boundaries is cut down to keep_silence_ms."""
+        assembler = AudioAssembler(SAMPLE_RATE, crossfade_ms=0, keep_silence_ms=40)
+        keep = assembler.keep_silence
+        first, second = _chunk(0.2, lead=0.1, tail=0.3), _chunk(0.2, lead=0.3, tail=0.1)
+        out = assembler.assemble([first, second])
+
+        voiced = int(SAMPLE_RATE * 0.2)
+        lead, tail = int(SAMPLE_RATE * 0.1), int(SAMPLE_RATE * 0.1)
+        # Outer edges are untouched; each inner boundary keeps `keep` samples
+        assert out.size == lead + voiced + keep + keep + voiced + tail
+
+    def test_short_chunks_do_not_overrun(self):
+        """Chunks shorter than the crossfade are blended without errors."""
+        assembler = AudioAssembler(SAMPLE_RATE, crossfade_ms=10, trim_silence=False)
+        out = assembler.assemble([np.ones(500), np.ones(20), np.ones(500)])
+        assert out.size == 500 + 20 - 20 + 500 - 240
+
+
+class TestStreaming:
+    """Test append()/view()/take_settled()."""
+
+    def test_append_matches_assemble(self):
+        """Appending chunks one by one gives the one-shot result."""
+        expected = AudioAssembler(SAMPLE_RATE).assemble(_chunks())
+        assembler = AudioAssembler(SAMPLE_RATE)
+        for chunk in _chunks():
+            assembler.append(chunk)
+        assert np.array_equal(assembler.view(), expected)
+
+    def test_buffer_grows_geometrically(self):
+        """Appends reuse the preallocated buffer instead of reallocating each time."""
+        assembler = AudioAssembler(SAMPLE_RATE, trim_silence=False)
+        buffers = set()
+        for seed in range(64):
+            assembler.append(_chunk(0.01, seed=seed))
+            buffers.add(id(assembler._buffer))
+        assert len(buffers) <= 8
+
+    @pytest.mark.parametrize("take_every", [1, 2])
+    def test_take_settled_matches_assemble(self, take_every):
+        """Settled pieces plus the remaining view concatenate to the one-shot result."""
+        expected = AudioAssembler(SAMPLE_RATE).assemble(_chunks())
+        assembler = AudioAssembler(SAMPLE_RATE)
+        pieces = []
+        for i, chunk in enumerate(_chunks()):
+            assembler.append(chunk)
+            if i % take_every == 0:
+                pieces.append(assembler.take_settled())
+        pieces.append(assembler.view())
+        assert np.array_equal(np.concatenate(pieces), expected)
+
+    def test_take_settled_with_short_chunks(self):
+        """Chunks shorter than the crossfade still blend into settled audio correctly."""
+        chunks = [_chunk(0.2, seed=1), _chunk(0.002, seed=2), _chunk(0.2, seed=3)]
+        expected = AudioAssembler(SAMPLE_RATE).assemble(chunks)
+        assembler = AudioAssembler(SAMPLE_RATE)
+        pieces = []
+        for chunk in chunks:
+            assembler.append(chunk)
+            pieces.append(assembler.take_settled())
+        pieces.append(assembler.view())
+        assert np.array_equal(np.concatenate(pieces), expected)
+
+    def test_take_settled_keeps_only_open_tail(self):
+        """After take_settled() the buffer holds the last chunk and its crossfade window."""
+        assembler = AudioAssembler(SAMPLE_RATE, trim_silence=False)
+        assembler.append(np.ones(1000))
+        fade = assembler.crossfade
+        assert assembler.take_settled().size == 0
+        assembler.append(np.ones(800))
+        assert assembler.take_settled().size == 1000 - fade
+        assert assembler.view().size == 800
@@ -0,0 +1,119 @@
+"""
+Tests for in-memory audio encoding (opentalker_common.audio_encoder).
+"""
+
+import io
+import shutil
+
+import numpy as np
+import pytest
+import soundfile as sf
+from opentalker_common.audio_encoder import (
+    WAV_HEADER_SIZE,
+    encode_audio,
+    encode_samples,
+    iter_encode_audio,
+    to_float32,
+)
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg required")
+
+
+def _tone(seconds: float = 0.5, sample_rate: int = 24000) -> np.ndarray:
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+class TestToFloat32:
+    """Test normalizing model output shapes."""
+
+    @pytest.mark.parametrize("shape", [(5,), (1, 5), (5, 1), (1, 1, 5)])
+    def test_mono_is_flattened(self, shape):
+        """Mono audio with size-1 batch/channel axes becomes (frames,)."""
+        audio = to_float32(np.zeros(shape, dtype=np.float64))
+        assert audio.shape == (5,)
+        assert audio.dtype == np.float32
+
+    @pytest.mark.parametrize("shape", [(1,), (1, 1), (1, 1, 1)])
+    def test_single_sample_stays_one_dimensional(self, shape):
+        """A 1-sample chunk is (1,), not a 0-d array."""
+        audio = to_float32(np.full(shape, 0.25))
+        assert audio.shape == (1,)
+        assert encode_samples(audio) == np.array([8191], dtype="<i2").tobytes()
+
+    def test_channels_first_is_transposed(self):
+        """(channels, frames) input becomes (frames, channels)."""
+        audio = to_float32(np.zeros((2, 100)))
+        assert audio.shape == (100, 2)
+
+
+class TestEncodeAudio:
+    """Test one-shot encoding."""
+
+    def test_pcm16_little_endian_and_clipped(self):
+        """Samples are clipped to [-1, 1] and written as little-endian int16."""
+        audio = np.array([0.0, 0.5, 2.0, -2.0], dtype=np.float32)
+        data = encode_audio(audio, 24000, "pcm")
+        assert np.frombuffer(data, dtype="<i2").tolist() == [0, 16383, 32767, -32767]
+
+    @pytest.mark.parametrize("format", ["wav", "flac"])
+    def test_lossless_round_trip(self, format):
+        """wav and flac decode back to the input within 16-bit quantization."""
+        audio = _tone()
+        decoded, sample_rate = sf.read(io.BytesIO(encode_audio(audio, 24000, format)))
+        assert sample_rate == 24000
+        assert np.max(np.abs(decoded - audio)) < 1e-4
+
+    def test_unknown_format(self):
+        """Unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            encode_audio(_tone(), 24000, "wma")
+
+    @requires_ffmpeg
+    @pytest.mark.parametrize("format", ["mp3", "opus", "aac"])
+    def test_compressed_formats(self, format):
+        """Compressed formats are produced by ffmpeg without temp files."""
+        assert len(encode_audio(_tone(), 24000, format)) > 0
+
+
+class TestIterEncodeAudio:
+    """Test streaming encoding."""
+
+    def test_pcm_stream_matches_one_shot(self):
+        """Streamed pcm is the concatenation of the encoded chunks."""
+        audio = _tone()
+        chunks = np.array_split(audio, 7)
+        assert b"".join(iter_encode_audio(chunks, 24000, "pcm")) == encode_audio(
+            audio, 24000, "pcm"
+        )
+
+    def test_wav_stream_has_open_ended_header(self):
+        """Streamed wav sends one header with unknown length, then the samples."""
+        audio = _tone()
+        data = b"".join(iter_encode_audio(np.array_split(audio, 5), 24000, "wav"))
+        assert data[:4] == b"RIFF"
+        assert data[4:8] == b"\xff\xff\xff\xff"
+        assert data[WAV_HEADER_SIZE:] == encode_audio(audio, 24000, "pcm")
+
+    def test_single_sample_chunks(self):
+        """Chunks of a single sample stream without errors."""
+        chunks = [np.array([[0.25]], dtype=np.float32)] * 3
+        data = b"".join(iter_encode_audio(chunks, 24000, "wav"))
+        assert len(data) == WAV_HEADER_SIZE + 6
+
+    @requires_ffmpeg
+    def test_mp3_stream(self):
+        """Compressed streams are piped through one ffmpeg process."""
+        data = b"".join(iter_encode_audio(np.array_split(_tone(), 4), 24000, "mp3"))
+        assert len(data) > 0
+
+    def test_wav_continuation_has_no_header(self):
+        """A continued wav stream appends samples to an existing file."""
+        audio = _tone()
+        first = b"".join(iter_encode_audio([audio[:1000]], 24000, "wav"))
+        rest = b"".join(iter_encode_audio([audio[1000:]], 24000, "wav", continuation=True))
+        assert first + rest == b"".join(iter_encode_audio([audio], 24000, "wav"))
+
+    def test_continuation_needs_appendable_format(self):
+        with pytest.raises(ValueError):
+            list(iter_encode_audio([_tone()], 24000, "opus", continuation=True))
@@ -0,0 +1,34 @@
+"""
+Tests for model residency and queue depth reporting (app.core.model_manager).
+"""
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("torch")
+
+from app.core.model_manager import ModelManager, ModelType  # noqa: E402
+
+
+class TestQueueDepth:
+    """Test the request counters reported on /health."""
+
+    def test_starts_empty(self):
+        manager = ModelManager()
+        assert manager.get_queue_depth() == {"queue_depth": 0, "pending_stt": 0, "pending_tts": 0}
+        assert manager.get_current_model()["model_type"] == "none"
+
+    def test_counts_per_model_type(self):
+        manager = ModelManager()
+        manager.begin_request(ModelType.STT)
+        manager.begin_request(ModelType.STT)
+        manager.begin_request(ModelType.TTS)
+        assert manager.get_queue_depth() == {"queue_depth": 3, "pending_stt": 2, "pending_tts": 1}
+        manager.end_request(ModelType.STT)
+        manager.end_request(ModelType.TTS)
+        assert manager.get_queue_depth() == {"queue_depth": 1, "pending_stt": 1, "pending_tts": 0}
+
+    def test_never_negative(self):
+        manager = ModelManager()
+        manager.end_request(ModelType.TTS)
+        assert manager.get_queue_depth()["pending_tts"] == 0
@@ -0,0 +1,52 @@
+"""
+Tests for polyphase resampling (opentalker_common.resample).
+"""
+
+import numpy as np
+import pytest
+from opentalker_common.resample import resample
+
+
+def _tone(frequency: float, sample_rate: int, seconds: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _rms(audio: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(np.square(audio, dtype=np.float64))))
+
+
+class TestResample:
+    """Test sample-rate conversion."""
+
+    @pytest.mark.parametrize(
+        "orig_sr,target_sr", [(24000, 16000), (16000, 24000), (24000, 8000), (22050, 48000)]
+    )
+    def test_tone_preserved(self, orig_sr, target_sr):
+        """A tone below both Nyquist rates matches the tone sampled at the new rate."""
+        out = resample(_tone(1000.0, orig_sr), orig_sr, target_sr)
+        expected = _tone(1000.0, target_sr)
+        assert out.dtype == np.float32
+        assert abs(out.size - expected.size) <= 1
+        # Skip the filter's edge transients
+        edge = target_sr // 100
+        n = min(out.size, expected.size) - edge
+        np.testing.assert_allclose(out[edge:n], expected[edge:n], atol=5e-3)
+
+    def test_aliases_rejected(self):
+        """Content above the output Nyquist rate is filtered out instead of folding down."""
+        out = resample(_tone(10000.0, 48000), 48000, 16000)
+        edge = 160
+        assert _rms(out[edge:-edge]) < 0.01 * _rms(_tone(10000.0, 48000))
+
+    def test_matching_rates_return_input(self):
+        audio = _tone(440.0, 16000)
+        assert resample(audio, 16000, 16000) is audio
+
+    def test_empty_input(self):
+        audio = np.zeros(0, dtype=np.float32)
+        assert resample(audio, 24000, 16000).size == 0
+
+    def test_invalid_rates(self):
+        with pytest.raises(ValueError):
+            resample(_tone(440.0, 16000), 16000, 0)
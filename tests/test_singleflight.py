@@ -0,0 +1,161 @@
+"""
+Tests for in-flight request coalescing (opentalker_common.singleflight).
+"""
+
+import asyncio
+
+import pytest
+from opentalker_common.singleflight import SingleFlight, request_key
+
+
+class Work:
+    """Shared work that blocks until released and counts its executions."""
+
+    def __init__(self, result="done", error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self._result = result
+        self._error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestRequestKey:
+    """Test request key stability."""
+
+    def test_dict_order_does_not_matter(self):
+        assert request_key({"a": 1, "b": 2}) == request_key({"b": 2, "a": 1})
+
+    def test_parts_are_separated(self):
+        assert request_key(b"ab", b"c") != request_key(b"a", b"bc")
+
+
+class TestSingleFlight:
+    """Test sharing one execution between concurrent callers."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Callers with the same key get the same result from one execution."""
+        flight = SingleFlight("test")
+        work = Work()
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(3)]
+        await _settle()
+        work.release.set()
+        results = await asyncio.gather(*callers)
+        assert work.calls == 1
+        assert [result for result, _ in results] == ["done"] * 3
+        assert [shared for _, shared in results] == [False, True, True]
+        assert flight.stats()["coalesced"] == 2
+        assert flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_finished_key_runs_again(self):
+        """A call after the shared work finished starts a new execution."""
+        flight = SingleFlight("test")
+        work = Work()
+        work.release.set()
+        await flight.do("k", work)
+        await flight.do("k", work)
+        assert work.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_caller(self):
+        flight = SingleFlight("test")
+        work = Work(error=ValueError("boom"))
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await _settle()
+        work.release.set()
+        for caller in callers:
+            with pytest.raises(ValueError, match="boom"):
+                await caller
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_work(self):
+        """One caller going away leaves the work running for the others."""
+        flight = SingleFlight("test")
+        work = Work()
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await _settle()
+        first.cancel()
+        await _settle()
+        work.release.set()
+        assert await second == ("done", True)
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_disabled_runs_every_call(self):
+        flight = SingleFlight("test", enabled=False)
+        work = Work()
+        work.release.set()
+        await asyncio.gather(flight.do("k", work), flight.do("k", work))
+        assert work.calls == 2
+
+
+class TestAttach:
+    """Test per-caller values derived from the shared result."""
+
+    @pytest.mark.asyncio
+    async def test_every_caller_attached_before_any_resumes(self):
+        """attach runs for all waiting callers before the first one continues."""
+        flight = SingleFlight("test")
+        work = Work()
+        attached = []
+
+        def attach(result):
+            attached.append(result)
+            return len(attached)
+
+        async def caller():
+            value, _ = await flight.do("k", work, attach=attach)
+            # Nothing else may run between the shared result and this point
+            return value, len(attached)
+
+        callers = [asyncio.create_task(caller()) for _ in range(3)]
+        await _settle()
+        work.release.set()
+        results = await asyncio.gather(*callers)
+        assert sorted(value for value, _ in results) == [1, 2, 3]
+        assert all(seen == 3 for _, seen in results)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_result_is_detached(self):
+        """When every caller left, the result is attached and detached once."""
+        flight = SingleFlight("test")
+        work = Work()
+        detached = []
+
+        async def detach(value):
+            detached.append(value)
+
+        caller = asyncio.create_task(
+            flight.do("k", work, attach=lambda result: f"view:{result}", detach=detach)
+        )
+        await _settle()
+        caller.cancel()
+        await _settle()
+        work.release.set()
+        await _settle()
+        assert detached == ["view:done"]
+
+    @pytest.mark.asyncio
+    async def test_attach_error_reaches_caller(self):
+        flight = SingleFlight("test")
+        work = Work()
+        work.release.set()
+
+        def attach(result):
+            raise RuntimeError("cannot attach")
+
+        with pytest.raises(RuntimeError, match="cannot attach"):
+            await flight.do("k", work, attach=attach)
@@ -0,0 +1,104 @@
+"""
+Tests for TTS text segmentation (opentalker_common.text_segmenter).
+"""
+
+import re
+
+from opentalker_common.text_segmenter import TextSegmenter
+
+LATIN_TEXT = (
+    "The quick brown fox jumps over the lazy dog. It was a bright cold day in April, "
+    "and the clocks were striking thirteen. Call me Ishmael; some years ago, never mind "
+    "how long precisely, having little or no money in my purse, I thought I would sail about."
+)
+CJK_TEXT = (
+    "今天天气很好。我们去公园散步吧！你觉得怎么样？" * 6
+    + "这是一个没有任何标点符号的很长很长的句子" * 4
+)
+
+
+def _squash(text: str) -> str:
+    return re.sub(r"\s+", "", text)
+
+
+class TestTextSegmenter:
+    """Test chunk size caps and content preservation."""
+
+    def test_short_text_is_one_chunk(self):
+        """Text within the limit is returned unchanged."""
+        segmenter = TextSegmenter(max_chunk_size=100)
+        assert segmenter.segment("Hello world.") == ["Hello world."]
+
+    def test_chunks_respect_limit_and_keep_content(self):
+        """No chunk exceeds the limit and no text is lost or reordered."""
+        for text in (LATIN_TEXT, CJK_TEXT):
+            for limit in (10, 25, 60):
+                segmenter = TextSegmenter(max_chunk_size=limit, min_chunk_size=5)
+                chunks = segmenter.segment(text)
+                assert len(chunks) > 1
+                assert all(0 < len(chunk) <= limit for chunk in chunks)
+                assert _squash("".join(chunks)) == _squash(text)
+
+    def test_splits_at_sentence_boundaries(self):
+        """Sentences that fit are kept whole."""
+        segmenter = TextSegmenter(max_chunk_size=30)
+        chunks = segmenter.segment(CJK_TEXT[:46])
+        assert chunks[0].endswith(("。", "！", "？"))
+
+    def test_unbreakable_text_is_hard_cut(self):
+        """Text without any boundary falls back to character cuts."""
+        segmenter = TextSegmenter(max_chunk_size=8, min_chunk_size=1)
+        chunks = segmenter.segment("x" * 30)
+        assert chunks == ["x" * 8, "x" * 8, "x" * 8, "x" * 6]
+
+    def test_first_chunk_cap(self):
+        """The first chunk is capped at first_chunk_size, later ones at the limit."""
+        segmenter = TextSegmenter(max_chunk_size=80, first_chunk_size=30, min_chunk_size=10)
+        chunks = segmenter.segment(LATIN_TEXT)
+        assert len(chunks[0]) <= 30
+        assert all(len(chunk) <= 80 for chunk in chunks[1:])
+        assert any(len(chunk) > 30 for chunk in chunks[1:])
+
+    def test_first_chunk_cap_not_below_minimum(self):
+        """first_chunk_size below min_chunk_size is raised to the minimum."""
+        segmenter = TextSegmenter(max_chunk_size=80, first_chunk_size=3, min_chunk_size=20)
+        chunks = segmenter.segment(LATIN_TEXT)
+        assert 3 < len(chunks[0]) <= 20
+
+
+class TestAdaptiveChunkSize:
+    """Test the latency-driven chunk limit."""
+
+    def test_uses_max_until_measured(self):
+        """Without measurements the limit is max_chunk_size."""
+        segmenter = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0)
+        assert segmenter.seconds_per_char is None
+        assert segmenter.chunk_size == 120
+
+    def test_targets_render_time_within_bounds(self):
+        """The limit follows the measured latency, clamped to [min, max]."""
+        segmenter = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0, min_chunk_size=20)
+        segmenter.record_latency(chars=100, seconds=4.0)
+        assert segmenter.chunk_size == 50
+
+        slow = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0, min_chunk_size=20)
+        slow.record_latency(chars=10, seconds=10.0)
+        assert slow.chunk_size == 20
+
+        fast = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0, min_chunk_size=20)
+        fast.record_latency(chars=1000, seconds=1.0)
+        assert fast.chunk_size == 120
+
+    def test_latency_is_smoothed(self):
+        """Later measurements move the estimate by the EWMA weight."""
+        segmenter = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0, ewma_alpha=0.5)
+        segmenter.record_latency(chars=100, seconds=1.0)
+        segmenter.record_latency(chars=100, seconds=3.0)
+        assert abs(segmenter.seconds_per_char - 0.02) < 1e-12
+
+    def test_ignores_invalid_measurements(self):
+        """Zero characters or durations do not change the estimate."""
+        segmenter = TextSegmenter(max_chunk_size=120, target_chunk_seconds=2.0)
+        segmenter.record_latency(chars=0, seconds=1.0)
+        segmenter.record_latency(chars=10, seconds=0.0)
+        assert segmenter.seconds_per_char is None
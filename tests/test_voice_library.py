@@ -0,0 +1,110 @@
+"""
+Tests for the registered voice library (app.services.voice_library).
+"""
+
+import io
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+pytest.importorskip("pydantic_settings")
+
+from app.services.voice_library import VoiceLibrary, is_voice_id  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def _wav(seconds: float = 1.0, frequency: float = 220.0, channels: int = 1, pad: float = 0.0):
+    """WAV bytes of a sine tone, optionally surrounded by `pad` seconds of silence."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = 0.5 * np.sin(2 * np.pi * frequency * t)
+    silence = np.zeros(int(pad * SAMPLE_RATE))
+    audio = np.concatenate([silence, tone, silence]).astype(np.float32)
+    if channels > 1:
+        audio = np.stack([audio] * channels, axis=1)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, SAMPLE_RATE, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def library(tmp_path):
+    return VoiceLibrary(str(tmp_path / "voices"), cache_size=2)
+
+
+class TestRegistration:
+    """Test registering reference voices."""
+
+    def test_create_stores_preprocessed_reference(self, library):
+        """Stereo input is stored as trimmed, peak-normalized mono."""
+        entry = library.create(_wav(channels=2, pad=0.5), name="narrator")
+        assert is_voice_id(entry.id)
+        assert entry.name == "narrator"
+        assert entry.duration == pytest.approx(1.0, abs=0.01)
+
+        audio, sample_rate = sf.read(entry.reference_path, dtype="float32")
+        assert audio.ndim == 1
+        assert sample_rate == SAMPLE_RATE
+        assert np.abs(audio).max() == pytest.approx(0.95, abs=0.01)
+
+    def test_same_audio_same_id(self, library):
+        """Uploading the same audio twice returns the existing voice."""
+        first = library.create(_wav(), name="a")
+        second = library.create(_wav(), name="b")
+        assert second.id == first.id
+        assert second.name == "a"
+
+    def test_silent_reference_rejected(self, library):
+        with pytest.raises(ValueError, match="silent"):
+            library.create(_wav(seconds=0.0, pad=0.5))
+
+
+class TestLookup:
+    """Test lookup, listing and deletion."""
+
+    def test_get_reads_from_disk(self, library):
+        """A voice registered by another process is found through its metadata."""
+        entry = library.create(_wav())
+        fresh = VoiceLibrary(library.library_dir)
+        loaded = fresh.get(entry.id)
+        assert loaded == entry
+
+    def test_reference_path_is_stable(self, library):
+        """Every lookup resolves to the same reference file (the model caches by path)."""
+        entry = library.create(_wav())
+        for frequency in (330.0, 440.0):
+            library.create(_wav(frequency=frequency))
+        assert library.get(entry.id).reference_path == entry.reference_path
+        assert os.path.isabs(entry.reference_path)
+
+    def test_get_rejects_other_ids(self, library):
+        assert library.get("../etc") is None
+        assert library.get("voice_" + "0" * 24) is None
+
+    def test_list_newest_first(self, library, monkeypatch):
+        monkeypatch.setattr("app.services.voice_library.time.time", lambda: 1000.0)
+        older = library.create(_wav(frequency=220.0))
+        monkeypatch.setattr("app.services.voice_library.time.time", lambda: 2000.0)
+        newer = library.create(_wav(frequency=330.0))
+        os.makedirs(os.path.join(library.library_dir, "not-a-voice"))
+        assert [entry.id for entry in library.list()] == [newer.id, older.id]
+
+    def test_list_does_not_touch_the_cache(self, library):
+        """Listing every voice leaves the recently used voices cached."""
+        voices = [library.create(_wav(frequency=f)) for f in (220.0, 330.0, 440.0)]
+        library.get(voices[0].id)
+        cached = list(library._cache)
+        assert len(library.list()) == 3
+        assert list(library._cache) == cached
+
+    def test_cache_is_bounded(self, library):
+        voices = [library.create(_wav(frequency=f)) for f in (220.0, 330.0, 440.0)]
+        assert list(library._cache) == [voices[1].id, voices[2].id]
+
+    def test_delete(self, library):
+        entry = library.create(_wav())
+        assert library.delete(entry.id)
+        assert library.get(entry.id) is None
+        assert not library.delete(entry.id)
@@ -0,0 +1,324 @@
+"""
+TTS Batcher - Batched, priority-scheduled chunk generation
+Collects text chunks from one or more requests and runs them through the model
+as batched generate calls, grouped by speaker and language. Every chunk is a
+separate scheduling unit, so short interactive requests can run between the
+chunks of a long render.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# generate_fn(texts, speaker, language) -> (wavs, sample_rate), one wav per text
+GenerateFn = Callable[[List[str], str, str], Tuple[List[Any], int]]
+
+# Priority classes, highest first
+PRIORITY_CLASSES = ("interactive", "bulk")
+DEFAULT_PRIORITY = "interactive"
+
+# Queue-latency samples kept per class for percentile reporting
+_LATENCY_WINDOW = 1000
+
+
+@dataclass
+class _ChunkJob:
+    """A single text chunk waiting for generation"""
+
+    text: str
+    speaker: str
+    language: str
+    priority: str
+    request_id: int
+    enqueued_at: float
+    future: Future
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TTSBatcher:
+    """
+    Batches and schedules text chunks into shared generate calls
+
+    A single worker thread owns the model. Each pass it picks a priority class
+    (interactive before bulk, unless bulk has gone unserved for longer than
+    bulk_max_wait_ms while it had chunks waiting, which promotes one bulk
+    batch and restarts the clock), then the request in that class that was
+    served least recently, and packs that request's next chunk together with every
+    other pending chunk of the same class, speaker and language, up to the
+    batch size and character budget.
+    """
+
+    def __init__(
+        self,
+        generate_fn: GenerateFn,
+        max_batch_size: int = 4,
+        max_batch_chars: int = 800,
+        wait_ms: int = 5,
+        bulk_max_wait_ms: int = 2000,
+    ):
+        self._generate_fn = generate_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_chars = max(1, max_batch_chars)
+        self.wait_seconds = max(0, wait_ms) / 1000.0
+        self.bulk_max_wait_seconds = max(0, bulk_max_wait_ms) / 1000.0
+        self._pending: Dict[str, List[_ChunkJob]] = {p: [] for p in PRIORITY_CLASSES}
+        self._last_served: Dict[int, float] = {}
+        # When each class last had a batch taken (bounds how long it waits)
+        self._class_served_at: Dict[str, float] = {p: 0.0 for p in PRIORITY_CLASSES}
+        self._request_ids = itertools.count()
+        self._queue_latency: Dict[str, Deque[float]] = {
+            p: deque(maxlen=_LATENCY_WINDOW) for p in PRIORITY_CLASSES
+        }
+        self._served: Dict[str, int] = {p: 0 for p in PRIORITY_CLASSES}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> None:
+        """Start the worker thread"""
+        with self._cond:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="tts-batcher", daemon=True)
+            self._worker.start()
+        logger.info(
+            f"TTS batcher started: max_batch_size={self.max_batch_size}, "
+            f"max_batch_chars={self.max_batch_chars}, wait={self.wait_seconds * 1000:.0f}ms"
+        )
+
+    def stop(self) -> None:
+        """Stop the worker thread, failing any chunks still queued"""
+        with self._cond:
+            self._stopped = True
+            pending = [job for jobs in self._pending.values() for job in jobs]
+            self._pending = {p: [] for p in PRIORITY_CLASSES}
+            self._last_served.clear()
+            self._cond.notify_all()
+        for job in pending:
+            if job.future.set_running_or_notify_cancel():
+                job.future.set_exception(RuntimeError("TTS batcher stopped"))
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+
+    def submit(
+        self,
+        chunks: List[str],
+        speaker: str,
+        language: str,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> List[Future]:
+        """
+        Queue chunks for generation
+
+        Args:
+            chunks: Text chunks, in playback order
+            speaker: Speaker name
+            language: Language name
+            priority: Priority class (interactive or bulk)
+
+        Returns:
+            One future per chunk resolving to (wav, sample_rate)
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        request_id = next(self._request_ids)
+        now = time.monotonic()
+        jobs = [
+            _ChunkJob(chunk, speaker, language, priority, request_id, now, Future())
+            for chunk in chunks
+        ]
+        with self._cond:
+            if self._stopped or self._worker is None:
+                raise RuntimeError("TTS batcher is not running")
+            self._pending[priority].extend(jobs)
+            self._cond.notify()
+        return [job.future for job in jobs]
+
+    def generate(
+        self,
+        chunks: List[str],
+        speaker: str,
+        language: str,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> Tuple[List[Any], int]:
+        """
+        Generate audio for all chunks and return them in input order
+
+        Args:
+            chunks: Text chunks, in playback order
+            speaker: Speaker name
+            language: Language name
+            priority: Priority class (interactive or bulk)
+
+        Returns:
+            Tuple of (wavs, sample_rate)
+
+        Raises:
+            ValueError: No chunks were given (there is no sample rate to report)
+        """
+        if not chunks:
+            raise ValueError("No text chunks to generate")
+        futures = self.submit(chunks, speaker, language, priority)
+        results = [future.result() for future in futures]
+        return [wav for wav, _ in results], results[0][1]
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per-class queue statistics
+
+        Returns:
+            Dict keyed by priority class with queue depth, chunks served and
+            queue latency percentiles in milliseconds
+        """
+        with self._cond:
+            result = {}
+            for priority in PRIORITY_CLASSES:
+                samples = list(self._queue_latency[priority])
+                result[priority] = {
+                    "queued_chunks": len(self._pending[priority]),
+                    "served_chunks": self._served[priority],
+                    "queue_latency_ms": {
+                        "p50": round(_percentile(samples, 0.50) * 1000, 1),
+                        "p95": round(_percentile(samples, 0.95) * 1000, 1),
+                        "p99": round(_percentile(samples, 0.99) * 1000, 1),
+                    },
+                }
+            return result
+
+    def _run(self) -> None:
+        """Worker loop"""
+        while True:
+            with self._cond:
+                while not self._has_pending() and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                backlog = sum(len(jobs) for jobs in self._pending.values())
+
+            # Give concurrent requests a moment to join the batch
+            if self.wait_seconds > 0 and backlog < self.max_batch_size:
+                time.sleep(self.wait_seconds)
+
+            batch = self._take_batch()
+            if batch:
+                self._execute(batch)
+
+    def _has_pending(self) -> bool:
+        return any(self._pending.values())
+
+    def _select_class(self, now: float) -> Optional[str]:
+        """
+        Highest non-empty class, unless a lower class has been starved too long
+
+        A lower class waits from its oldest chunk's arrival or its last served
+        batch, whichever is later, so a long bulk render is promoted one batch
+        per bulk_max_wait_ms rather than running back-to-back once its chunks
+        have aged.
+        """
+        for priority in reversed(PRIORITY_CLASSES[1:]):
+            jobs = self._pending[priority]
+            if not jobs:
+                continue
+            waiting_since = max(jobs[0].enqueued_at, self._class_served_at[priority])
+            if now - waiting_since >= self.bulk_max_wait_seconds:
+                return priority
+        for priority in PRIORITY_CLASSES:
+            if self._pending[priority]:
+                return priority
+        return None
+
+    def _take_batch(self) -> List[_ChunkJob]:
+        """Pick the next chunk to serve and every compatible chunk that fits its batch"""
+        with self._cond:
+            # Chunks whose caller gave up (cancelled futures) are never generated
+            purged = False
+            for jobs in self._pending.values():
+                live = [job for job in jobs if not job.future.cancelled()]
+                if len(live) < len(jobs):
+                    jobs[:] = live
+                    purged = True
+            if purged:
+                waiting = {job.request_id for jobs in self._pending.values() for job in jobs}
+                for request_id in set(self._last_served) - waiting:
+                    del self._last_served[request_id]
+
+            now = time.monotonic()
+            priority = self._select_class(now)
+            if priority is None:
+                return []
+
+            jobs = self._pending[priority]
+            self._class_served_at[priority] = now
+
+            # Round-robin between requests: serve the least recently served one
+            head = min(
+                jobs,
+                key=lambda job: (self._last_served.get(job.request_id, 0.0), job.enqueued_at),
+            )
+
+            batch: List[_ChunkJob] = [head]
+            chars = len(head.text)
+            seen_requests = {head.request_id}
+            for job in jobs:
+                if len(batch) >= self.max_batch_size:
+                    break
+                if job is head or job.speaker != head.speaker or job.language != head.language:
+                    continue
+                if chars + len(job.text) > self.max_batch_chars:
+                    continue
+                batch.append(job)
+                chars += len(job.text)
+                seen_requests.add(job.request_id)
+
+            selected = {id(job) for job in batch}
+            self._pending[priority] = [job for job in jobs if id(job) not in selected]
+
+            pending_requests = {job.request_id for job in self._pending[priority]}
+            for request_id in seen_requests:
+                if request_id in pending_requests:
+                    self._last_served[request_id] = now
+                else:
+                    self._last_served.pop(request_id, None)
+
+            # Past this point the futures can no longer be cancelled
+            batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+            for job in batch:
+                self._queue_latency[priority].append(now - job.enqueued_at)
+            self._served[priority] += len(batch)
+            return batch
+
+    def _execute(self, batch: List[_ChunkJob]) -> None:
+        """Run one batched generate call and resolve its futures"""
+        texts = [job.text for job in batch]
+        try:
+            start_time = time.time()
+            wavs, sample_rate = self._generate_fn(texts, batch[0].speaker, batch[0].language)
+            logger.info(
+                f"Generated {batch[0].priority} batch of {len(batch)} chunks "
+                f"({sum(len(t) for t in texts)} chars) in {time.time() - start_time:.2f}s"
+            )
+            if len(wavs) != len(batch):
+                raise RuntimeError(f"Model returned {len(wavs)} outputs for {len(batch)} inputs")
+            for job, wav in zip(batch, wavs):
+                job.future.set_result((wav, sample_rate))
+        except Exception as e:
+            logger.error(f"Batched generation failed: {e}", exc_info=True)
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
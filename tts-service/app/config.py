@@ -2,7 +2,9 @@
 TTS Service Configuration
 """
 
-from pydantic import Field
+from typing import Optional
+
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,7 +20,15 @@ class Settings(BaseSettings):
     # Service
     service_host: str = Field(default="0.0.0.0", description="Service host")
     service_port: int = Field(default=8002, description="Service port")
-    log_level: str = Field(default="INFO", description="Log level")
+    service_uds: Optional[str] = Field(
+        default=None,
+        description="Listen on this Unix domain socket instead of host:port",
+    )
+    qwen_tts_log_level: str = Field(
+        default="INFO",
+        validation_alias=AliasChoices("qwen_tts_log_level", "log_level"),
+        description="Log level",
+    )
 
     # Qwen3-TTS Model
     qwen_tts_model: str = Field(
@@ -31,6 +41,86 @@ class Settings(BaseSettings):
         default=200,
         description="Max characters per chunk for long text synthesis (0 = no chunking)",
     )
+    qwen_tts_first_chunk_size: int = Field(
+        default=80,
+        description="Max characters in the first chunk, for faster first audio (0 = same as chunk size)",
+    )
+    qwen_tts_target_chunk_seconds: float = Field(
+        default=8.0,
+        description="Target render time per chunk; chunk size is derived from measured latency (0 = fixed)",
+    )
+    qwen_tts_max_batch_size: int = Field(
+        default=4,
+        description="Max chunks per batched generate call (1 = no batching)",
+    )
+    qwen_tts_max_batch_chars: int = Field(
+        default=800,
+        description="Max total characters per batched call (bounds GPU memory per batch)",
+    )
+    qwen_tts_batch_wait_ms: int = Field(
+        default=5,
+        description="Time to wait for concurrent requests to join a batch (milliseconds)",
+    )
+    qwen_tts_bulk_max_wait_ms: int = Field(
+        default=2000,
+        description="Bulk left unserved this long gets one batch ahead of interactive work",
+    )
+
+    # Chunk assembly
+    qwen_tts_crossfade_ms: float = Field(
+        default=10.0,
+        description="Equal-power crossfade between chunks (milliseconds, 0 = hard cut)",
+    )
+    qwen_tts_trim_silence: bool = Field(
+        default=True,
+        description="Trim silence at chunk boundaries before joining",
+    )
+
+    # Long-form jobs
+    qwen_tts_jobs_dir: str = Field(
+        default="./jobs",
+        description="Directory for job state and rendered output",
+    )
+    qwen_tts_job_workers: int = Field(
+        default=1,
+        description="Jobs rendered concurrently (their chunks share the bulk priority class)",
+    )
+    qwen_tts_job_window: int = Field(
+        default=4,
+        description="Chunks of a job queued on the batcher ahead of the one being written",
+    )
+    qwen_tts_job_max_chars: int = Field(
+        default=1000000,
+        description="Maximum input length of a job in characters",
+    )
+
+    # Admission control (/synthesize only)
+    qwen_tts_admission_budget: float = Field(
+        default=4000.0,
+        description="Characters synthesized concurrently before requests queue (0 = off)",
+    )
+    qwen_tts_admission_max_queue: int = Field(
+        default=64, description="Requests allowed to wait for capacity before 429"
+    )
+    qwen_tts_admission_queue_timeout: float = Field(
+        default=30.0, description="Max time a request waits for capacity (seconds)"
+    )
+
+    # Request coalescing
+    qwen_tts_coalesce_requests: bool = Field(
+        default=True,
+        description="Share one synthesis among identical concurrent /synthesize requests",
+    )
+
+    # Output encoding
+    qwen_tts_encode_workers: int = Field(
+        default=2,
+        description="Worker threads in the encoder pool (each drives one ffmpeg process)",
+    )
+    qwen_tts_mp3_bitrate: str = Field(default="128k", description="MP3 output bitrate")
+    qwen_tts_opus_bitrate: str = Field(default="64k", description="Opus output bitrate")
+    qwen_tts_aac_bitrate: str = Field(default="128k", description="AAC output bitrate")
+
     qwen_tts_use_fp16: bool = Field(
         default=False,
         description="Use FP16 half precision (note: TTS uses bfloat16 by default)",
@@ -0,0 +1,608 @@
+"""
+TTS Jobs - Long-form asynchronous synthesis
+Renders arbitrarily long text in the background: the text is segmented once,
+chunks are scheduled at bulk priority, and finished chunks are joined by one
+assembler, stretched and encoded as a single stream into an on-disk artifact
+that can be downloaded while rendering runs. The assembled audio and job state
+are checkpointed after every chunk so rendering resumes from the last completed
+chunk after a restart, appending to the output from its last encoded boundary.
+"""
+
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from opentalker_common.audio_assembly import AudioAssembler
+from opentalker_common.audio_encoder import WAV_HEADER_SIZE, wav_header
+
+from app.speed import TimeStretcher
+
+logger = logging.getLogger(__name__)
+
+# Formats whose encoded stream can be served while the file grows
+# (opus/ogg and flac need a finalized container and are not supported)
+JOB_FORMATS = ("wav", "pcm", "mp3", "aac")
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+
+JOB_FILENAME = "job.json"
+CHUNKS_FILENAME = "chunks.json"
+OUTPUT_BASENAME = "output"
+# Assembled (unstretched, unencoded) float32 audio, the resume point of a job
+ASSEMBLED_FILENAME = "assembled.f32"
+_SAMPLE_DTYPE = np.dtype("<f4")
+
+# Samples per piece when replaying assembled audio after a restart
+_REPLAY_BLOCK = 1 << 16
+# Bytes per sample of pcm16 mono output
+_PCM16_BYTES = 2
+# Audio pieces buffered between a job's render and encoder threads
+_STREAM_QUEUE_SIZE = 16
+# Poll interval of the encoder queue, so a failed encoder never blocks the render thread
+_STREAM_POLL_SECONDS = 0.1
+
+
+@dataclass
+class TTSJob:
+    """Persistent state of a long-form synthesis job"""
+
+    id: str
+    status: str
+    response_format: str
+    speaker: str
+    language: str
+    speed: float
+    total_chunks: int
+    total_chars: int
+    created_at: int
+    updated_at: int
+    completed_chunks: int = 0
+    completed_chars: int = 0
+    bytes_written: int = 0
+    audio_seconds: float = 0.0
+    sample_rate: Optional[int] = None
+    error: Optional[str] = None
+    # Samples in assembled.f32; the first settled_samples can no longer change
+    assembled_samples: int = 0
+    settled_samples: int = 0
+    # Resume point of the output: the first encoded_samples assembled samples are
+    # encoded, as encoded_seconds of audio, in the first encoded_bytes of the file
+    encoded_samples: int = 0
+    encoded_bytes: int = 0
+    encoded_seconds: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_response(self) -> Dict:
+        """Public representation including progress"""
+        data = asdict(self)
+        for key in (
+            "assembled_samples",
+            "settled_samples",
+            "encoded_samples",
+            "encoded_bytes",
+            "encoded_seconds",
+        ):
+            del data[key]
+        data["object"] = "speech.job"
+        data["progress"] = (
+            round(self.completed_chars / self.total_chars, 4) if self.total_chars else 1.0
+        )
+        data["audio_seconds"] = round(self.audio_seconds, 3)
+        return data
+
+
+class _OutputStream:
+    """
+    Stretches and encodes a job's settled audio into its output file
+
+    One TimeStretcher and one streaming encoder span the whole render, so the
+    output has a single header and no per-chunk seams or encoder restarts.
+    Encoding runs on its own thread because a streaming encoder (ffmpeg) only
+    returns output as it reads more input. bytes_written is advanced after
+    each flush, so it always marks a consistent prefix of the output file.
+    A resumed job continues its output with a new stream that writes no header.
+    """
+
+    def __init__(self, service, job: "TTSJob", out, continuation: bool = False):
+        self._job = job
+        self._out = out
+        self._stretcher = TimeStretcher(job.speed, job.sample_rate)
+        # Unstretched pcm16: every whole sample written maps back to an assembled sample
+        self.stateless = self._stretcher.passthrough and job.response_format in ("wav", "pcm")
+        self._pieces: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(_STREAM_QUEUE_SIZE)
+        self._failed = threading.Event()
+        self._error: Optional[Exception] = None
+        self._samples = int(round(job.audio_seconds * job.sample_rate))
+        self._encoded = service.encode_stream(
+            self._iter_pieces(), job.sample_rate, job.response_format, continuation=continuation
+        )
+        self._thread = threading.Thread(target=self._write, name="tts-job-encode", daemon=True)
+        self._thread.start()
+
+    def feed(self, audio: np.ndarray) -> None:
+        """Queue the next settled samples of the job"""
+        stretched = self._stretcher.process(audio)
+        if stretched.size:
+            self._samples += stretched.size
+            self._job.audio_seconds = self._samples / self._job.sample_rate
+            self._put(stretched)
+
+    def close(self) -> None:
+        """Flush the stretcher and encoder and wait until everything is written"""
+        tail = self._stretcher.flush()
+        if tail.size:
+            self._samples += tail.size
+            self._job.audio_seconds = self._samples / self._job.sample_rate
+            self._put(tail)
+        self.abort()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """End the stream without flushing the stretcher"""
+        self._put(None)
+        self._thread.join()
+
+    def _put(self, piece: Optional[np.ndarray]) -> None:
+        while not self._failed.is_set():
+            try:
+                self._pieces.put(piece, timeout=_STREAM_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _iter_pieces(self) -> Iterator[np.ndarray]:
+        while not self._failed.is_set():
+            try:
+                piece = self._pieces.get(timeout=_STREAM_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if piece is None:
+                return
+            yield piece
+
+    def _write(self) -> None:
+        try:
+            for data in self._encoded:
+                self._out.write(data)
+                self._out.flush()
+                self._job.bytes_written = self._out.tell()
+        except Exception as e:
+            self._error = e
+            self._failed.set()
+            self._encoded.close()
+
+
+class JobManager:
+    """
+    Long-form TTS job store and runner
+
+    Jobs live on disk as
+    <jobs_dir>/<job_id>/{job.json,chunks.json,assembled.f32,output.<fmt>}.
+    Worker threads render one job each, keeping up to `window` chunks queued on
+    the batcher so consecutive chunks of a job can share a batched generate call.
+    Each chunk is appended to the job's AudioAssembler; the samples it settles
+    go to the output stream and to assembled.f32, which is the checkpoint.
+
+    The output is resumed from its last encoded boundary, a point where the
+    file holds exactly the encoding of a prefix of the assembled audio.
+    Unstretched wav/pcm output has one after every chunk; other streams get
+    one when a shutdown closes them at a chunk boundary. On resume the output
+    is cut back to the boundary, only the settled audio after it is replayed
+    through a new output stream that appends to the file, and the last
+    chunk's open tail is reloaded into a new assembler. A stretched or
+    compressed job restarts its stretcher and encoder at the boundary.
+    """
+
+    def __init__(self, service, jobs_dir: str, workers: int = 1, window: int = 4):
+        self._service = service
+        self.jobs_dir = jobs_dir
+        self.workers = max(1, workers)
+        self.window = max(1, window)
+        self._jobs: Dict[str, TTSJob] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        # Batcher futures of the jobs being rendered, by job id
+        self._rendering: Dict[str, Deque[Tuple[int, Future]]] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Load persisted jobs, re-queue unfinished ones and start the workers"""
+        if self._threads:
+            return
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._stopping.clear()
+
+        resumed = 0
+        for job_id in sorted(os.listdir(self.jobs_dir)):
+            job = self._load(job_id)
+            if job is None:
+                continue
+            if not job.finished:
+                job.status = "queued"
+                self._save(job)
+                self._queue.put(job.id)
+                resumed += 1
+            with self._lock:
+                self._jobs[job.id] = job
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"tts-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(
+            f"TTS job manager started: {len(self._jobs)} jobs on disk, {resumed} resumed, "
+            f"workers={self.workers}, window={self.window}"
+        )
+
+    def stop(self) -> None:
+        """Stop the workers; running jobs stop at the next chunk boundary and resume on start()"""
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def create(
+        self,
+        text: str,
+        speaker: Optional[str] = None,
+        language: Optional[str] = None,
+        response_format: str = "wav",
+        speed: float = 1.0,
+    ) -> TTSJob:
+        """
+        Create and queue a job
+
+        Args:
+            text: Text to synthesize (any length)
+            speaker: Speaker name, None for the default speaker
+            language: Language code, None to detect from text
+            response_format: Output format (wav, pcm, mp3, aac)
+            speed: Speech speed (0.25-4.0)
+
+        Returns:
+            The queued job
+        """
+        if response_format not in JOB_FORMATS:
+            raise ValueError(f"Unsupported job format: {response_format}. Use one of {JOB_FORMATS}")
+        if not self._threads:
+            raise RuntimeError("TTS job manager is not running")
+
+        speaker, language = self._service.resolve_voice(text, speaker, language)
+        chunks = self._service.segment_text(text)
+        if not chunks:
+            raise ValueError("Input text is empty")
+
+        now = int(time.time())
+        job = TTSJob(
+            id="job_" + uuid.uuid4().hex[:24],
+            status="queued",
+            response_format=response_format,
+            speaker=speaker,
+            language=language,
+            speed=speed,
+            total_chunks=len(chunks),
+            total_chars=sum(len(chunk) for chunk in chunks),
+            created_at=now,
+            updated_at=now,
+        )
+
+        job_dir = self._job_dir(job.id)
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, CHUNKS_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(chunks, f, ensure_ascii=False)
+        self._save(job)
+
+        with self._lock:
+            self._jobs[job.id] = job
+        self._queue.put(job.id)
+
+        logger.info(
+            f"Created TTS job {job.id}: {job.total_chars} chars in {job.total_chunks} chunks, "
+            f"format={response_format}"
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[TTSJob]:
+        """Look up a job"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[TTSJob]:
+        """All jobs, newest first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def delete(self, job_id: str) -> bool:
+        """
+        Cancel a job and delete its files
+
+        A job that is being rendered is only marked cancelled here; its queued
+        chunks are withdrawn from the batcher and the worker removes the files
+        once it has stopped writing them.
+
+        Returns:
+            True if the job existed
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            job.status = "cancelled"
+            pending = self._rendering.get(job_id)
+            if pending is not None:
+                for _, future in pending:
+                    future.cancel()
+
+        if pending is None:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        logger.info(f"Deleted TTS job {job_id}")
+        return True
+
+    def output_path(self, job: TTSJob) -> str:
+        """Path of the job's output artifact"""
+        return os.path.join(self._job_dir(job.id), f"{OUTPUT_BASENAME}.{job.response_format}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _save(self, job: TTSJob) -> None:
+        """Atomically write job.json"""
+        job_dir = self._job_dir(job.id)
+        if not os.path.isdir(job_dir):
+            return
+        path = os.path.join(job_dir, JOB_FILENAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(job), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _load(self, job_id: str) -> Optional[TTSJob]:
+        path = os.path.join(self._job_dir(job_id), JOB_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return TTSJob(**json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load TTS job {job_id}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        """Worker loop"""
+        while not self._stopping.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.finished:
+                    continue
+                pending: Deque[Tuple[int, Future]] = deque()
+                self._rendering[job_id] = pending
+
+            try:
+                self._render(job, pending)
+            except Exception as e:
+                if job.status == "cancelled":
+                    pass
+                elif self._stopping.is_set():
+                    # Interrupted by shutdown; picked up again on the next start()
+                    logger.info(f"TTS job {job.id} interrupted at chunk {job.completed_chunks}")
+                else:
+                    logger.error(f"TTS job {job.id} failed: {e}", exc_info=True)
+                    job.status = "failed"
+                    job.error = str(e)
+                    job.updated_at = int(time.time())
+                    self._save(job)
+            finally:
+                with self._lock:
+                    del self._rendering[job_id]
+                    for _, future in pending:
+                        future.cancel()
+                if job.status == "cancelled":
+                    shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+                    logger.info(f"Removed files of cancelled TTS job {job_id}")
+
+    def _render(self, job: TTSJob, pending: Deque[Tuple[int, Future]]) -> None:
+        """Render the remaining chunks of a job and finish its output file"""
+        job_dir = self._job_dir(job.id)
+        with open(os.path.join(job_dir, CHUNKS_FILENAME), encoding="utf-8") as f:
+            chunks: List[str] = json.load(f)
+
+        job.status = "running"
+        job.updated_at = int(time.time())
+        self._save(job)
+        logger.info(
+            f"Rendering TTS job {job.id} from chunk {job.completed_chunks}/{job.total_chunks}"
+        )
+
+        assembled_path = os.path.join(job_dir, ASSEMBLED_FILENAME)
+        mode = "r+b" if os.path.exists(assembled_path) else "wb"
+        output_path = self.output_path(job)
+        if not os.path.exists(output_path):
+            job.encoded_samples, job.encoded_bytes, job.encoded_seconds = 0, 0, 0.0
+        # The output continues from its last encoded boundary
+        job.bytes_written = job.encoded_bytes
+        job.audio_seconds = job.encoded_seconds
+        out_mode = "r+b" if job.encoded_bytes else "wb"
+        stream: Optional[_OutputStream] = None
+        with open(output_path, out_mode) as out, open(assembled_path, mode) as assembled:
+            try:
+                # Drop anything written after the last checkpoint
+                out.truncate(job.encoded_bytes)
+                out.seek(job.encoded_bytes)
+                assembled.truncate(job.assembled_samples * _SAMPLE_DTYPE.itemsize)
+                assembler: Optional[AudioAssembler] = None
+                if job.assembled_samples:
+                    stream = _OutputStream(
+                        self._service, job, out, continuation=job.encoded_bytes > 0
+                    )
+                    assembler = self._replay(job, assembled, stream)
+
+                next_index = job.completed_chunks
+                while job.completed_chunks < job.total_chunks:
+                    if job.status == "cancelled":
+                        return
+                    if self._stopping.is_set():
+                        if stream is not None:
+                            # Close the output here so the next run appends to it
+                            stream.close()
+                            stream = None
+                            self._checkpoint_output(job, out, closed=True)
+                            self._save(job)
+                        return
+
+                    # Keep the batcher fed with the next few chunks of this job
+                    if len(pending) < self.window and next_index < job.total_chunks:
+                        end = min(job.total_chunks, next_index + self.window - len(pending))
+                        futures = self._service.submit_chunks(
+                            chunks[next_index:end], job.speaker, job.language, priority="bulk"
+                        )
+                        with self._lock:
+                            pending.extend(zip(range(next_index, end), futures))
+                        next_index = end
+
+                    index, future = pending[0]
+                    wav, sample_rate = future.result()
+                    with self._lock:
+                        pending.popleft()
+
+                    if assembler is None:
+                        job.sample_rate = sample_rate
+                        assembler = self._service.new_assembler(sample_rate)
+                        stream = _OutputStream(self._service, job, out)
+                    assembler.append(wav)
+                    settled = assembler.take_settled()
+                    stream.feed(settled)
+                    self._checkpoint_audio(job, assembled, settled, assembler.view())
+                    if stream.stateless:
+                        self._checkpoint_output(job, out, closed=False)
+
+                    job.completed_chunks = index + 1
+                    job.completed_chars += len(chunks[index])
+                    job.updated_at = int(time.time())
+                    self._save(job)
+
+                stream.feed(assembler.view())
+                stream.close()
+                stream = None
+            finally:
+                if stream is not None:
+                    stream.abort()
+
+            if job.response_format == "wav" and job.bytes_written >= WAV_HEADER_SIZE:
+                # Replace the streaming header with the final sizes
+                out.seek(0)
+                out.write(wav_header(job.sample_rate, 1, job.bytes_written - WAV_HEADER_SIZE))
+                out.flush()
+            os.fsync(out.fileno())
+
+        # The finished output replaces the checkpoint
+        os.remove(assembled_path)
+        job.status = "completed"
+        job.updated_at = int(time.time())
+        self._save(job)
+        logger.info(
+            f"TTS job {job.id} completed: {job.audio_seconds:.1f}s audio, "
+            f"{job.bytes_written} bytes"
+        )
+
+    def _checkpoint_audio(
+        self, job: TTSJob, assembled, settled: np.ndarray, tail: np.ndarray
+    ) -> None:
+        """Append newly settled samples to assembled.f32 and rewrite the open tail after them"""
+        assembled.seek(job.settled_samples * _SAMPLE_DTYPE.itemsize)
+        assembled.write(settled.astype(_SAMPLE_DTYPE, copy=False).tobytes())
+        assembled.write(tail.astype(_SAMPLE_DTYPE, copy=False).tobytes())
+        assembled.truncate()
+        assembled.flush()
+        os.fsync(assembled.fileno())
+        job.settled_samples += settled.size
+        job.assembled_samples = job.settled_samples + tail.size
+
+    def _replay(self, job: TTSJob, assembled, stream: _OutputStream) -> AudioAssembler:
+        """
+        Rebuild the output of a resumed job from its checkpoint
+
+        Returns:
+            An assembler holding the open tail of the last completed chunk
+        """
+        assembled.seek(job.encoded_samples * _SAMPLE_DTYPE.itemsize)
+        remaining = job.settled_samples - job.encoded_samples
+        while remaining > 0:
+            count = min(_REPLAY_BLOCK, remaining)
+            data = assembled.read(count * _SAMPLE_DTYPE.itemsize)
+            stream.feed(np.frombuffer(data, _SAMPLE_DTYPE))
+            remaining -= count
+
+        tail_size = (job.assembled_samples - job.settled_samples) * _SAMPLE_DTYPE.itemsize
+        assembler = self._service.new_assembler(job.sample_rate)
+        assembler.append(np.frombuffer(assembled.read(tail_size), _SAMPLE_DTYPE))
+        logger.info(
+            f"Replayed {job.settled_samples - job.encoded_samples} assembled samples of "
+            f"TTS job {job.id}, appending to the output at byte {job.encoded_bytes}"
+        )
+        return assembler
+
+    def _checkpoint_output(self, job: TTSJob, out, closed: bool) -> None:
+        """
+        Record the output's latest encoded boundary
+
+        Args:
+            job: Job being rendered
+            out: Its output file
+            closed: The output stream was just closed after all settled samples;
+                otherwise the stream must be stateless and the boundary is the
+                last whole sample written so far
+        """
+        written = job.bytes_written
+        if closed:
+            samples, seconds = job.settled_samples, job.audio_seconds
+        else:
+            header = WAV_HEADER_SIZE if job.response_format == "wav" else 0
+            if written < header:
+                return
+            samples = (written - header) // _PCM16_BYTES
+            written = header + samples * _PCM16_BYTES
+            seconds = samples / job.sample_rate
+        # The boundary must not point past what survives a crash
+        os.fsync(out.fileno())
+        job.encoded_samples, job.encoded_bytes, job.encoded_seconds = samples, written, seconds
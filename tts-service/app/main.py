@@ -7,18 +7,22 @@ import asyncio
 import logging
 import os
 import time
-from typing import Optional
+from typing import Dict, Literal, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import Response
+from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
+from opentalker_common.admission import AdmissionController, AdmissionRejectedError
+from opentalker_common.singleflight import SingleFlight, request_key
 from pydantic import BaseModel, Field
 
+from app.batcher import PRIORITY_CLASSES
 from app.config import settings
+from app.jobs import JobManager
 from app.service import Qwen3TTSService
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.log_level.upper()),
+    level=getattr(logging, settings.qwen_tts_log_level.upper()),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
@@ -33,6 +37,46 @@ app = FastAPI(
 # Initialize TTS service
 tts_service = Qwen3TTSService()
 
+# Admission control for /synthesize, budgeted in characters being synthesized
+# (long-form jobs have their own workers and are not counted)
+admission = AdmissionController(
+    "tts",
+    budget=settings.qwen_tts_admission_budget,
+    max_queue=settings.qwen_tts_admission_max_queue,
+    queue_timeout=settings.qwen_tts_admission_queue_timeout,
+)
+
+# Coalescing of identical in-flight /synthesize requests
+coalescer = SingleFlight("tts", enabled=settings.qwen_tts_coalesce_requests)
+
+# Long-form job runner
+job_manager = JobManager(
+    tts_service,
+    settings.qwen_tts_jobs_dir,
+    workers=settings.qwen_tts_job_workers,
+    window=settings.qwen_tts_job_window,
+)
+
+# Media type per output format
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "flac": "audio/flac",
+    "opus": "audio/opus",
+    "aac": "audio/aac",
+    "pcm": "audio/pcm",
+}
+
+# Media types for headerless pcm output per sample format
+RAW_MEDIA_TYPES = {
+    "pcm16": "audio/pcm",
+    "mulaw": "audio/PCMU",
+    "alaw": "audio/PCMA",
+}
+
+# Bytes per read when serving job output
+JOB_READ_SIZE = 64 * 1024
+
 
 class TTSRequest(BaseModel):
     """TTS request model"""
@@ -40,7 +84,30 @@ class TTSRequest(BaseModel):
     input: str = Field(..., description="Text to synthesize", min_length=1, max_length=4096)
     speaker: Optional[str] = Field(default=None, description="Speaker name")
     language: Optional[str] = Field(default=None, description="Language code (zh/en/ja/ko/etc)")
-    response_format: str = Field(default="wav", description="Audio format")
+    response_format: Literal["wav", "mp3", "flac", "opus", "aac", "pcm"] = Field(
+        default="wav", description="Audio format"
+    )
+    speed: float = Field(default=1.0, description="Speech speed", ge=0.25, le=4.0)
+    priority: Optional[Literal["interactive", "bulk"]] = Field(
+        default=None, description="Scheduling class (overrides the X-Priority header)"
+    )
+    sample_rate: Optional[int] = Field(
+        default=None, description="Output sample rate in Hz", ge=8000, le=48000
+    )
+    sample_format: Literal["pcm16", "mulaw", "alaw"] = Field(
+        default="pcm16", description="Sample encoding for wav/pcm output"
+    )
+
+
+class TTSJobRequest(BaseModel):
+    """Long-form TTS job request model"""
+
+    input: str = Field(..., description="Text to synthesize (no length limit)", min_length=1)
+    speaker: Optional[str] = Field(default=None, description="Speaker name")
+    language: Optional[str] = Field(default=None, description="Language code (zh/en/ja/ko/etc)")
+    response_format: Literal["wav", "mp3", "aac", "pcm"] = Field(
+        default="wav", description="Audio format (must support progressive writes)"
+    )
     speed: float = Field(default=1.0, description="Speech speed", ge=0.25, le=4.0)
 
 
@@ -63,6 +130,15 @@ async def startup_event():
     except Exception as e:
         logger.error(f"❌ Failed to load model: {e}", exc_info=True)
 
+    # Resume unfinished jobs
+    job_manager.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Shutdown event - checkpoint running jobs"""
+    job_manager.stop()
+
 
 @app.get("/health")
 async def health_check():
@@ -76,58 +152,123 @@ async def health_check():
     }
 
 
+@app.get("/stats")
+async def get_stats():
+    """Scheduler statistics per priority class, admission control and coalescing statistics"""
+    return {
+        "scheduler": tts_service.scheduler_stats(),
+        "admission": admission.stats(),
+        "coalescing": coalescer.stats(),
+    }
+
+
+async def _synthesize(request: TTSRequest, priority: str) -> Tuple[bytes, int, Dict[str, float]]:
+    """Wait for capacity and synthesize; returns the encoded audio, its sample rate and timings"""
+    async with admission.admit(len(request.input)):
+        start_time = time.time()
+        timings = {}
+
+        audio_bytes, sample_rate = await asyncio.to_thread(
+            tts_service.synthesize,
+            text=request.input,
+            speaker=request.speaker,
+            language=request.language,
+            response_format=request.response_format,
+            speed=request.speed,
+            priority=priority,
+            timings=timings,
+            sample_rate=request.sample_rate,
+            sample_format=request.sample_format,
+        )
+
+    elapsed = time.time() - start_time
+    logger.info(f"Synthesis completed in {elapsed:.2f}s, output size: {len(audio_bytes)} bytes")
+    return audio_bytes, sample_rate, timings
+
+
 @app.post("/synthesize")
-async def synthesize(request: TTSRequest):
+async def synthesize(
+    request: TTSRequest,
+    x_priority: Optional[str] = Header(default=None, description="interactive or bulk"),
+):
     """
     Synthesize speech from text
 
     Args:
         request: TTS request with text, speaker, and options
+        x_priority: Scheduling class from the X-Priority header
 
     Returns:
         Audio file in requested format
     """
     try:
+        priority = request.priority or (x_priority or "interactive").lower()
+        if priority not in PRIORITY_CLASSES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"error": f"Invalid priority: {priority}. Use one of {PRIORITY_CLASSES}"},
+            )
+
+        if request.sample_format != "pcm16" and request.response_format not in ("wav", "pcm"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": f"sample_format {request.sample_format} "
+                    "requires response_format wav or pcm"
+                },
+            )
+
         logger.info(
             f"Synthesis request: format={request.response_format}, "
-            f"text_length={len(request.input)}, speed={request.speed}"
+            f"text_length={len(request.input)}, speed={request.speed}, priority={priority}"
         )
 
-        # Perform synthesis
-        start_time = time.time()
-
-        audio_bytes = await asyncio.to_thread(
-            tts_service.synthesize,
-            text=request.input,
-            speaker=request.speaker,
-            language=request.language,
-            response_format=request.response_format,
-            speed=request.speed,
+        # Identical concurrent requests share one synthesis; the priority is part
+        # of the key so an interactive request never waits on a bulk-scheduled one
+        key = request_key(
+            priority,
+            request.input,
+            request.speaker,
+            request.language,
+            request.response_format,
+            request.speed,
+            request.sample_rate,
+            request.sample_format,
         )
-
-        elapsed = time.time() - start_time
-        logger.info(f"Synthesis completed in {elapsed:.2f}s, output size: {len(audio_bytes)} bytes")
+        (audio_bytes, sample_rate, timings), shared = await coalescer.do(
+            key, lambda: _synthesize(request, priority)
+        )
+        if shared:
+            logger.info("Synthesis coalesced with an identical in-flight request")
 
         # Determine media type
-        media_types = {
-            "wav": "audio/wav",
-            "mp3": "audio/mpeg",
-            "flac": "audio/flac",
-            "opus": "audio/opus",
-        }
-        media_type = media_types.get(request.response_format, "audio/wav")
+        if request.response_format == "pcm":
+            media_type = RAW_MEDIA_TYPES[request.sample_format]
+        else:
+            media_type = MEDIA_TYPES.get(request.response_format, "audio/wav")
 
         # Return audio response
         return Response(
             content=audio_bytes,
             media_type=media_type,
             headers={
-                "Content-Disposition": f'attachment; filename="speech.{request.response_format}"'
+                "Content-Disposition": f'attachment; filename="speech.{request.response_format}"',
+                "X-Sample-Rate": str(sample_rate),
+                "Server-Timing": ", ".join(
+                    f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()
+                ),
             },
         )
 
     except HTTPException:
         raise
+    except AdmissionRejectedError as e:
+        logger.warning(f"Synthesis rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"error": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Synthesis failed: {e}", exc_info=True)
         raise HTTPException(
@@ -136,12 +277,217 @@ async def synthesize(request: TTSRequest):
         )
 
 
+# ============================================
+# Long-form jobs
+# ============================================
+
+
+def _create_job(
+    text: str,
+    speaker: Optional[str],
+    language: Optional[str],
+    response_format: str,
+    speed: float,
+) -> dict:
+    """Validate and queue a job, mapping errors to HTTP responses"""
+    if len(text) > settings.qwen_tts_job_max_chars:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={
+                "error": f"Input too long: {len(text)} chars. "
+                f"Maximum is {settings.qwen_tts_job_max_chars} chars"
+            },
+        )
+    try:
+        job = job_manager.create(
+            text=text,
+            speaker=speaker,
+            language=language,
+            response_format=response_format,
+            speed=speed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"error": str(e)})
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"error": str(e)}
+        )
+    return job.to_response()
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": f"Job not found: {job_id}"},
+        )
+    return job
+
+
+def _parse_range(range_header: str, available: int) -> Optional[tuple]:
+    """
+    Parse a single "bytes=start-end" range against the bytes available so far
+
+    Returns:
+        (start, end) inclusive, or None if the range cannot be satisfied yet
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else available - 1
+        else:
+            # Suffix range: last N bytes
+            start = max(0, available - int(end_text))
+            end = available - 1
+    except ValueError:
+        return None
+    end = min(end, available - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(request: TTSJobRequest):
+    """
+    Create a long-form synthesis job
+
+    The text is segmented and rendered in the background at bulk priority.
+    Poll GET /jobs/{job_id} for progress and fetch GET /jobs/{job_id}/audio,
+    optionally with a Range header, while rendering continues.
+    """
+    return await asyncio.to_thread(
+        _create_job,
+        request.input,
+        request.speaker,
+        request.language,
+        request.response_format,
+        request.speed,
+    )
+
+
+@app.post("/jobs/file", status_code=status.HTTP_202_ACCEPTED)
+async def create_job_from_file(
+    file: UploadFile = File(..., description="UTF-8 text file"),
+    speaker: Optional[str] = Form(default=None),
+    language: Optional[str] = Form(default=None),
+    response_format: Literal["wav", "mp3", "aac", "pcm"] = Form(default="wav"),
+    speed: float = Form(default=1.0, ge=0.25, le=4.0),
+):
+    """Create a long-form synthesis job from an uploaded text file"""
+    try:
+        text = (await file.read()).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "Text file must be UTF-8 encoded"},
+        )
+    if not text.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "Text file is empty"},
+        )
+    return await asyncio.to_thread(_create_job, text, speaker, language, response_format, speed)
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """List jobs, newest first"""
+    return {"object": "list", "data": [job.to_response() for job in job_manager.list()]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status and progress"""
+    return _get_job_or_404(job_id).to_response()
+
+
+@app.get("/jobs/{job_id}/audio")
+async def get_job_audio(
+    job_id: str,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+):
+    """
+    Download the rendered part of a job's output
+
+    Only the checkpointed prefix of the file is served. Until the job
+    completes, Content-Range reports an unknown total ("*").
+    """
+    job = _get_job_or_404(job_id)
+    available = job.bytes_written
+    complete = job.status == "completed"
+    total = str(available) if complete else "*"
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "X-Job-Status": job.status,
+        "Content-Disposition": f'attachment; filename="{job.id}.{job.response_format}"',
+    }
+
+    start, end = 0, available - 1
+    status_code = status.HTTP_200_OK
+    if range_header is not None:
+        parsed = _parse_range(range_header, available)
+        if parsed is None:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{total}"},
+            )
+        start, end = parsed
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    path = job_manager.output_path(job)
+
+    def _read():
+        if length == 0:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = f.read(min(JOB_READ_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+
+    return StreamingResponse(
+        _read(),
+        status_code=status_code,
+        media_type=MEDIA_TYPES.get(job.response_format, "application/octet-stream"),
+        headers=headers,
+    )
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Cancel a job and delete its output"""
+    if not await asyncio.to_thread(job_manager.delete, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": f"Job not found: {job_id}"},
+        )
+    return {"id": job_id, "object": "speech.job.deleted", "deleted": True}
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(
-        app,
-        host=settings.service_host,
-        port=settings.service_port,
-        log_level=settings.log_level.lower(),
-    )
+    if settings.service_uds:
+        # Co-located gateway connects with unix:// backend URLs
+        uvicorn.run(app, uds=settings.service_uds, log_level=settings.qwen_tts_log_level.lower())
+    else:
+        uvicorn.run(
+            app,
+            host=settings.service_host,
+            port=settings.service_port,
+            log_level=settings.qwen_tts_log_level.lower(),
+        )
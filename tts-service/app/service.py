@@ -3,16 +3,25 @@ TTS Service - Qwen3-TTS Text-to-Speech
 Handles speech synthesis using Qwen3-TTS models
 """
 
-import io
 import logging
-import re
-from typing import List, Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import numpy as np
-import soundfile as sf
 import torch
-
+from opentalker_common.audio_assembly import AudioAssembler
+from opentalker_common.audio_encoder import (
+    SUPPORTED_FORMATS,
+    encode_audio,
+    encoded_sample_rate,
+    iter_encode_audio,
+)
+from opentalker_common.resample import resample
+from opentalker_common.text_segmenter import TextSegmenter
+
+from app.batcher import DEFAULT_PRIORITY, TTSBatcher
 from app.config import settings
+from app.speed import time_stretch
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +38,30 @@ class Qwen3TTSService:
         self.device = settings.qwen_tts_device
         self.default_speaker = settings.qwen_tts_speaker
         self.chunk_size = settings.qwen_tts_chunk_size
+        self._segmenter = TextSegmenter(
+            max_chunk_size=self.chunk_size,
+            first_chunk_size=settings.qwen_tts_first_chunk_size,
+            target_chunk_seconds=settings.qwen_tts_target_chunk_seconds,
+        )
+        self._batcher = TTSBatcher(
+            self._generate_batch,
+            max_batch_size=settings.qwen_tts_max_batch_size,
+            max_batch_chars=settings.qwen_tts_max_batch_chars,
+            wait_ms=settings.qwen_tts_batch_wait_ms,
+            bulk_max_wait_ms=settings.qwen_tts_bulk_max_wait_ms,
+        )
+        # Encoding runs in its own pool so the batcher can start the next generation
+        self._encode_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.qwen_tts_encode_workers),
+            thread_name_prefix="tts-encode",
+        )
+        self._bitrates = {
+            "mp3": settings.qwen_tts_mp3_bitrate,
+            "opus": settings.qwen_tts_opus_bitrate,
+            "aac": settings.qwen_tts_aac_bitrate,
+        }
+        # Native output rate of the model, known after the first generation
+        self.sample_rate: Optional[int] = None
         self._is_loaded = False
 
     def load_model(self) -> None:
@@ -59,6 +92,7 @@ class Qwen3TTSService:
             )
 
             self._is_loaded = True
+            self._batcher.start()
             logger.info("Qwen3-TTS model loaded successfully")
 
             # Log supported speakers and languages
@@ -86,6 +120,9 @@ class Qwen3TTSService:
         try:
             logger.info("Unloading Qwen3-TTS model")
 
+            # Stop batcher before releasing the model it calls into
+            self._batcher.stop()
+
             # Delete model
             if self.model is not None:
                 del self.model
@@ -103,51 +140,6 @@ class Qwen3TTSService:
             logger.error(f"Failed to unload Qwen3-TTS model: {e}", exc_info=True)
             raise
 
-    def _split_text_into_chunks(self, text: str, max_chunk_size: int) -> List[str]:
-        """
-        Split long text into smaller chunks at sentence boundaries
-
-        Args:
-            text: Input text to split
-            max_chunk_size: Maximum characters per chunk
-
-        Returns:
-            List of text chunks
-        """
-        if len(text) <= max_chunk_size:
-            return [text]
-
-        # Split by common sentence delimiters (Chinese and English)
-        # 按中英文标点符号分句
-        sentence_delimiters = r"([。！？；.!?;])"
-        sentences = re.split(sentence_delimiters, text)
-
-        # Recombine sentences with their delimiters
-        combined_sentences = []
-        for i in range(0, len(sentences) - 1, 2):
-            if i + 1 < len(sentences):
-                combined_sentences.append(sentences[i] + sentences[i + 1])
-            else:
-                combined_sentences.append(sentences[i])
-
-        # Group sentences into chunks
-        chunks = []
-        current_chunk = ""
-
-        for sentence in combined_sentences:
-            if len(current_chunk) + len(sentence) <= max_chunk_size:
-                current_chunk += sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                current_chunk = sentence
-
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        logger.info(f"Split text ({len(text)} chars) into {len(chunks)} chunks")
-        return chunks
-
     def synthesize(
         self,
         text: str,
@@ -155,7 +147,11 @@ class Qwen3TTSService:
         language: Optional[str] = None,
         response_format: str = "wav",
         speed: float = 1.0,
-    ) -> bytes:
+        priority: str = DEFAULT_PRIORITY,
+        timings: Optional[Dict[str, float]] = None,
+        sample_rate: Optional[int] = None,
+        sample_format: str = "pcm16",
+    ) -> Tuple[bytes, int]:
         """
         Synthesize speech from text
 
@@ -163,200 +159,238 @@ class Qwen3TTSService:
             text: Text to synthesize
             speaker: Speaker name (e.g., 'female_calm', 'male_energetic')
             language: Language code (e.g., 'zh', 'en')
-            response_format: Output format (wav, mp3, flac, opus)
+            response_format: Output format (wav, mp3, flac, opus, aac, pcm)
             speed: Speech speed (0.25-4.0)
+            priority: Scheduling class for the text chunks (interactive or bulk)
+            timings: Optional dict filled with per-stage durations in seconds
+                (generate, assemble, speed, resample, encode)
+            sample_rate: Output sample rate, None for the model's native rate
+            sample_format: Sample encoding for wav/pcm (pcm16, mulaw, alaw)
 
         Returns:
-            Audio bytes in requested format
+            Tuple of (audio bytes in requested format, sample rate of the encoded audio)
         """
         if not self._is_loaded:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
         try:
-            # Use default speaker if not specified
-            if speaker is None:
-                speaker = self.default_speaker
-
-            # Auto-detect language if not specified
-            if language is None:
-                # Simple language detection based on text
-                if any("\u4e00" <= char <= "\u9fff" for char in text):
-                    language = "chinese"
-                else:
-                    language = "english"
-
-            # Map common language codes to qwen_tts format
-            language_map = {
-                "zh": "chinese",
-                "zh-CN": "chinese",
-                "zh-TW": "chinese",
-                "en": "english",
-                "en-US": "english",
-                "en-GB": "english",
-                "ja": "japanese",
-                "ko": "korean",
-                "fr": "french",
-                "de": "german",
-                "es": "spanish",
-                "it": "italian",
-                "pt": "portuguese",
-                "ru": "russian",
-            }
-            language = language_map.get(language, language)
+            speaker, language = self.resolve_voice(text, speaker, language)
 
             logger.info(
                 f"Synthesizing: text_length={len(text)}, speaker={speaker}, "
                 f"language={language}, speed={speed}, chunking={'enabled' if self.chunk_size > 0 else 'disabled'}"
             )
 
-            # Check if text needs chunking
-            if self.chunk_size > 0 and len(text) > self.chunk_size:
-                logger.info(
-                    f"Text exceeds chunk size ({len(text)} > {self.chunk_size}), using chunked synthesis"
-                )
-                return self._synthesize_chunked(text, speaker, language, response_format, speed)
-
-            # Generate speech for single chunk
-            # Qwen3-TTS returns (wavs_list, sample_rate) where wavs_list is a list of numpy arrays
-            wavs, sample_rate = self.model.generate_custom_voice(
-                text=text,
-                speaker=speaker,
-                language=language,
-            )
+            # Split long text into chunks; all chunks go through the batcher together
+            chunks = self._segmenter.segment(text)
 
-            # Get the first audio from the list
-            audio_data = wavs[0] if isinstance(wavs, list) else wavs
+            if timings is None:
+                timings = {}
 
-            # Apply speed adjustment if needed
-            if speed != 1.0:
-                logger.info(f"Applying speed adjustment: {speed}x")
-                # Simple speed adjustment by resampling
-                try:
-                    import librosa
+            # Generate all chunks (batched, returned in input order)
+            stage_start = time.perf_counter()
+            audio_chunks, model_rate = self._batcher.generate(
+                chunks, speaker, language, priority=priority
+            )
+            timings["generate"] = time.perf_counter() - stage_start
+            self.sample_rate = model_rate
 
-                    audio_data = librosa.effects.time_stretch(audio_data, rate=speed)
-                except ImportError:
-                    logger.warning("librosa not available, skipping speed adjustment")
+            stage_start = time.perf_counter()
+            if len(audio_chunks) > 1:
+                logger.info(f"Assembling {len(audio_chunks)} audio chunks")
+            audio_data = self.new_assembler(model_rate).assemble(audio_chunks)
+            timings["assemble"] = time.perf_counter() - stage_start
 
-            # Convert to bytes
-            audio_bytes = self._audio_to_bytes(audio_data, sample_rate, response_format)
+            # Apply speed adjustment once over the assembled signal
+            # (Qwen3-TTS has no native rate control)
+            if speed != 1.0:
+                stage_start = time.perf_counter()
+                audio_data = time_stretch(audio_data, speed, model_rate)
+                timings["speed"] = time.perf_counter() - stage_start
+                logger.info(f"Applied speed adjustment {speed}x in {timings['speed']:.3f}s")
+
+            # Convert to the requested output rate
+            output_rate = sample_rate or model_rate
+            if output_rate != model_rate:
+                stage_start = time.perf_counter()
+                audio_data = resample(audio_data, model_rate, output_rate)
+                timings["resample"] = time.perf_counter() - stage_start
+
+            # Convert to bytes in the encoder pool
+            stage_start = time.perf_counter()
+            audio_bytes = self.encode(audio_data, output_rate, response_format, sample_format)
+            timings["encode"] = time.perf_counter() - stage_start
 
             logger.info(f"Synthesis completed: {len(audio_bytes)} bytes")
-            return audio_bytes
+            return audio_bytes, encoded_sample_rate(response_format, output_rate)
 
         except Exception as e:
             logger.error(f"Synthesis failed: {e}", exc_info=True)
             raise
 
-    def _synthesize_chunked(
+    def resolve_voice(
+        self, text: str, speaker: Optional[str] = None, language: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Fill in the default speaker and map or detect the language
+
+        Args:
+            text: Text to synthesize (used for language detection)
+            speaker: Speaker name, None for the default speaker
+            language: Language code or name, None to detect from text
+
+        Returns:
+            Tuple of (speaker, language) in qwen_tts naming
+        """
+        # Use default speaker if not specified
+        if speaker is None:
+            speaker = self.default_speaker
+
+        # Auto-detect language if not specified
+        if language is None:
+            # Simple language detection based on text
+            if any("\u4e00" <= char <= "\u9fff" for char in text):
+                language = "chinese"
+            else:
+                language = "english"
+
+        # Map common language codes to qwen_tts format
+        language_map = {
+            "zh": "chinese",
+            "zh-CN": "chinese",
+            "zh-TW": "chinese",
+            "en": "english",
+            "en-US": "english",
+            "en-GB": "english",
+            "ja": "japanese",
+            "ko": "korean",
+            "fr": "french",
+            "de": "german",
+            "es": "spanish",
+            "it": "italian",
+            "pt": "portuguese",
+            "ru": "russian",
+        }
+        language = language_map.get(language, language)
+        return speaker, language
+
+    def submit_chunks(
         self,
-        text: str,
+        chunks: List[str],
         speaker: str,
         language: str,
-        response_format: str,
-        speed: float,
-    ) -> bytes:
+        priority: str = DEFAULT_PRIORITY,
+    ) -> List[Future]:
         """
-        Synthesize long text by splitting into chunks
+        Queue text chunks on the batcher without waiting for them
 
         Args:
-            text: Long text to synthesize
-            speaker: Speaker name
-            language: Language code
-            response_format: Output format
-            speed: Speech speed
+            chunks: Text chunks, in playback order
+            speaker: Resolved speaker name
+            language: Resolved language name
+            priority: Scheduling class (interactive or bulk)
 
         Returns:
-            Combined audio bytes
+            One future per chunk resolving to (wav, sample_rate)
         """
-        # Split text into chunks
-        chunks = self._split_text_into_chunks(text, self.chunk_size)
-
-        # Synthesize each chunk
-        audio_chunks = []
-        sample_rate = None
-
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Synthesizing chunk {i + 1}/{len(chunks)}: {len(chunk)} chars")
-
-            # Generate speech for this chunk
-            wavs, sr = self.model.generate_custom_voice(
-                text=chunk,
-                speaker=speaker,
-                language=language,
-            )
-
-            # Get audio data
-            audio_data = wavs[0] if isinstance(wavs, list) else wavs
-
-            # Apply speed adjustment if needed
-            if speed != 1.0:
-                try:
-                    import librosa
-
-                    audio_data = librosa.effects.time_stretch(audio_data, rate=speed)
-                except ImportError:
-                    pass
-
-            audio_chunks.append(audio_data)
-            if sample_rate is None:
-                sample_rate = sr
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+        return self._batcher.submit(chunks, speaker, language, priority)
 
-        # Concatenate all audio chunks
-        logger.info(f"Concatenating {len(audio_chunks)} audio chunks")
-        combined_audio = np.concatenate(audio_chunks)
+    def segment_text(self, text: str) -> List[str]:
+        """Split text into synthesis chunks with the shared segmenter"""
+        return self._segmenter.segment(text)
 
-        # Convert to bytes (sample_rate should be set from first chunk)
-        if sample_rate is None:
-            raise RuntimeError("Failed to get sample rate from audio chunks")
+    def encode(
+        self, audio_data, sample_rate: int, format: str, sample_format: str = "pcm16"
+    ) -> bytes:
+        """Encode audio in the encoder pool"""
+        future = self._encode_pool.submit(
+            self._audio_to_bytes, audio_data, sample_rate, format, sample_format
+        )
+        return future.result()
+
+    def encode_stream(
+        self, chunks: Iterable, sample_rate: int, format: str, continuation: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Encode a stream of audio pieces with one encoder instance
 
-        audio_bytes = self._audio_to_bytes(combined_audio, sample_rate, response_format)
+        Compressed formats go through a single ffmpeg process, so the output has
+        one header and continuous frames instead of per-piece encoder restarts.
+        With continuation the output is appended to an earlier stream and
+        carries no header of its own.
+        """
+        return iter_encode_audio(
+            chunks, sample_rate, format, self._bitrates.get(format), continuation
+        )
+
+    def new_assembler(self, sample_rate: int) -> AudioAssembler:
+        """Chunk assembler configured with the service's crossfade and trimming settings"""
+        return AudioAssembler(
+            sample_rate,
+            crossfade_ms=settings.qwen_tts_crossfade_ms,
+            trim_silence=settings.qwen_tts_trim_silence,
+        )
+
+    def _generate_batch(self, texts: List[str], speaker: str, language: str):
+        """
+        Run one batched generate call (called from the batcher worker thread)
 
-        logger.info(f"Chunked synthesis completed: {len(audio_bytes)} bytes")
-        return audio_bytes
+        Args:
+            texts: Text chunks to synthesize together
+            speaker: Speaker name shared by all chunks
+            language: Language shared by all chunks
 
-    def _audio_to_bytes(self, audio_data, sample_rate: int, format: str = "wav") -> bytes:
+        Returns:
+            Tuple of (wavs, sample_rate), one wav per text
+        """
+        # Qwen3-TTS accepts lists for batch inference and returns (wavs_list, sample_rate)
+        start_time = time.perf_counter()
+        wavs, sample_rate = self.model.generate_custom_voice(
+            text=texts,
+            speaker=[speaker] * len(texts),
+            language=[language] * len(texts),
+        )
+        # Batch members decode in parallel, so the longest text sets the render time
+        self._segmenter.record_latency(max(len(t) for t in texts), time.perf_counter() - start_time)
+        if not isinstance(wavs, list):
+            wavs = [wavs]
+        return wavs, sample_rate
+
+    def _audio_to_bytes(
+        self, audio_data, sample_rate: int, format: str = "wav", sample_format: str = "pcm16"
+    ) -> bytes:
         """
         Convert audio numpy array to bytes
 
         Args:
             audio_data: Audio numpy array
             sample_rate: Sample rate
-            format: Output format (wav, mp3, flac, opus)
+            format: Output format (wav, mp3, flac, opus, aac, pcm)
+            sample_format: Sample encoding for wav/pcm (pcm16, mulaw, alaw)
 
         Returns:
             Audio bytes
         """
         try:
-            # Create in-memory buffer
-            buffer = io.BytesIO()
-
-            # Write audio to buffer
-            if format == "wav":
-                sf.write(buffer, audio_data, sample_rate, format="WAV")
-            elif format == "flac":
-                sf.write(buffer, audio_data, sample_rate, format="FLAC")
-            elif format == "mp3":
-                # For MP3, we need to use pydub or similar
-                # For now, convert to WAV and let the client handle conversion
-                logger.warning("MP3 format not directly supported, using WAV")
-                sf.write(buffer, audio_data, sample_rate, format="WAV")
-            elif format == "opus":
-                # For Opus, we need to use pydub or similar
-                logger.warning("Opus format not directly supported, using WAV")
-                sf.write(buffer, audio_data, sample_rate, format="WAV")
-            else:
+            if format not in SUPPORTED_FORMATS:
                 # Default to WAV
-                sf.write(buffer, audio_data, sample_rate, format="WAV")
+                logger.warning(f"Unsupported format '{format}', using WAV")
+                format = "wav"
 
-            # Get bytes
-            buffer.seek(0)
-            return buffer.read()
+            return encode_audio(
+                audio_data, sample_rate, format, self._bitrates.get(format), sample_format
+            )
 
         except Exception as e:
             logger.error(f"Audio conversion failed: {e}", exc_info=True)
             raise
 
+    def scheduler_stats(self) -> Dict[str, Dict]:
+        """Per-priority-class queue depth and queue latency"""
+        return self._batcher.stats()
+
     @property
     def is_loaded(self) -> bool:
         """Check if model is loaded"""
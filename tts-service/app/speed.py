@@ -0,0 +1,238 @@
+"""
+Speed control - Vectorized phase-vocoder time stretching
+Changes speech rate without changing pitch. The whole signal is processed in
+one pass (STFT, phase advance and overlap-add are all array operations), and
+analysis windows are computed once per FFT size. TimeStretcher runs the same
+vocoder incrementally for audio that arrives in pieces.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rates this close to 1.0 are passed through untouched
+SPEED_EPSILON = 1e-3
+
+
+@lru_cache(maxsize=8)
+def _window(n_fft: int) -> np.ndarray:
+    """Periodic Hann window"""
+    window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n_fft) / n_fft)
+    window.setflags(write=False)
+    return window
+
+
+@lru_cache(maxsize=8)
+def _phase_advance(n_fft: int, hop: int) -> np.ndarray:
+    """Expected phase advance per hop for each FFT bin"""
+    advance = 2.0 * np.pi * hop * np.arange(n_fft // 2 + 1) / n_fft
+    advance.setflags(write=False)
+    return advance
+
+
+def _fft_params(sample_rate: int) -> Tuple[int, int]:
+    """FFT size (~43ms) and hop (75% overlap) for a sample rate"""
+    n_fft = 1 << int(np.round(np.log2(sample_rate * 0.043)))
+    return n_fft, n_fft // 4
+
+
+def _overlap_add(frames: np.ndarray, hop: int) -> np.ndarray:
+    """Overlap-add frames shaped (n_frames, n_fft) where n_fft is a multiple of hop"""
+    n_frames, n_fft = frames.shape
+    overlap = n_fft // hop
+    output = np.zeros((n_frames + overlap - 1) * hop, dtype=frames.dtype)
+    for k in range(overlap):
+        output[k * hop : (k + n_frames) * hop] += frames[:, k * hop : (k + 1) * hop].reshape(-1)
+    return output
+
+
+def time_stretch(audio: np.ndarray, rate: float, sample_rate: int) -> np.ndarray:
+    """
+    Change playback speed without changing pitch
+
+    Args:
+        audio: Mono float audio
+        rate: Speed factor (> 1.0 is faster, < 1.0 is slower)
+        sample_rate: Sample rate of audio
+
+    Returns:
+        Time-stretched float32 audio of about len(audio) / rate samples
+    """
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if abs(rate - 1.0) < SPEED_EPSILON or audio.size == 0:
+        return audio
+
+    n_fft, hop = _fft_params(sample_rate)
+    window = _window(n_fft)
+
+    # Centered STFT
+    padded = np.pad(audio, (n_fft // 2, n_fft // 2 + n_fft))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop]
+    spectrum = np.fft.rfft(frames * window, axis=1)
+
+    # Output frame positions on the input time axis
+    steps = np.arange(0.0, spectrum.shape[0] - 1, rate)
+    left = steps.astype(np.int64)
+    alpha = (steps - left)[:, None]
+
+    magnitude = np.abs(spectrum)
+    magnitude = (1.0 - alpha) * magnitude[left] + alpha * magnitude[left + 1]
+
+    # Instantaneous frequency per step, then accumulate phase
+    angle = np.angle(spectrum)
+    advance = _phase_advance(n_fft, hop)
+    delta = angle[left + 1] - angle[left] - advance
+    delta -= 2.0 * np.pi * np.round(delta / (2.0 * np.pi))
+    phase = np.empty_like(delta)
+    phase[0] = angle[0]
+    phase[1:] = angle[0] + np.cumsum(advance + delta[:-1], axis=0)
+
+    stretched = np.fft.irfft(magnitude * np.exp(1j * phase), n=n_fft, axis=1) * window
+
+    # Overlap-add and normalize by the summed squared window
+    output = _overlap_add(stretched, hop)
+    envelope = _overlap_add(np.broadcast_to(window**2, stretched.shape), hop)
+    np.divide(output, envelope, out=output, where=envelope > 1e-8)
+
+    length = int(round(audio.size / rate))
+    return output[n_fft // 2 : n_fft // 2 + length].astype(np.float32)
+
+
+class TimeStretcher:
+    """
+    Streaming phase vocoder
+
+    Produces the same output as time_stretch() over the concatenation of all
+    input, but accepts the audio in pieces: analysis frames that straddle a
+    piece boundary wait for the next piece, and the phase accumulator and
+    overlap-add tail carry over, so there is no seam where pieces meet.
+    Output lags the input by about one FFT frame until flush().
+    """
+
+    def __init__(self, rate: float, sample_rate: int):
+        self.rate = rate
+        self.passthrough = abs(rate - 1.0) < SPEED_EPSILON
+        self._n_fft, self._hop = _fft_params(sample_rate)
+        self._window = _window(self._n_fft)
+        self._advance = _phase_advance(self._n_fft, self._hop)
+        # Padded input from absolute sample self._input_start (a frame start)
+        self._input = np.zeros(self._n_fft // 2, dtype=np.float32)
+        self._input_start = 0
+        self._received = 0
+        # Next output frame and its accumulated phase
+        self._frame = 0
+        self._phase: Optional[np.ndarray] = None
+        # Overlap-add accumulator and window envelope from absolute output sample self._output_start
+        self._output = np.empty(0, dtype=np.float64)
+        self._envelope = np.empty(0, dtype=np.float64)
+        self._output_start = self._n_fft // 2
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Stretch the next piece of audio
+
+        Args:
+            audio: Mono float audio continuing the previous pieces
+
+        Returns:
+            Stretched float32 samples that are final (possibly empty)
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            return audio
+        self._received += audio.size
+        self._input = np.concatenate([self._input, audio])
+        return self._advance_frames(limit=None)
+
+    def flush(self) -> np.ndarray:
+        """
+        Stretch the remaining input once no more audio follows
+
+        Returns:
+            The final stretched float32 samples
+        """
+        if self.passthrough or self._received == 0:
+            return np.empty(0, dtype=np.float32)
+        self._input = np.concatenate(
+            [self._input, np.zeros(self._n_fft // 2 + self._n_fft, dtype=np.float32)]
+        )
+        length = int(round(self._received / self.rate))
+        return self._advance_frames(limit=self._n_fft // 2 + length)
+
+    def _advance_frames(self, limit: Optional[int]) -> np.ndarray:
+        """Synthesize every output frame whose analysis frames are available"""
+        n_fft, hop = self._n_fft, self._hop
+        available = (self._input_start + self._input.size - n_fft) // hop + 1
+        # Output frame k reads analysis frames floor(k * rate) and floor(k * rate) + 1
+        end = self._frame
+        while int(end * self.rate) + 1 < available:
+            end += 1
+
+        if end > self._frame:
+            steps = np.arange(self._frame, end) * self.rate
+            left = steps.astype(np.int64)
+            alpha = (steps - left)[:, None]
+
+            first = int(left[0])
+            padded = self._input[first * hop - self._input_start :]
+            frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop]
+            frames = frames[: int(left[-1]) + 2 - first]
+            spectrum = np.fft.rfft(frames * self._window, axis=1)
+            left -= first
+
+            magnitude = np.abs(spectrum)
+            magnitude = (1.0 - alpha) * magnitude[left] + alpha * magnitude[left + 1]
+
+            angle = np.angle(spectrum)
+            delta = angle[left + 1] - angle[left] - self._advance
+            delta -= 2.0 * np.pi * np.round(delta / (2.0 * np.pi))
+            start_phase = angle[0] if self._phase is None else self._phase
+            phase = np.empty_like(delta)
+            phase[0] = start_phase
+            phase[1:] = start_phase + np.cumsum(self._advance + delta[:-1], axis=0)
+            self._phase = phase[-1] + self._advance + delta[-1]
+
+            stretched = np.fft.irfft(magnitude * np.exp(1j * phase), n=n_fft, axis=1)
+            stretched *= self._window
+            position = self._frame * hop
+            self._output = self._accumulate(position, _overlap_add(stretched, hop), self._output)
+            envelope = _overlap_add(np.broadcast_to(self._window**2, stretched.shape), hop)
+            self._envelope = self._accumulate(position, envelope, self._envelope)
+            self._frame = end
+
+            # Drop input before the first analysis frame still needed
+            drop = int(self._frame * self.rate) * hop - self._input_start
+            if drop > 0:
+                self._input = self._input[drop:]
+                self._input_start += drop
+
+        # Samples before the next frame's position receive no more overlap-add
+        ready = self._frame * hop if limit is None else limit
+        count = max(0, min(ready - self._output_start, self._output.size))
+        output = self._output[:count]
+        envelope = self._envelope[:count]
+        np.divide(output, envelope, out=output, where=envelope > 1e-8)
+        result = output.astype(np.float32)
+        self._output = self._output[count:]
+        self._envelope = self._envelope[count:]
+        self._output_start += count
+        return result
+
+    def _accumulate(self, position: int, samples: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """Add samples starting at absolute output sample position, growing target as needed"""
+        offset = position - self._output_start
+        if offset < 0:
+            # Leading half frame of centering padding, never emitted
+            samples = samples[-offset:]
+            offset = 0
+        required = offset + samples.size
+        if required > target.size:
+            grown = np.zeros(required, dtype=np.float64)
+            grown[: target.size] = target
+            target = grown
+        target[offset:required] += samples
+        return target
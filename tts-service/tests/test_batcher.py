@@ -0,0 +1,230 @@
+"""
+Tests for batched chunk generation (app.batcher).
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.batcher import TTSBatcher
+
+
+class RecordingModel:
+    """generate_fn that records each batch; the first call blocks until released."""
+
+    def __init__(self, fail: bool = False, short: bool = False, delay: float = 0.0):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._fail = fail
+        self._short = short
+        self._delay = delay
+
+    def __call__(self, texts, speaker, language):
+        self.calls.append((list(texts), speaker, language))
+        self.started.set()
+        assert self.release.wait(5)
+        time.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError("CUDA out of memory")
+        wavs = [f"wav:{text}" for text in texts]
+        return (wavs[:-1] if self._short else wavs), 24000
+
+
+@pytest.fixture
+def make_batcher():
+    batchers = []
+
+    def make(model, **options):
+        options.setdefault("wait_ms", 0)
+        batcher = TTSBatcher(model, **options)
+        batcher.start()
+        batchers.append(batcher)
+        return batcher
+
+    yield make
+    for batcher in batchers:
+        batcher.stop()
+
+
+def _occupy(batcher, model):
+    """Keep the worker busy so later submissions queue up together."""
+    futures = batcher.submit(["warm-up"], "Vivian", "Chinese")
+    assert model.started.wait(5)
+    return futures
+
+
+class TestBatching:
+    """Test packing chunks into shared generate calls."""
+
+    def test_results_in_input_order(self, make_batcher):
+        """generate() returns one wav per chunk, in playback order."""
+        model = RecordingModel()
+        model.release.set()
+        batcher = make_batcher(model)
+        wavs, sample_rate = batcher.generate(["a", "b", "c"], "Vivian", "Chinese")
+        assert wavs == ["wav:a", "wav:b", "wav:c"]
+        assert sample_rate == 24000
+
+    def test_generate_without_chunks(self, make_batcher):
+        model = RecordingModel()
+        batcher = make_batcher(model)
+        with pytest.raises(ValueError):
+            batcher.generate([], "Vivian", "Chinese")
+        assert model.calls == []
+
+    def test_compatible_chunks_share_a_call(self, make_batcher):
+        """Chunks of one speaker and language are batched up to max_batch_size."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=3)
+        _occupy(batcher, model)
+        first = batcher.submit(["a", "b"], "Vivian", "Chinese")
+        second = batcher.submit(["c", "d"], "Vivian", "Chinese")
+        model.release.set()
+        for future in first + second:
+            future.result(5)
+
+        batches = [texts for texts, _, _ in model.calls[1:]]
+        assert [len(texts) for texts in batches] == [3, 1]
+        assert sorted(text for texts in batches for text in texts) == ["a", "b", "c", "d"]
+
+    def test_batches_respect_char_budget(self, make_batcher):
+        """A batch never exceeds max_batch_chars."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=8, max_batch_chars=10)
+        _occupy(batcher, model)
+        futures = batcher.submit(["x" * 6, "y" * 6, "z" * 3], "Vivian", "Chinese")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        assert all(sum(map(len, texts)) <= 10 for texts, _, _ in model.calls[1:])
+
+    def test_speakers_are_not_mixed(self, make_batcher):
+        """Chunks for different speakers or languages go to separate calls."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=8)
+        _occupy(batcher, model)
+        futures = batcher.submit(["a"], "Vivian", "Chinese")
+        futures += batcher.submit(["b"], "Ryan", "Chinese")
+        futures += batcher.submit(["c"], "Vivian", "English")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        assert sorted((speaker, language) for _, speaker, language in model.calls[1:]) == [
+            ("Ryan", "Chinese"),
+            ("Vivian", "Chinese"),
+            ("Vivian", "English"),
+        ]
+
+    def test_generation_error_fails_the_batch(self, make_batcher):
+        """A failing generate call fails every future in its batch."""
+        model = RecordingModel(fail=True)
+        model.release.set()
+        batcher = make_batcher(model)
+        with pytest.raises(RuntimeError, match="out of memory"):
+            batcher.generate(["a", "b"], "Vivian", "Chinese")
+
+    def test_output_count_mismatch(self, make_batcher):
+        """A model returning the wrong number of wavs is reported, not misassigned."""
+        model = RecordingModel(short=True)
+        model.release.set()
+        batcher = make_batcher(model)
+        with pytest.raises(RuntimeError, match="outputs"):
+            batcher.generate(["a", "b"], "Vivian", "Chinese")
+
+    def test_submit_requires_running_worker(self):
+        """Submitting to a batcher that was never started fails fast."""
+        batcher = TTSBatcher(RecordingModel())
+        with pytest.raises(RuntimeError):
+            batcher.submit(["a"], "Vivian", "Chinese")
+
+    def test_stop_fails_queued_chunks(self, make_batcher):
+        """Chunks still queued when the batcher stops get an error."""
+        model = RecordingModel()
+        batcher = make_batcher(model)
+        _occupy(batcher, model)
+        queued = batcher.submit(["a"], "Vivian", "Chinese")
+        threading.Timer(0.05, model.release.set).start()
+        batcher.stop()
+        with pytest.raises(RuntimeError, match="stopped"):
+            queued[0].result(5)
+
+
+class TestScheduling:
+    """Test priority classes and fairness between requests."""
+
+    def _order(self, model):
+        return [text for texts, _, _ in model.calls[1:] for text in texts]
+
+    def test_interactive_before_bulk(self, make_batcher):
+        """Queued interactive chunks are served before older bulk chunks."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=1)
+        _occupy(batcher, model)
+        futures = batcher.submit(["b1", "b2"], "Vivian", "Chinese", priority="bulk")
+        futures += batcher.submit(["i1"], "Vivian", "Chinese", priority="interactive")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        assert self._order(model) == ["i1", "b1", "b2"]
+
+    def test_bulk_is_not_starved(self, make_batcher):
+        """A bulk chunk waiting longer than bulk_max_wait_ms goes ahead of interactive work."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=1, bulk_max_wait_ms=20)
+        _occupy(batcher, model)
+        futures = batcher.submit(["b1"], "Vivian", "Chinese", priority="bulk")
+        time.sleep(0.05)
+        futures += batcher.submit(["i1", "i2"], "Vivian", "Chinese", priority="interactive")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        assert self._order(model)[0] == "b1"
+
+    def test_aged_bulk_does_not_starve_interactive(self, make_batcher):
+        """An aged multi-chunk bulk render is promoted one batch per interval, not all at once."""
+        model = RecordingModel(delay=0.005)
+        batcher = make_batcher(model, max_batch_size=1, bulk_max_wait_ms=100)
+        _occupy(batcher, model)
+        futures = batcher.submit([f"b{i}" for i in range(6)], "Vivian", "Chinese", priority="bulk")
+        time.sleep(0.15)
+        for i in range(4):
+            futures += batcher.submit([f"i{i}"], "Vivian", "Chinese", priority="interactive")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        order = self._order(model)
+        assert order[0] == "b0"
+        # The rest of the aged render waits while interactive work keeps being scheduled
+        assert order[1:5] == ["i0", "i1", "i2", "i3"]
+
+    def test_requests_take_turns(self, make_batcher):
+        """Within a class, requests are served round-robin chunk by chunk."""
+        model = RecordingModel()
+        batcher = make_batcher(model, max_batch_size=1)
+        _occupy(batcher, model)
+        futures = batcher.submit(["a1", "a2", "a3"], "Vivian", "Chinese")
+        futures += batcher.submit(["b1", "b2"], "Vivian", "Chinese")
+        model.release.set()
+        for future in futures:
+            future.result(5)
+        assert self._order(model) == ["a1", "b1", "a2", "b2", "a3"]
+
+    def test_unknown_priority(self, make_batcher):
+        """Priorities outside PRIORITY_CLASSES are rejected."""
+        batcher = make_batcher(RecordingModel())
+        with pytest.raises(ValueError):
+            batcher.submit(["a"], "Vivian", "Chinese", priority="urgent")
+
+    def test_stats_per_class(self, make_batcher):
+        """stats() reports served chunks per priority class."""
+        model = RecordingModel()
+        model.release.set()
+        batcher = make_batcher(model)
+        batcher.generate(["a", "b"], "Vivian", "Chinese", priority="bulk")
+        batcher.generate(["c"], "Vivian", "Chinese")
+        stats = batcher.stats()
+        assert stats["bulk"]["served_chunks"] == 2
+        assert stats["interactive"]["served_chunks"] == 1
+        assert stats["bulk"]["queued_chunks"] == 0
@@ -0,0 +1,253 @@
+"""
+Tests for long-form synthesis jobs (app.jobs).
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+import soundfile as sf
+from opentalker_common.audio_assembly import AudioAssembler
+from opentalker_common.audio_encoder import iter_encode_audio
+
+from app.jobs import ASSEMBLED_FILENAME, JOB_FILENAME, JobManager
+
+SAMPLE_RATE = 8000
+
+TEXT = "|".join(f"c{i}" for i in range(6))
+
+
+class FakeService:
+    """Stands in for Qwen3TTSService: one tone per chunk, optionally holding one chunk back."""
+
+    def __init__(self, hold=None):
+        self.hold = hold
+        self.release = threading.Event()
+        # One record per output stream: samples encoded and whether it continued a file
+        self.streams = []
+
+    def resolve_voice(self, text, speaker, language):
+        return speaker or "Vivian", language or "English"
+
+    def segment_text(self, text):
+        return [chunk for chunk in text.split("|") if chunk]
+
+    def submit_chunks(self, chunks, speaker, language, priority=None):
+        futures = []
+        for chunk in chunks:
+            future = Future()
+            result = (_tone(int(chunk[1:])), SAMPLE_RATE)
+            if chunk == self.hold:
+                threading.Thread(target=self._resolve_later, args=(future, result)).start()
+            else:
+                future.set_result(result)
+            futures.append(future)
+        return futures
+
+    def _resolve_later(self, future, result):
+        self.release.wait(5)
+        if future.set_running_or_notify_cancel():
+            future.set_result(result)
+
+    def new_assembler(self, sample_rate):
+        return AudioAssembler(sample_rate)
+
+    def encode_stream(self, chunks, sample_rate, format, continuation=False):
+        record = {"samples": 0, "continuation": continuation}
+        self.streams.append(record)
+
+        def counted():
+            for chunk in chunks:
+                record["samples"] += chunk.size
+                yield chunk
+
+        return iter_encode_audio(counted(), sample_rate, format, None, continuation)
+
+
+def _tone(index: int, seconds: float = 0.25) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * (200 + 50 * index) * t)).astype(np.float32)
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_manager():
+    managers = []
+
+    def make(jobs_dir, service):
+        manager = JobManager(service, str(jobs_dir), window=2)
+        manager.start()
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.stop()
+
+
+def _render(make_manager, jobs_dir, **options):
+    """Render TEXT without interruption and return the output bytes."""
+    manager = make_manager(jobs_dir, FakeService())
+    job = manager.create(TEXT, **options)
+    _wait_for(lambda: job.status == "completed")
+    with open(manager.output_path(job), "rb") as f:
+        return f.read()
+
+
+def _interrupt(make_manager, jobs_dir, **options):
+    """Stop a job after three of its six chunks; returns its id."""
+    service = FakeService(hold="c3")
+    manager = make_manager(jobs_dir, service)
+    job = manager.create(TEXT, **options)
+    _wait_for(lambda: job.completed_chunks == 3)
+    stopper = threading.Thread(target=manager.stop)
+    stopper.start()
+    _wait_for(manager._stopping.is_set)
+    service.release.set()
+    stopper.join(5)
+    return job.id
+
+
+class TestJobs:
+    """Test rendering, resuming and cancelling jobs."""
+
+    def test_create_renders_output(self, make_manager, tmp_path):
+        manager = make_manager(tmp_path / "jobs", FakeService())
+        job = manager.create(TEXT, response_format="wav")
+        assert job.total_chunks == 6
+        _wait_for(lambda: job.status == "completed")
+
+        path = manager.output_path(job)
+        assert os.path.getsize(path) == job.bytes_written
+        audio, sample_rate = sf.read(path, dtype="float32")
+        assert sample_rate == SAMPLE_RATE
+        assert job.audio_seconds == pytest.approx(audio.size / SAMPLE_RATE)
+        assert not os.path.exists(os.path.join(tmp_path / "jobs", job.id, ASSEMBLED_FILENAME))
+
+        response = job.to_response()
+        assert response["progress"] == 1.0
+        assert "encoded_bytes" not in response and "settled_samples" not in response
+
+    def test_create_rejects_unstreamable_format(self, make_manager, tmp_path):
+        manager = make_manager(tmp_path / "jobs", FakeService())
+        with pytest.raises(ValueError):
+            manager.create(TEXT, response_format="opus")
+
+    def test_resume_appends_to_output(self, make_manager, tmp_path):
+        """A resumed wav job encodes only the audio after its boundary and matches a full render."""
+        expected = _render(make_manager, tmp_path / "reference", response_format="wav")
+        job_id = _interrupt(make_manager, tmp_path / "jobs", response_format="wav")
+
+        with open(os.path.join(tmp_path / "jobs", job_id, JOB_FILENAME)) as f:
+            state = json.load(f)
+        assert state["completed_chunks"] == 4
+        assert state["encoded_bytes"] > 0
+
+        service = FakeService()
+        manager = make_manager(tmp_path / "jobs", service)
+        job = manager.get(job_id)
+        _wait_for(lambda: job.status == "completed")
+        with open(manager.output_path(job), "rb") as f:
+            assert f.read() == expected
+
+        (stream,) = service.streams
+        assert stream["continuation"]
+        assert stream["samples"] == (len(expected) - state["encoded_bytes"]) // 2
+
+    def test_resume_continues_stretched_stream(self, make_manager, tmp_path):
+        """A stretched job is closed at shutdown and continued by a new stream."""
+        expected = _render(make_manager, tmp_path / "reference", response_format="pcm", speed=1.5)
+        job_id = _interrupt(make_manager, tmp_path / "jobs", response_format="pcm", speed=1.5)
+
+        service = FakeService()
+        manager = make_manager(tmp_path / "jobs", service)
+        job = manager.get(job_id)
+        _wait_for(lambda: job.status == "completed")
+        with open(manager.output_path(job), "rb") as f:
+            output = f.read()
+
+        (stream,) = service.streams
+        assert stream["continuation"]
+        # Only chunks 4 and 5 and the tail carried over from chunk 3 are rendered again
+        assert stream["samples"] < 3 * _tone(0).size
+        assert abs(len(output) - len(expected)) <= 4
+        assert job.audio_seconds == pytest.approx(len(output) / 2 / SAMPLE_RATE)
+
+    def test_delete_cancels_running_job(self, make_manager, tmp_path):
+        service = FakeService(hold="c2")
+        manager = make_manager(tmp_path / "jobs", service)
+        job = manager.create(TEXT)
+        _wait_for(lambda: job.completed_chunks == 2)
+
+        assert manager.delete(job.id)
+        assert manager.get(job.id) is None
+        service.release.set()
+        _wait_for(lambda: not os.path.exists(os.path.join(tmp_path / "jobs", job.id)))
+        assert job.status == "cancelled"
+        assert not manager.delete(job.id)
+
+
+class TestJobAPI:
+    """Test the /jobs endpoints."""
+
+    @pytest.fixture
+    def client(self, make_manager, tmp_path, monkeypatch):
+        pytest.importorskip("torch")
+        from fastapi.testclient import TestClient
+
+        import app.main as main
+
+        service = FakeService(hold="c3")
+        monkeypatch.setattr(main, "job_manager", make_manager(tmp_path / "jobs", service))
+        yield TestClient(main.app), main.job_manager, service
+        service.release.set()
+
+    def test_create_poll_and_download(self, client):
+        client, manager, service = client
+        response = client.post("/jobs", json={"input": TEXT, "response_format": "wav"})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        job = manager.get(job_id)
+
+        # Partial output is served while rendering, with an unknown total
+        _wait_for(lambda: job.completed_chunks == 3 and job.bytes_written > 0)
+        assert client.get(f"/jobs/{job_id}").json()["status"] == "running"
+        partial = client.get(f"/jobs/{job_id}/audio", headers={"Range": "bytes=0-9"})
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == "bytes 0-9/*"
+        assert partial.content[:4] == b"RIFF"
+
+        service.release.set()
+        _wait_for(lambda: job.status == "completed")
+        full = client.get(f"/jobs/{job_id}/audio")
+        assert full.status_code == 200
+        audio, _ = sf.read(io.BytesIO(full.content), dtype="float32")
+        assert audio.size == (len(full.content) - 44) // 2
+
+        size = len(full.content)
+        tail = client.get(f"/jobs/{job_id}/audio", headers={"Range": "bytes=-100"})
+        assert tail.status_code == 206
+        assert tail.headers["content-range"] == f"bytes {size - 100}-{size - 1}/{size}"
+        assert tail.content == full.content[-100:]
+
+        beyond = client.get(f"/jobs/{job_id}/audio", headers={"Range": f"bytes={size}-"})
+        assert beyond.status_code == 416
+        assert beyond.headers["content-range"] == f"bytes */{size}"
+
+    def test_delete(self, client):
+        client, manager, service = client
+        job_id = client.post("/jobs", json={"input": TEXT}).json()["id"]
+        assert client.delete(f"/jobs/{job_id}").status_code == 200
+        assert client.get(f"/jobs/{job_id}").status_code == 404
+        assert client.delete(f"/jobs/{job_id}").status_code == 404
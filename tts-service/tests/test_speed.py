@@ -0,0 +1,87 @@
+"""
+Tests for phase-vocoder speed control (app.speed).
+"""
+
+import numpy as np
+import pytest
+
+from app.speed import TimeStretcher, time_stretch
+
+SAMPLE_RATE = 24000
+
+
+def _speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Two tones with a slow amplitude envelope plus a little noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    audio = envelope * (0.4 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 660 * t))
+    return (audio + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def _dominant_frequency(audio: np.ndarray) -> float:
+    spectrum = np.abs(np.fft.rfft(audio * np.hanning(audio.size)))
+    return np.argmax(spectrum) * SAMPLE_RATE / audio.size
+
+
+class TestTimeStretch:
+    """Test one-shot time stretching."""
+
+    @pytest.mark.parametrize("rate", [0.5, 0.8, 1.25, 2.0])
+    def test_length_scales_with_rate(self, rate):
+        """Output is len(audio) / rate samples."""
+        audio = _speech_like(1.0)
+        assert time_stretch(audio, rate, SAMPLE_RATE).size == round(audio.size / rate)
+
+    @pytest.mark.parametrize("rate", [0.75, 1.5])
+    def test_pitch_is_preserved(self, rate):
+        """Changing speed keeps the tone's frequency."""
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        audio = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        stretched = time_stretch(audio, rate, SAMPLE_RATE)
+        assert _dominant_frequency(stretched) == pytest.approx(440, abs=5)
+
+    def test_unit_rate_is_passthrough(self):
+        """A rate of 1.0 returns the input untouched."""
+        audio = _speech_like(0.2)
+        assert np.array_equal(time_stretch(audio, 1.0, SAMPLE_RATE), audio)
+
+
+class TestTimeStretcher:
+    """Test the streaming vocoder against the one-shot result."""
+
+    @pytest.mark.parametrize("rate", [0.7, 1.3, 2.0])
+    @pytest.mark.parametrize("piece_seconds", [0.013, 0.25, 0.6])
+    def test_matches_one_shot(self, rate, piece_seconds):
+        """Feeding pieces of any size gives the same samples as time_stretch()."""
+        audio = _speech_like(1.5, seed=1)
+        piece = int(SAMPLE_RATE * piece_seconds)
+        stretcher = TimeStretcher(rate, SAMPLE_RATE)
+        outputs = [stretcher.process(audio[i : i + piece]) for i in range(0, audio.size, piece)]
+        outputs.append(stretcher.flush())
+        streamed = np.concatenate(outputs)
+
+        expected = time_stretch(audio, rate, SAMPLE_RATE)
+        assert streamed.size == expected.size
+        assert np.max(np.abs(streamed - expected)) < 1e-5
+
+    def test_output_is_incremental(self):
+        """Audio comes out while input is still arriving, not only at flush()."""
+        audio = _speech_like(1.0)
+        stretcher = TimeStretcher(1.3, SAMPLE_RATE)
+        early = sum(stretcher.process(audio[i : i + 2400]).size for i in range(0, 12000, 2400))
+        assert early > 0
+
+    def test_short_input(self):
+        """Input shorter than one FFT frame still produces the full length."""
+        audio = _speech_like(0.01)
+        stretcher = TimeStretcher(1.5, SAMPLE_RATE)
+        streamed = np.concatenate([stretcher.process(audio), stretcher.flush()])
+        assert streamed.size == round(audio.size / 1.5)
+
+    def test_unit_rate_is_passthrough(self):
+        """At rate 1.0 pieces are returned as they arrive."""
+        audio = _speech_like(0.1)
+        stretcher = TimeStretcher(1.0, SAMPLE_RATE)
+        assert np.array_equal(stretcher.process(audio), audio)
+        assert stretcher.flush().size == 0